@@ -120,6 +120,32 @@ document.getElementById('create-session').addEventListener('click', async () =>
     });
 });
 
+let streamingLog = null;
+let segmentsStreamed = false;
+const audioQueue = [];
+let audioPlaying = false;
+
+function queueAudio(url) {
+    audioQueue.push(url);
+    if (!audioPlaying) playNextAudio();
+}
+
+function playNextAudio() {
+    const url = audioQueue.shift();
+    if (!url) {
+        audioPlaying = false;
+        return;
+    }
+    audioPlaying = true;
+    const audio = new Audio(url);
+    audio.onended = playNextAudio;
+    audio.onerror = playNextAudio;
+    audio.play().catch(e => {
+        console.log("Audio playback:", e);
+        playNextAudio();
+    });
+}
+
 function connectWebSocket() {
     if (!sessionId) return;
     
@@ -156,13 +182,38 @@ function connectWebSocket() {
             addLog(data.text, "system");
         }
         
+        if (data.type === "narration_chunk") {
+            // Show streamed narration as it arrives; replaced by the final message
+            if (!streamingLog) {
+                streamingLog = document.createElement("div");
+                streamingLog.className = "narration";
+                streamingLog.innerText = "DM: ";
+                document.getElementById("log").prepend(streamingLog);
+            }
+            streamingLog.innerText += data.text;
+        }
+        
+        if (data.type === "audio_segment") {
+            // Sentences arrive in order; play each as soon as the previous ends
+            segmentsStreamed = true;
+            queueAudio(data.audio_url);
+        }
+        
         if (data.type === "narration") {
+            if (streamingLog) {
+                streamingLog.remove();
+                streamingLog = null;
+            }
             addLog(`DM: ${data.text}`, "narration");
             
-            // Play audio from base64
-            if (data.audio_base64) {
-                const audio = new Audio(`data:audio/mp3;base64,${data.audio_base64}`);
+            // Play cached narration audio by URL
+            if (data.audio_url) {
+                const audio = new Audio(data.audio_url);
                 audio.play().catch(e => console.log("Audio playback:", e));
+            } else if (data.audio_segments && data.audio_segments.length) {
+                if (!segmentsStreamed) {
+                    data.audio_segments.forEach(queueAudio);
+                }
             } else {
                 // Fallback to browser TTS
                 const utter = new SpeechSynthesisUtterance(data.text);
@@ -170,6 +221,8 @@ function connectWebSocket() {
                 speechSynthesis.speak(utter);
             }
             
+            segmentsStreamed = false;
+            
             if (isHost) {
                 document.getElementById("persona-select").value = data.persona;
             }
@@ -207,7 +260,8 @@ recognition.onresult = (event) => {
         ws.send(JSON.stringify({ 
             type: "voice_input", 
             text: text,
-            player_name: myName
+            player_name: myName,
+            stream: true
         }));
     }
 };
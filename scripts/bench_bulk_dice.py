@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-roll loops vs the bulk dice API
+
+Rolls the same formula N times through DiceSystem.roll / DiceEngine.resolve
+and through one DiceSystem.roll_many / DiceEngine.roll_3d6_many batch,
+reporting rolls per second and the batch's summary.
+
+Run from the repo root: python -m scripts.bench_bulk_dice [--rolls 100000]
+"""
+
+import argparse
+import time
+
+from server import bulk_dice
+from server.dice import DiceSystem
+from server.mechanics.dice import DiceEngine, RandomnessMode
+
+
+def rate(fn, count: int) -> float:
+    started = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rolls", type=int, default=100000)
+    args = parser.parse_args()
+    n = args.rolls
+
+    print(f"{n} rolls per case, backend: {'numpy' if bulk_dice.np is not None else 'array'}")
+    for label, system in (("secure", DiceSystem()), ("session stream", DiceSystem("bench"))):
+        single = rate(lambda: [system.roll("3d6+2") for _ in range(n)], n)
+        bulk = rate(lambda: system.roll_many("3d6+2", n), n)
+        print(f"  DiceSystem 3d6+2 ({label}): {single / 1e3:8.1f}k/s loop, {bulk / 1e3:8.1f}k/s bulk ({bulk / single:.0f}x)")
+
+    for mode in (RandomnessMode.SECURE, RandomnessMode.DETERMINISTIC, RandomnessMode.WEIGHTED):
+        engine = DiceEngine(mode=mode, seed="bench")
+        single = rate(lambda: [engine.resolve() for _ in range(n)], n)
+        bulk = rate(lambda: engine.roll_3d6_many(n), n)
+        print(f"  DiceEngine 3d6 ({mode.value}): {single / 1e3:8.1f}k/s loop, {bulk / 1e3:8.1f}k/s bulk ({bulk / single:.0f}x)")
+
+    summary = DiceSystem().roll_many("3d6+2", n).summary()
+    print(f"  summary: mean={summary['mean']} stdev={summary['stdev']} range={summary['min']}..{summary['max']}")
+
+
+if __name__ == "__main__":
+    main()
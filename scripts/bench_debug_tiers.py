@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Roll20 response size and latency per debug tier
+
+Runs the same action stream through process_roll20_event with the debug
+payload set to none, summary and full, and reports JSON bytes per response
+and mean latency.
+
+Run from the repo root: python -m scripts.bench_debug_tiers
+"""
+
+import json
+import time
+
+from server.dm_engine import process_roll20_event
+from server.memory import get_memory
+
+ACTIONS = [
+    "I help the merchant guild secure trade routes in the market_district.",
+    "I betray the Shadow Exchange and burn their docks while guards close in on Elara.",
+    "What if we bribe the city guard instead of fighting?",
+    "I search the warehouse for hidden ledgers.",
+]
+
+
+def add_factions(session_id: str, count: int) -> None:
+    world = get_memory(session_id)["world_graph"]
+    for i in range(count):
+        world["factions"][f"faction_{i}"] = {
+            "name": f"House {i}",
+            "power": 5.0,
+            "territory": ["docks"],
+            "attitude": {"players": 0.0},
+            "goals": [f"goal_{i}"],
+        }
+        world["npcs"][f"agent_{i}"] = {"faction": f"faction_{i}", "memory": [], "hooks": {}}
+
+
+def run(level: str, factions: int, rounds: int = 100):
+    session_id = f"bench_debug_{level}_{factions}"
+    add_factions(session_id, factions)
+    sizes = []
+    start = time.perf_counter()
+    for i in range(rounds):
+        response = process_roll20_event(session_id, "Aria", ACTIONS[i % len(ACTIONS)], [], debug_level=level)
+        sizes.append(len(json.dumps(response)))
+    elapsed = (time.perf_counter() - start) / rounds * 1e6
+    return sum(sizes) / len(sizes), elapsed
+
+
+def main():
+    print(f"{'factions':>8} {'tier':>8} {'bytes/resp':>11} {'us/resp':>9}")
+    for factions in (3, 50):
+        for level in ("none", "summary", "full"):
+            size, latency = run(level, factions)
+            print(f"{factions:>8} {level:>8} {size:>11.0f} {latency:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SECURE-mode randomness before and after the entropy pool
+
+"legacy" is the previous SECURE path: one secrets.randbelow(10**12) draw
+(a getrandom syscall) per float, scaled to a die face. The pooled variants
+draw from the buffered os.urandom pool one die at a time through
+RandomSource.randint, and in bulk through RandomSource.randints.
+
+Run from the repo root: python -m scripts.bench_entropy_pool [--dice 300000]
+"""
+
+import argparse
+import secrets
+import time
+
+from server.randomness import RandomMode, RandomSource, get_entropy_pool
+
+
+def legacy_d6() -> int:
+    return 1 + int(secrets.randbelow(10**12) / 10**12 * 6)
+
+
+def rate(fn, count: int) -> float:
+    started = time.perf_counter()
+    fn(count)
+    return count / (time.perf_counter() - started)
+
+
+def main(args) -> None:
+    n = args.dice
+    rng = RandomSource(mode=RandomMode.SECURE)
+    legacy = rate(lambda count: [legacy_d6() for _ in range(count)], n)
+    cases = [
+        ("legacy secrets per die", legacy),
+        ("pool, randint per die", rate(lambda count: [rng.randint(1, 6) for _ in range(count)], n)),
+        ("pool, randints bulk", rate(lambda count: rng.randints(1, 6, count), n)),
+        ("pool, bulk 3d6 x n/3", rate(lambda count: [rng.randints(1, 6, 3) for _ in range(count // 3)], n // 3 * 3)),
+    ]
+    print(f"{n} d6 rolls, SECURE mode")
+    for name, dice_per_second in cases:
+        print(f"{name:>24}: {dice_per_second / 1e6:7.2f} M dice/s  ({dice_per_second / legacy:5.1f}x)")
+    print(f"pool: {get_entropy_pool().stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dice", type=int, default=300000)
+    main(parser.parse_args())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: inverted faction index vs. per-faction keyword scanning
+
+Applies one player event to 20 and 200 factions through the shipped
+FactionEngine.apply_event_impact, with the cached index (use_index=True)
+and with the per-faction lowercase-and-substring scan (use_index=False).
+Each call gets its own copy of the world, since applying an event
+mutates faction power and attitude.
+
+Run from the repo root: python -m scripts.bench_faction_index
+"""
+
+import copy
+import random
+import time
+import timeit
+
+from server.faction_engine import INDEX_KEY, FactionEngine, FactionIndex
+
+WORDS = ["docks", "market", "guild", "shadow", "trade", "routes", "crime", "ember", "crown", "salt",
+         "harbor", "temple", "forge", "river", "ash", "silver", "wolf", "tower", "gate", "veil"]
+
+
+def make_world(count: int, seed: int = 3) -> dict:
+    rng = random.Random(seed)
+    return {
+        "factions": {
+            f"faction_{i}": {
+                "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}".title(),
+                "power": 5.0,
+                "territory": rng.sample(WORDS, 3),
+                "attitude": {"players": 0.0},
+                "goals": [f"{rng.choice(WORDS)}_{rng.choice(WORDS)}" for _ in range(3)],
+            }
+            for i in range(count)
+        }
+    }
+
+
+def worlds(world: dict, number: int) -> list:
+    # Fresh factions per call; the cached index (if any) is shared, as it
+    # would be across turns of one session
+    index = world.get(INDEX_KEY)
+    copies = []
+    for _ in range(number):
+        clone = copy.deepcopy({key: value for key, value in world.items() if key != INDEX_KEY})
+        if index is not None:
+            clone[INDEX_KEY] = index
+        copies.append(clone)
+    return copies
+
+
+def apply_all(copies: list, event: dict, use_index: bool) -> float:
+    """Mean microseconds per apply_event_impact call"""
+    engines = [FactionEngine(world, use_index=use_index) for world in copies]
+    started = time.perf_counter()
+    for engine in engines:
+        engine.apply_event_impact(event)
+    return (time.perf_counter() - started) / len(engines) * 1e6
+
+
+def main(number: int = 500):
+    event = {
+        "action_text": "I help the dockhands burn the silver_forge ledgers near the harbor gate",
+        "action_type": "disrupt",
+        "location": "harbor",
+        "C": 1.0,
+        "D": 1.0,
+    }
+    for count in (20, 200):
+        world = make_world(count)
+        scanned = FactionEngine(copy.deepcopy(world), use_index=False).apply_event_impact(event)
+        FactionEngine(world).index  # Build and cache the index once, as the first turn does
+        assert FactionEngine(worlds(world, 1)[0]).apply_event_impact(event) == scanned
+        old = apply_all(worlds(world, number), event, use_index=False)
+        new = apply_all(worlds(world, number), event, use_index=True)
+        build = timeit.timeit(lambda: FactionIndex(world["factions"]), number=20) / 20 * 1e6
+        print(f"{count:>4} factions: scan {old:8.1f} us | index {new:8.1f} us | "
+              f"{old / new:5.1f}x  (one-off index build {build:.0f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt size and LLM latency over a long campaign
+
+Plays a 500-turn campaign twice against a fake model whose latency grows
+with prompt length (a fixed cost plus a per-token cost, like a real
+provider's prefill):
+
+- "full history": every past turn pasted into the prompt
+- "compacted": the CampaignContext rolling summary + token-budgeted assembly
+
+Run from the repo root: python -m scripts.bench_prompt_context [--turns 500 --per-token 0.00005]
+"""
+
+import argparse
+import asyncio
+
+from server.config import settings
+from server.prompt_context import (
+    KEEP,
+    CampaignContext,
+    PromptSection,
+    StubSummarizer,
+    assemble_prompt,
+    estimate_tokens,
+)
+
+SCENE = "Rain hammers the harbour district; the Shadow Exchange has gone quiet and the watch is nervous."
+INSTRUCTIONS = "Narrate what happens next. Then offer 2-4 meaningful choices."
+CHECKPOINTS = (1, 50, 100, 250, 500)
+
+
+def turn_text(turn: int) -> str:
+    return f"Aria: I question merchant number {turn} about the missing caravan -> He points toward warehouse {turn % 17}."
+
+
+def full_history_prompt(history, action: str) -> str:
+    return "\n".join([f"SCENE: {SCENE}", *history, f"PLAYER ACTION: {action}", INSTRUCTIONS])
+
+
+def compacted_prompt(context: CampaignContext, action: str) -> str:
+    return assemble_prompt([
+        PromptSection("scene", SCENE, priority=3, label="SCENE"),
+        *context.sections(),
+        PromptSection("action", action, policy=KEEP, label="PLAYER ACTION"),
+        PromptSection("instructions", INSTRUCTIONS, policy=KEEP),
+    ], settings.prompt_token_budget).text
+
+
+async def main(args) -> None:
+    def latency(tokens: int) -> float:
+        return args.base + args.per_token * tokens
+
+    history = []
+    context = CampaignContext.from_settings()
+    summarizer = StubSummarizer()
+    print(f"fake model: {args.base * 1000:.0f}ms + {args.per_token * 1e6:.0f}us/token, budget {settings.prompt_token_budget} tokens")
+    print(f"{'turn':>5} | {'full tokens':>11} | {'full latency':>12} | {'compact tokens':>14} | {'compact latency':>15}")
+    for turn in range(1, args.turns + 1):
+        action = f"I question merchant number {turn} about the missing caravan."
+        full = estimate_tokens(full_history_prompt(history, action))
+        compact = estimate_tokens(compacted_prompt(context, action))
+        if turn in CHECKPOINTS or turn == args.turns:
+            print(
+                f"{turn:>5} | {full:>11} | {latency(full) * 1000:>10.0f}ms"
+                f" | {compact:>14} | {latency(compact) * 1000:>13.0f}ms"
+            )
+        history.append(turn_text(turn))
+        if context.record_turn(turn_text(turn)):
+            await context.refresh(summarizer)
+    print(f"summary refreshes: {context.refreshes}, turns summarized: {context.summarized_turns}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--base", type=float, default=0.3, help="Fixed model latency (s)")
+    parser.add_argument("--per-token", type=float, default=0.00005, help="Latency per prompt token (s)")
+    asyncio.run(main(parser.parse_args()))
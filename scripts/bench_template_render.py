@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark: template rendering before and after compiled tables
+
+"legacy" reproduces the previous render (copy + shuffle the option list,
+format the option block, module-level random); the compiled variants
+render from the precompiled tables with the random module and with a
+session's RandomSource stream, one at a time and in batches.
+
+Run from the repo root: python -m scripts.bench_template_render [--renders 200000]
+"""
+
+import argparse
+import random
+import time
+
+from server.randomness import get_session_rng
+from server.template_engine import render_batch, render_template, resolve_cell
+
+FRAME, TONE = "straight", "classic"
+
+
+def legacy_render(frame_key: str, tone: str) -> str:
+    frame_key, tone, tone_data = resolve_cell(frame_key, tone)
+    atmosphere = tone_data["atmosphere"][random.randrange(len(tone_data["atmosphere"]))]
+    consequence = tone_data["consequence"][random.randrange(len(tone_data["consequence"]))]
+    options = tone_data["options"].copy()
+    random.shuffle(options)
+    options = options[:random.randint(2, min(3, len(options)))]
+    narrative = f"{atmosphere}\n\n{consequence}\n\nWhat do you do?\n"
+    for i, option in enumerate(options, 1):
+        narrative += f"{i}. {option}\n"
+    return narrative.strip()
+
+
+def per_render(fn, count: int) -> float:
+    started = time.perf_counter()
+    fn(count)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main(args) -> None:
+    n = args.renders
+    session = get_session_rng("bench")
+    cases = [
+        ("legacy (copy + shuffle)", lambda count: [legacy_render(FRAME, TONE) for _ in range(count)]),
+        ("compiled, random module", lambda count: [render_template(FRAME, TONE) for _ in range(count)]),
+        ("compiled, session stream", lambda count: [render_template(FRAME, TONE, rng=session) for _ in range(count)]),
+        ("batch, session stream", lambda count: render_batch(FRAME, TONE, count, session)),
+    ]
+    print(f"{n} renders of {FRAME}/{TONE}")
+    for name, fn in cases:
+        print(f"{name:>26}: {per_render(fn, n):6.2f} us/render")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass input analyzer vs. the per-module scans
+
+Compares validate_player_input + classify_action (x2) + analyze_imagination,
+as process_roll20_event used to run them, against one analyze_input call.
+
+Run from the repo root: python -m scripts.bench_text_analyzer
+"""
+
+import random
+import timeit
+
+from server.dm_engine import classify_action
+from server.ethics import validate_player_input
+from server.resonance import analyze_imagination
+from server.text_analyzer import analyze_input
+
+FILLER = (
+    "the party creeps along the damp corridor listening for footsteps while torchlight "
+    "flickers over carved runes and old bones"
+).split()
+PHRASES = ["help", "betray", "like a", "what if", "hidden", "because", "bet", '"halt"']
+
+
+def make_input(length: int, phrase_density: float, seed: int) -> str:
+    rng = random.Random(seed)
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(PHRASES) if rng.random() < phrase_density else rng.choice(FILLER))
+    return " ".join(words)[:length]
+
+
+def legacy(text: str):
+    validation = validate_player_input(text)
+    if validation["valid"]:
+        sanitized = validation["sanitized"]
+        classify_action(sanitized)
+        classify_action(sanitized)
+        analyze_imagination(sanitized)
+
+
+def main(number: int = 2000):
+    print(f"{'length':>8} {'density':>8} {'legacy us':>10} {'single us':>10} {'speedup':>8}")
+    for length in (60, 200, 500):
+        for density in (0.0, 0.1, 0.3):
+            text = make_input(length, density, seed=length)
+            old = timeit.timeit(lambda: legacy(text), number=number) / number * 1e6
+            new = timeit.timeit(lambda: analyze_input(text), number=number) / number * 1e6
+            print(f"{length:>8} {density:>8.1f} {old:>10.1f} {new:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one-shot TTS vs. sentence-pipelined TTS
+
+Uses FakeBackend speech with configurable latency (a fixed per-call cost
+plus a per-character cost, like a real TTS service) and measures
+time-to-first-audio and total synthesis time for narrations of growing
+length.
+
+Run from the repo root: python -m scripts.bench_tts_pipeline [--base 0.15 --per-char 0.002 --workers 4]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from server import audio_cache as audio_store
+from server.audio_cache import AudioCache
+from server.llm_gateway import FakeBackend, LLMGateway, SpeechRequest
+from server.narration_stream import split_sentences
+from server.tts_pipeline import synthesize_segments
+
+SENTENCE = "The torchlight wavers as something vast shifts beyond gate {}. "
+
+
+async def one_shot(gateway: LLMGateway, text: str) -> tuple:
+    started = time.perf_counter()
+    await gateway.synthesize(SpeechRequest(text=text, voice="alloy"))
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def pipelined(gateway: LLMGateway, text: str, workers: int) -> tuple:
+    def synthesize(sentence):
+        return gateway.synthesize(SpeechRequest(text=sentence, voice="alloy"))
+
+    started = time.perf_counter()
+    first = None
+    async for _ in synthesize_segments(split_sentences(text), "alloy", "tts-1", synthesize, workers=workers):
+        if first is None:
+            first = time.perf_counter() - started
+    return first, time.perf_counter() - started
+
+
+async def main(args) -> None:
+    backend = FakeBackend(latency=args.base, speech_latency_per_char=args.per_char)
+    gateway = LLMGateway(default_timeout=600)
+    gateway.register(backend, max_concurrency=args.workers)
+
+    print(f"fake TTS: {args.base * 1000:.0f}ms/call + {args.per_char * 1000:.1f}ms/char, {args.workers} workers")
+    print(f"{'sentences':>9} | {'one-shot first':>14} | {'pipelined first':>15} | {'one-shot total':>14} | {'pipelined total':>15}")
+    for count in (1, 4, 8, 16):
+        # Distinct sentences, so the audio cache cannot deduplicate them
+        text = "".join(SENTENCE.format(i) for i in range(count))
+        # Fresh cache per run so both variants pay for synthesis
+        with tempfile.TemporaryDirectory() as root:
+            audio_store.audio_cache = AudioCache(root)
+            shot_first, shot_total = await one_shot(gateway, text)
+            pipe_first, pipe_total = await pipelined(gateway, text, args.workers)
+        print(
+            f"{count:>9} | {shot_first * 1000:>12.0f}ms | {pipe_first * 1000:>13.0f}ms"
+            f" | {shot_total * 1000:>12.0f}ms | {pipe_total * 1000:>13.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", type=float, default=0.15, help="Fixed latency per TTS call (s)")
+    parser.add_argument("--per-char", type=float, default=0.002, help="Latency per character (s)")
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Build precomputed polish tables for hybrid narration
+
+Polishes every TEMPLATE_LIBRARY prose cell N times and writes the compact
+table file that hybrid mode loads from POLISH_TABLES_PATH.
+
+Backends:
+  --backend openai            live OpenAI calls (needs OPENAI_API_KEY)
+  --backend fake              deterministic local output, for smoke tests
+  --replay recorded.jsonl     replay recorded completions, no network
+
+Run from the repo root:
+  python -m scripts.build_polish_tables --out data/polish_tables.bin --variants 3
+"""
+
+import argparse
+import asyncio
+import os
+
+from server.config import settings
+from server.llm_gateway import FakeBackend, LLMGateway, OpenAIBackend, ReplayBackend
+from server.polish_tables import PolishTables, build_polish_tables
+
+
+def make_gateway(args) -> LLMGateway:
+    if args.replay:
+        backend = ReplayBackend.from_jsonl(args.replay)
+    elif args.backend == "fake":
+        backend = FakeBackend()
+    else:
+        backend = OpenAIBackend(settings.openai_api_key, max_connections=args.concurrency)
+
+    gateway = LLMGateway(default_timeout=args.timeout)
+    gateway.register(backend, max_concurrency=args.concurrency)
+    return gateway
+
+
+async def main(args) -> None:
+    gateway = make_gateway(args)
+    try:
+        summary = await build_polish_tables(
+            args.out,
+            gateway,
+            variants=args.variants,
+            frames=args.frames,
+            tones=args.tones,
+        )
+    finally:
+        await gateway.aclose()
+
+    tables = PolishTables.load(args.out)
+    print(f"Covered {summary['covered']}/{summary['cells']} cells")
+    print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes, {len(tables)} indexed cells)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="polish_tables.bin")
+    parser.add_argument("--variants", type=int, default=3)
+    parser.add_argument("--backend", choices=["openai", "fake"], default="openai")
+    parser.add_argument("--replay", help="JSONL of recorded completions")
+    parser.add_argument("--frames", nargs="*", help="Only these frames")
+    parser.add_argument("--tones", nargs="*", help="Only these tones")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(main(parser.parse_args()))
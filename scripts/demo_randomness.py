@@ -5,7 +5,7 @@ Demo: VoiceDM Randomness & Dice Systems
 Shows all features in action with zero dependencies.
 """
 
-from server.randomness import RandomSource, RandomMode, get_session_rng, get_weighted_random
+from server.randomness import RandomSource, RandomMode, get_session_rng, get_stream_registry, get_weighted_random
 from server.dice import DiceSystem, quick_roll
 
 
@@ -107,6 +107,7 @@ def demo_session_rng():
     
     # Campaign A
     print("\nCampaign A (session: alpha)")
+    checkpoint = get_stream_registry().checkpoint("alpha")
     dice_a = DiceSystem(session_id="alpha")
     rolls_a = [dice_a.roll("d20").total for _ in range(5)]
     print(f"  Rolls: {rolls_a}")
@@ -118,7 +119,8 @@ def demo_session_rng():
     print(f"  Rolls: {rolls_b}")
     
     # Replay Campaign A
-    print("\nReplay Campaign A (session: alpha)")
+    print("\nReplay Campaign A (session: alpha) from its checkpoint")
+    get_stream_registry().restore("alpha", checkpoint)
     replay_a = DiceSystem(session_id="alpha")
     replay_rolls = [replay_a.roll("d20").total for _ in range(5)]
     print(f"  Rolls: {replay_rolls}")
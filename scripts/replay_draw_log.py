@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Replay a session's RNG draw log and check every logged roll
+
+Each record is re-executed from its stream seed and counter; the tool
+reports records whose result or consumed draws differ from the log, and
+prints the disputed rolls themselves with --show. Exits 1 on any mismatch.
+
+Run from the repo root: python -m scripts.replay_draw_log SESSION_ID [--dir draw_logs] [--show 20] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+from server.config import settings
+from server.draw_log import DrawLog, replay_records
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("session_id")
+    parser.add_argument("--dir", default=settings.draw_log_dir, help="draw log root (default: DRAW_LOG_DIR)")
+    parser.add_argument("--from-seq", type=int, default=0, help="skip records before this sequence number")
+    parser.add_argument("--show", type=int, default=0, help="print the last N records")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("no draw log directory (pass --dir or set DRAW_LOG_DIR)")
+
+    log = DrawLog(args.dir, args.session_id)
+    records = [record for record in log.records() if record.seq >= args.from_seq]
+    outcome = replay_records(records)
+
+    if args.json:
+        print(json.dumps({
+            "session_id": args.session_id,
+            "records": len(records),
+            "replayed": outcome["replayed"],
+            "matched": outcome["matched"],
+            "mismatches": [
+                {"record": m.record._asdict(), "actual": m.actual, "end": m.end} for m in outcome["mismatches"]
+            ],
+            "unknown": [record.seq for record in outcome["unknown"]],
+        }, indent=2))
+    else:
+        first = records[0].seq if records else "-"
+        last = records[-1].seq if records else "-"
+        print(f"{args.session_id}: {len(records)} records (seq {first}..{last}) in {log.directory}")
+        print(f"  replayed {outcome['replayed']}, matched {outcome['matched']}, "
+              f"mismatched {len(outcome['mismatches'])}, no replayer {len(outcome['unknown'])}")
+        for m in outcome["mismatches"]:
+            print(f"  MISMATCH seq {m.record.seq} {m.record.consumer}({m.record.args!r}): "
+                  f"logged {m.record.result} draws {m.record.start}..{m.record.end}, "
+                  f"replayed {m.actual} draws {m.record.start}..{m.end}")
+        for record in records[-args.show:] if args.show else []:
+            print(f"  #{record.seq} {record.consumer}({record.args!r}) -> {record.result} "
+                  f"[{record.stream} v{record.version} draws {record.start}..{record.end}]")
+
+    sys.exit(1 if outcome["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ __all__ = [
     "RandomMode",
     "get_global_rng",
     "get_session_rng",
+    "get_stream_registry",
     "get_weighted_random",
+    "prepare_distribution",
     "DiceSystem",
     "quick_roll"
 ]
@@ -18,7 +20,9 @@ from .randomness import (
     RandomMode,
     get_global_rng,
     get_session_rng,
-    get_weighted_random
+    get_stream_registry,
+    get_weighted_random,
+    prepare_distribution
 )
 
 # Import dice utilities
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from server import audio_cache as audio_store
+
+router = APIRouter(prefix=audio_store.AUDIO_ROUTE, tags=["audio"])
+
+# Content-addressed: the bytes behind a URL never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{audio_key}.mp3")
+@router.head("/{audio_key}.mp3", name="head_audio")  # Own name, so its operation ID differs from GET's
+async def get_audio(audio_key: str, request: Request):
+    cache = audio_store.audio_cache
+    if not cache.is_key(audio_key):
+        raise HTTPException(status_code=404, detail="Unknown audio")
+
+    etag = f'"{audio_key}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+    path = cache.get(audio_key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown audio")
+
+    # FileResponse answers Range requests with 206 partial content
+    return FileResponse(
+        path,
+        media_type="audio/mpeg",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,119 @@
+"""
+Content-addressed TTS audio cache
+
+Narration responses used to embed synthesized speech as base64, which made
+payloads a third larger than the audio itself and re-synthesized identical
+lines (persona greetings, repeated options) on every request.
+
+Audio is now stored once per sha256(model, voice, text) on disk and served
+by /api/audio/{key}.mp3 with range requests and immutable cache headers;
+JSON responses carry only the URL. Because the key is the content address,
+the file behind a URL never changes and clients may cache it forever.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+AUDIO_ROUTE = "/api/audio"
+AUDIO_SUFFIX = ".mp3"
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def audio_key(text: str, voice: str, model: str) -> str:
+    """Content address for one synthesized line."""
+    payload = "\x1f".join((model, voice, text))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def audio_url(key: str) -> str:
+    return f"{AUDIO_ROUTE}/{key}{AUDIO_SUFFIX}"
+
+
+class AudioCache:
+    """Write-once audio files sharded by key prefix under one directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def is_key(key: str) -> bool:
+        return bool(_KEY_RE.match(key))
+
+    def path_for(self, key: str) -> Path:
+        if not self.is_key(key):
+            raise ValueError(f"Invalid audio key: {key!r}")
+        return self.root / key[:2] / f"{key}{AUDIO_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Path of a cached file, or None."""
+        path = self.path_for(key)
+        return path if path.is_file() else None
+
+    def put(self, key: str, audio: bytes) -> Path:
+        """Store audio atomically; concurrent writers of one key are harmless."""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(audio)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        with self._lock:
+            self.bytes_written += len(audio)
+        return path
+
+    def _lookup(self, key: str) -> bool:
+        found = self.get(key) is not None
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def get_or_synthesize(self, text: str, voice: str, model: str, synthesize: Callable[[], bytes]) -> str:
+        """URL for the line, calling synthesize() only on a miss."""
+        key = audio_key(text, voice, model)
+        if not self._lookup(key):
+            self.put(key, synthesize())
+        return audio_url(key)
+
+    async def aget_or_synthesize(
+        self, text: str, voice: str, model: str, synthesize: Callable[[], Awaitable[bytes]]
+    ) -> str:
+        """Async get_or_synthesize."""
+        key = audio_key(text, voice, model)
+        if not self._lookup(key):
+            self.put(key, await synthesize())
+        return audio_url(key)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes_written": self.bytes_written,
+            "root": str(self.root),
+        }
+
+
+audio_cache = AudioCache(settings.audio_cache_dir)
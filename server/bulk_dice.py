@@ -0,0 +1,132 @@
+"""
+Bulk dice rolling
+
+Mass combat, NPC crowds and simulations roll one formula thousands of
+times. A batch draws every die it needs in a single RandomSource.randints
+call (one pooled entropy read, or whole counter-mode blocks in
+deterministic mode) and keeps the results in compact arrays: numpy int16
+arrays when numpy is installed, the stdlib array module otherwise. Both
+paths consume the RNG stream identically, so a seeded batch replays the
+same with or without numpy, and matches the same rolls made one at a time.
+"""
+
+import math
+from array import array
+from collections import Counter
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to array("h")
+    np = None
+
+SUM = "sum"
+HIGHEST = "highest"
+LOWEST = "lowest"
+
+
+class BulkRolls:
+    """`count` rolls of `dice` dice each, reduced to one total per roll"""
+
+    def __init__(
+        self,
+        expression: str,
+        values: Sequence[int],
+        dice: int,
+        sides: int,
+        modifier: int = 0,
+        keep: str = SUM,
+        wide: bool = False,
+    ):
+        """
+        Args:
+            expression: Formula the batch was rolled from
+            values: Every die, roll by roll (len = count * dice)
+            dice: Dice per roll
+            sides: Faces per die
+            modifier: Added to each roll's total
+            keep: SUM, HIGHEST (advantage) or LOWEST (disadvantage)
+            wide: Store values as 64-bit ints instead of int16, for batches
+                of whole-roll totals that can exceed a die face's range
+        """
+        if dice <= 0 or len(values) % dice:
+            raise ValueError("values must hold a whole number of rolls")
+        self.expression = expression
+        self.dice = dice
+        self.sides = sides
+        self.modifier = modifier
+        self.keep = keep
+        self.count = len(values) // dice
+        self.numpy = np is not None
+
+        if self.numpy:
+            self.rolls = np.asarray(values, dtype=np.int64 if wide else np.int16).reshape(self.count, dice)
+            if keep == HIGHEST:
+                natural = self.rolls.max(axis=1)
+            elif keep == LOWEST:
+                natural = self.rolls.min(axis=1)
+            else:
+                natural = self.rolls.sum(axis=1, dtype=np.int64 if wide else np.int32)
+            self.totals = natural.astype(np.int64 if wide else np.int32) + modifier
+        else:
+            self.rolls = array("l" if wide else "h", values)
+            reduce = {HIGHEST: max, LOWEST: min}.get(keep, sum)
+            groups = zip(*[iter(self.rolls)] * dice)
+            natural = map(reduce, groups) if dice > 1 else iter(self.rolls)
+            self.totals = array("l", (total + modifier for total in natural) if modifier else natural)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def roll(self, index: int) -> List[int]:
+        """The individual dice of one roll"""
+        if self.numpy:
+            return self.rolls[index].tolist()
+        start = index * self.dice
+        return self.rolls[start:start + self.dice].tolist()
+
+    def count_all(self, face: int) -> int:
+        """Rolls whose dice all show `face` (e.g. 3d6 criticals)"""
+        if self.numpy:
+            return int((self.rolls == face).all(axis=1).sum())
+        groups = zip(*[iter(self.rolls)] * self.dice)
+        return sum(1 for group in groups if group.count(face) == self.dice)
+
+    def histogram(self) -> Dict[int, int]:
+        """Number of rolls per total"""
+        if self.numpy and self.count:
+            low = int(self.totals.min())
+            counts = np.bincount(self.totals - low)
+            return {low + offset: int(n) for offset, n in enumerate(counts) if n}
+        return dict(sorted(Counter(self.totals).items()))
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, standard deviation, range and histogram of the totals"""
+        histogram = self.histogram()
+        if not histogram:
+            return {"count": 0, "mean": None, "stdev": None, "min": None, "max": None, "histogram": {}}
+        mean = sum(total * n for total, n in histogram.items()) / self.count
+        variance = sum(n * (total - mean) ** 2 for total, n in histogram.items()) / self.count
+        return {
+            "count": self.count,
+            "mean": round(mean, 4),
+            "stdev": round(math.sqrt(variance), 4),
+            "min": min(histogram),
+            "max": max(histogram),
+            "histogram": histogram,
+        }
+
+    def to_dict(self, include_totals: bool = False) -> Dict[str, Any]:
+        """Serializable form; per-roll totals only when asked, as they can be large"""
+        data = {
+            "expression": self.expression,
+            "dice": self.dice,
+            "sides": self.sides,
+            "modifier": self.modifier,
+            "keep": self.keep,
+            "backend": "numpy" if self.numpy else "array",
+            "summary": self.summary(),
+        }
+        if include_totals:
+            data["totals"] = self.totals.tolist()
+        return data
@@ -0,0 +1,259 @@
+"""
+Circuit breaker and request deadlines for LLM calls
+
+Without a breaker a slow or failing provider costs every player action a
+full client timeout before narration falls back to templates. The breaker
+watches a rolling window of recent calls (by count and by age):
+
+- CLOSED: calls go through; outcomes and latencies are recorded
+- OPEN: tripped by too many failures or too many slow calls in the window;
+  calls are rejected at once with CircuitOpenError and narration degrades
+  to TEMPLATE mode
+- HALF_OPEN: after the cooldown a single probe call is let through; success
+  closes the breaker, failure re-opens it for another cooldown
+
+Deadlines bound a whole request rather than each call: an endpoint opens a
+deadline_scope and every LLM/TTS call made while handling it gets at most
+the time that is left (see budget()).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Rolling-window failure and latency breaker for one provider."""
+
+    def __init__(
+        self,
+        name: str = "llm",
+        window: int = 20,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: Optional[float] = 10.0,
+        slow_call_rate: float = 0.5,
+        cooldown: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool, float]] = deque(maxlen=window)  # (at, ok, latency)
+        self._state = BreakerState.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_settings(cls, name: str) -> "CircuitBreaker":
+        from .config import settings
+
+        return cls(
+            name,
+            window=settings.llm_breaker_window,
+            window_seconds=settings.llm_breaker_window_seconds,
+            min_calls=settings.llm_breaker_min_calls,
+            failure_rate=settings.llm_breaker_failure_rate,
+            slow_call_seconds=settings.llm_slow_call or None,
+            slow_call_rate=settings.llm_breaker_slow_rate,
+            cooldown=settings.llm_breaker_cooldown,
+        )
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> BreakerState:
+        if self._state == BreakerState.OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._state = BreakerState.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether a call made now would be let through."""
+        with self._lock:
+            state = self._current_state()
+            return state == BreakerState.CLOSED or (state == BreakerState.HALF_OPEN and not self._probing)
+
+    def acquire(self) -> None:
+        """Admit one call or raise CircuitOpenError; pair with record_* or release."""
+        with self._lock:
+            state = self._current_state()
+            if state == BreakerState.CLOSED:
+                return
+            if state == BreakerState.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is {state.value}")
+
+    def release(self) -> None:
+        """An admitted call was abandoned (cancelled) without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN:
+                if self._slow(latency):
+                    self._trip()
+                    return
+                self._state = BreakerState.CLOSED
+                self._probing = False
+                self._outcomes.clear()
+            self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        with self._lock:
+            if self._state == BreakerState.HALF_OPEN:
+                self._trip()
+                return
+            self._record(False, latency)
+
+    def _slow(self, latency: float) -> bool:
+        return self.slow_call_seconds is not None and latency >= self.slow_call_seconds
+
+    def _record(self, ok: bool, latency: float) -> None:
+        now = self._clock()
+        self._outcomes.append((now, ok, latency))
+        self._prune(now)
+        if self._state != BreakerState.CLOSED or len(self._outcomes) < self.min_calls:
+            return
+        calls = len(self._outcomes)
+        failures = sum(1 for _, ok, _ in self._outcomes if not ok)
+        slow = sum(1 for _, _, latency in self._outcomes if self._slow(latency))
+        if failures / calls >= self.failure_rate or slow / calls >= self.slow_call_rate:
+            self._trip()
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _trip(self) -> None:
+        self._state = BreakerState.OPEN
+        self._opened_at = self._clock()
+        self._probing = False
+        self._outcomes.clear()
+        self.trips += 1
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run a blocking call under the breaker."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception:
+            self.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    async def acall(self, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await a call under the breaker; cancellation records no outcome."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure(time.monotonic() - started)
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = BreakerState.CLOSED
+            self._probing = False
+            self._outcomes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            self._prune(self._clock())
+            latencies = sorted(latency for _, _, latency in self._outcomes)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok, _ in self._outcomes if not ok)
+            return {
+                "state": state.value,
+                "window_calls": calls,
+                "failure_rate": round(failures / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for latency in latencies if self._slow(latency)) / calls, 3) if calls else 0.0,
+                "p50_latency": round(latencies[calls // 2], 4) if calls else None,
+                "p95_latency": round(latencies[min(calls - 1, int(calls * 0.95))], 4) if calls else None,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_in": round(max(0.0, self._opened_at + self.cooldown - self._clock()), 2)
+                if state == BreakerState.OPEN else 0.0,
+            }
+
+
+# === Request deadlines ===
+
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound every LLM call made inside to `seconds` from now.
+
+    Nested scopes can only tighten the deadline; None leaves it unchanged.
+    """
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current request deadline, or None without one."""
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+
+def budget(timeout: Optional[float]) -> Optional[float]:
+    """The tighter of `timeout` and what is left of the request deadline."""
+    remaining = remaining_budget()
+    if remaining is None:
+        return timeout
+    return remaining if timeout is None else min(timeout, remaining)
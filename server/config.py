@@ -19,6 +19,11 @@ class NarrationMode(str, Enum):
     HYBRID = "hybrid"      # Templates + optional LLM polish
     LLM = "llm"           # Full LLM generation (legacy)
 
+class DebugLevel(str, Enum):
+    NONE = "none"        # No debug payload
+    SUMMARY = "summary"  # Frame, imagination and geomancer headline numbers
+    FULL = "full"        # Everything, including world/faction/NPC state
+
 class Settings(BaseSettings):
     openai_api_key: str = ""  # Now optional
     openai_model: str = "gpt-4o-mini"
@@ -27,7 +32,33 @@ class Settings(BaseSettings):
     narration_mode: NarrationMode = NarrationMode.TEMPLATE  # Default to no dependencies
     randomness_mode: RandomMode = RandomMode.SECURE  # Default to OS entropy
     randomness_seed: str = ""  # Only used for deterministic mode
+    randomness_stream: int = 2  # Deterministic generator: 2 = counter-mode blocks, 1 = legacy per-draw hash (old seeds)
     non_linear_bias: float = 0.3  # 0=linear, 1=highly non-linear
+    debug_level: DebugLevel = DebugLevel.FULL  # Default Roll20 debug payload tier
+    llm_max_concurrency: int = 8  # In-flight LLM/TTS calls per provider
+    llm_max_connections: int = 20  # Pooled HTTP connections per provider
+    llm_timeout: float = 30.0  # Per-call deadline in seconds, including queueing
+    polish_cache_size: int = 512  # In-memory polished narrations kept (LRU)
+    polish_cache_ttl: float = 86400.0  # Seconds before a polished narration is refreshed
+    polish_cache_path: str = ""  # Optional SQLite file for a persistent polish tier
+    polish_tables_path: str = ""  # Precomputed polish tables (scripts/build_polish_tables.py)
+    audio_cache_dir: str = "audio_cache"  # Content-addressed TTS files served at /api/audio
+    draw_log_dir: str = ""  # Per-session RNG draw logs for roll replay/audit (empty = off)
+    draw_log_segment_records: int = 4096  # Draw records per compressed segment file
+    draw_log_max_segments: int = 64  # Segments kept per session; the oldest are deleted
+    tts_workers: int = 4  # Concurrent sentence syntheses per narration
+    narration_deadline: float = 12.0  # Budget in seconds for all LLM/TTS calls of one request
+    llm_slow_call: float = 10.0  # Calls slower than this count against the breaker (0 = never)
+    llm_breaker_window: int = 20  # Recent calls the circuit breaker judges
+    llm_breaker_window_seconds: float = 60.0  # ...and how old they may be
+    llm_breaker_min_calls: int = 5  # Calls needed in the window before the breaker can trip
+    llm_breaker_failure_rate: float = 0.5  # Failure share that opens the breaker
+    llm_breaker_slow_rate: float = 0.5  # Slow-call share that opens the breaker
+    llm_breaker_cooldown: float = 30.0  # Seconds open before a probe call is let through
+    prompt_token_budget: int = 600  # Estimated tokens per narration prompt built from session memory
+    context_recent_turns: int = 6  # Turns kept verbatim in prompts
+    context_summarize_every: int = 8  # Older turns collected before the summary is refreshed
+    context_summary_tokens: int = 160  # Cap on the rolling campaign summary
     
     class Config:
         env_file = ".env"
@@ -75,7 +106,8 @@ config = Config()
 
 # Initialize global randomness based on config
 try:
-    from .randomness import set_global_seed
+    from .randomness import set_default_stream_version, set_global_seed
+    set_default_stream_version(settings.randomness_stream)
     if settings.randomness_mode == RandomMode.DETERMINISTIC and settings.randomness_seed:
         set_global_seed(seed=settings.randomness_seed, mode=RandomMode.DETERMINISTIC)
     else:
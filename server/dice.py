@@ -4,10 +4,12 @@ VoiceDM Dice System
 Implements standard RPG dice rolling with randomness integration.
 """
 
-import re
 from typing import Dict, List, Optional, Any
 from enum import Enum
 from .randomness import get_session_rng, RandomSource
+from .bulk_dice import BulkRolls, HIGHEST, LOWEST, SUM
+from .dice_expression import ADVANTAGE, DISADVANTAGE, compile_expression
+from .draw_log import get_draw_log, totals_digest
 
 
 class RollMode(str, Enum):
@@ -70,10 +72,21 @@ class DiceResult:
 class DiceSystem:
     """Main dice rolling system"""
     
-    def __init__(self, session_id: Optional[str] = None):
-        """Initialize dice system for a session"""
+    def __init__(self, session_id: Optional[str] = None, rng: Optional[RandomSource] = None):
+        """
+        Initialize dice system for a session.
+        
+        Session rolls come from the session's "dice" stream and, when
+        settings.draw_log_dir is set, are recorded in its draw log. An
+        explicit `rng` overrides both (replay uses this).
+        """
         self.session_id = session_id
-        self.rng = get_session_rng(session_id) if session_id else RandomSource()
+        if rng is not None:
+            self.rng = rng
+            self.draw_log = None
+        else:
+            self.rng = get_session_rng(session_id, "dice") if session_id else RandomSource()
+            self.draw_log = get_draw_log(session_id) if session_id else None
         self.roll_history: List[DiceResult] = []
     
     def roll_die(self, sides: int) -> int:
@@ -84,87 +97,88 @@ class DiceSystem:
         """
         Roll dice based on expression.
         
-        Supports: d20, 2d6+3, d20 advantage, etc.
+        Supports: d20, 2d6+3, 4d6dl1, 2d20kh1+5, 3d6!, 2d10r<2, d8+d6-1,
+        d20 advantage, etc. (see dice_expression for the full grammar).
+        Expressions are compiled once and cached.
         """
-        expression = expression.lower().strip()
+        compiled = compile_expression(expression)
+        start = self.rng.position
+        outcome = compiled.evaluate(self.rng)
         
-        # Detect roll mode
-        mode = RollMode.NORMAL
-        if "disadvantage" in expression:
-            mode = RollMode.DISADVANTAGE
-            expression = expression.replace("disadvantage", "").strip()
-        elif "advantage" in expression:
+        if compiled.mode == ADVANTAGE:
             mode = RollMode.ADVANTAGE
-            expression = expression.replace("advantage", "").strip()
-        elif "disadv" in expression:
+        elif compiled.mode == DISADVANTAGE:
             mode = RollMode.DISADVANTAGE
-            expression = expression.replace("disadv", "").strip()
-        elif "adv" in expression:
-            mode = RollMode.ADVANTAGE
-            expression = expression.replace("adv", "").strip()
-        
-        # Parse dice expression: [count]d[sides][+/-modifier]
-        expression = re.sub(r'\s+', '', expression)
-        
-        # Simple pattern: d20, 2d6, 3d8+2, etc.
-        pattern = r'^(\d*)d(\d+)([+-]\d+)?$'
-        match = re.match(pattern, expression)
-        
-        if not match:
-            raise ValueError(f"Invalid dice expression: {expression}")
-        
-        count = int(match.group(1)) if match.group(1) else 1
-        sides = int(match.group(2))
-        modifier = int(match.group(3)) if match.group(3) else 0
-        
-        # Roll dice
-        rolls = []
-        faces = []
-        
-        if mode == RollMode.ADVANTAGE:
-            # Roll twice, take higher
-            roll1 = self.roll_die(sides)
-            roll2 = self.roll_die(sides)
-            rolls = [roll1, roll2]
-            faces = [sides, sides]
-            total = max(roll1, roll2) + modifier
-        elif mode == RollMode.DISADVANTAGE:
-            # Roll twice, take lower
-            roll1 = self.roll_die(sides)
-            roll2 = self.roll_die(sides)
-            rolls = [roll1, roll2]
-            faces = [sides, sides]
-            total = min(roll1, roll2) + modifier
+        elif any(term.explode for term in compiled.dice_terms):
+            mode = RollMode.EXPLODING
         else:
-            # Normal roll
-            for _ in range(count):
-                roll = self.roll_die(sides)
-                rolls.append(roll)
-                faces.append(sides)
-            total = sum(rolls) + modifier
+            mode = RollMode.NORMAL
         
         # Check for critical (d20 only)
-        metadata = {}
-        if sides == 20:
-            if 20 in rolls:
+        metadata: Dict[str, Any] = {}
+        d20_rolls = [roll for roll, sides in zip(outcome.rolls, outcome.faces) if sides == 20]
+        if d20_rolls:
+            if 20 in d20_rolls:
                 metadata["critical"] = True
                 metadata["critical_type"] = "success"
-            elif 1 in rolls:
+            elif 1 in d20_rolls:
                 metadata["critical"] = True
                 metadata["critical_type"] = "failure"
+        if outcome.dropped:
+            metadata["dropped"] = outcome.dropped
+        if mode in (RollMode.ADVANTAGE, RollMode.DISADVANTAGE):
+            metadata["totals"] = list(outcome.totals)
         
         result = DiceResult(
-            expression=expression,
-            total=total,
-            rolls=rolls,
-            faces=faces,
+            expression=compiled.normalized,
+            total=outcome.total,
+            rolls=outcome.rolls,
+            faces=outcome.faces,
             mode=mode,
             metadata=metadata
         )
         
         self.roll_history.append(result)
+        if self.draw_log is not None:
+            self.draw_log.record(self.rng, start, "dice.roll", expression, [result.total, result.rolls])
         return result
     
+    def roll_many(self, expression: str, count: int) -> BulkRolls:
+        """
+        Roll the same expression `count` times in one batch.
+        
+        Plain NdM+K formulas (with or without advantage) take all their
+        dice from a single draw on this system's RNG stream, in the order
+        `count` separate roll() calls would use them; other formulas are
+        evaluated roll by roll from their cached compiled form. Results
+        are kept as arrays (see bulk_dice) and not added to roll_history.
+        """
+        start = self.rng.position
+        batch = self._roll_batch(compile_expression(expression), count)
+        if self.draw_log is not None:
+            self.draw_log.record(
+                self.rng, start, "dice.roll_many", [expression, count], [batch.count, totals_digest(batch.totals)]
+            )
+        return batch
+    
+    def _roll_batch(self, compiled, count: int) -> BulkRolls:
+        if not compiled.is_simple:
+            totals = [compiled.evaluate(self.rng).total for _ in range(count)]
+            return BulkRolls(compiled.normalized, totals, 1, compiled.max, wide=True)
+        
+        term = compiled.dice_terms[0]
+        dice, keep = term.count, SUM
+        if compiled.mode == ADVANTAGE:
+            dice, keep = 2 * term.count, HIGHEST
+        elif compiled.mode == DISADVANTAGE:
+            dice, keep = 2 * term.count, LOWEST
+        if keep != SUM and term.count > 1:
+            # Best of two multi-dice totals is not a per-die reduction
+            totals = [compiled.evaluate(self.rng).total for _ in range(count)]
+            return BulkRolls(compiled.normalized, totals, 1, compiled.max, wide=True)
+        values = self.rng.randints(1, term.sides, count * dice)
+        return BulkRolls(compiled.normalized, values, dice, term.sides, compiled.constant, keep)
+    
     def get_history(self, limit: int = 10) -> List[DiceResult]:
         """Get recent roll history"""
         return self.roll_history[-limit:] if self.roll_history else []
@@ -0,0 +1,459 @@
+"""
+Dice expression compiler
+
+Parses a dice formula once into an immutable AST and caches it by the
+expression string, so repeated rolls of the same formula skip parsing.
+The compiled form evaluates against any RandomSource and knows its exact
+distribution (as Fractions), hence its exact min, max and mean.
+
+Grammar (case-insensitive, whitespace ignored):
+
+    expression := ["+" | "-"] term (("+" | "-") term)* [roll mode]
+    term       := [count] "d" (sides | "%") modifier* | integer
+    modifier   := "kh" [n] | "k" [n]      keep highest n (default 1)
+                | "kl" [n]                keep lowest n
+                | "dh" [n] | "dl" [n]     drop highest / lowest n
+                | "!" [">" n]             explode on max (or on >= n)
+                | "r" [cmp] n             reroll until not matched
+                | "ro" [cmp] n            reroll once
+    cmp        := "<" (at most n) | ">" (at least n); bare n matches n only
+    roll mode  := "adv" | "advantage" | "disadv" | "disadvantage"
+
+Examples: d20, 2d6+3, 4d6dl1, 2d20kh1+5, 3d6!, 2d10r<2, d8+d6-1, d20+4 adv.
+
+Advantage rolls the whole expression twice and keeps the higher total
+(disadvantage the lower). An exploding die adds a new roll while it shows
+an exploding face, at most EXPLODE_LIMIT times; its value is the chain
+total, and rerolls apply to the first roll only. The exact statistics
+describe exactly this capped game.
+"""
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import cached_property
+from math import comb
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+EXPLODE_LIMIT = 8  # Extra rolls per exploding die
+MAX_DICE = 1000  # Dice per term
+MAX_SIDES = 10000
+CACHE_SIZE = 512
+
+NORMAL = "normal"
+ADVANTAGE = "advantage"
+DISADVANTAGE = "disadvantage"
+
+KEEP_HIGHEST = "highest"
+KEEP_LOWEST = "lowest"
+
+Pmf = Dict[int, Fraction]
+
+_MODE_WORDS = (
+    ("disadvantage", DISADVANTAGE),
+    ("advantage", ADVANTAGE),
+    ("disadv", DISADVANTAGE),
+    ("adv", ADVANTAGE),
+)
+_TERM = re.compile(r"([+-])(?:(\d*)d(\d+|%)((?:[a-z!<>]+\d*)*)|(\d+))")
+_MODIFIER = re.compile(r"(kh|kl|k|dh|dl|ro|r|!)(?:([<>])?(\d+))?")
+
+
+@dataclass(frozen=True)
+class Constant:
+    value: int
+    sign: int = 1
+
+    def bounds(self) -> Tuple[int, int]:
+        return self.sign * self.value, self.sign * self.value
+
+    def pmf(self) -> Pmf:
+        return {self.sign * self.value: Fraction(1)}
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    count: int
+    sides: int
+    sign: int = 1
+    keep: Optional[Tuple[str, int]] = None  # (KEEP_HIGHEST | KEEP_LOWEST, n)
+    explode: Optional[int] = None  # Lowest exploding face
+    reroll: FrozenSet[int] = frozenset()
+    reroll_once: bool = False
+
+    @property
+    def kept(self) -> int:
+        return self.keep[1] if self.keep else self.count
+
+    def roll(self, rng) -> List[int]:
+        """Roll every die of the term (chain totals for exploding dice)"""
+        if not (self.reroll or self.explode):
+            return rng.randints(1, self.sides, self.count)
+        return [self._roll_die(rng) for _ in range(self.count)]
+
+    def _roll_die(self, rng) -> int:
+        sides = self.sides
+        value = rng.randint(1, sides)
+        if self.reroll_once:
+            if value in self.reroll:
+                value = rng.randint(1, sides)
+        else:
+            while value in self.reroll:
+                value = rng.randint(1, sides)
+        if self.explode is None:
+            return value
+        total = value
+        for _ in range(EXPLODE_LIMIT):
+            if value < self.explode:
+                break
+            value = rng.randint(1, sides)
+            total += value
+        return total
+
+    def select(self, values: List[int]) -> Tuple[List[int], List[int]]:
+        """Split rolled values into (kept, dropped)"""
+        if not self.keep:
+            return values, []
+        order = sorted(range(len(values)), key=values.__getitem__, reverse=self.keep[0] == KEEP_HIGHEST)
+        keep = set(order[:self.keep[1]])
+        kept = [value for index, value in enumerate(values) if index in keep]
+        dropped = [value for index, value in enumerate(values) if index not in keep]
+        return kept, dropped
+
+    def die_pmf(self) -> Pmf:
+        """Exact distribution of one die after rerolls and explosions"""
+        sides = self.sides
+        uniform = Fraction(1, sides)
+        rerolled = [face for face in range(1, sides + 1) if face in self.reroll]
+        if not rerolled:
+            first = {face: uniform for face in range(1, sides + 1)}
+        elif self.reroll_once:
+            # Keep a non-matching first roll, or take the second roll whatever it is
+            again = Fraction(len(rerolled), sides) * uniform
+            first = {face: (0 if face in self.reroll else uniform) + again for face in range(1, sides + 1)}
+        else:
+            share = Fraction(1, sides - len(rerolled))
+            first = {face: share for face in range(1, sides + 1) if face not in self.reroll}
+
+        if self.explode is None:
+            return first
+        # Chain of at most EXPLODE_LIMIT plain rolls after the first, built from the end
+        chain: Pmf = {face: uniform for face in range(1, sides + 1)}
+        for _ in range(EXPLODE_LIMIT - 1):
+            chain = self._explode_step({face: uniform for face in range(1, sides + 1)}, chain)
+        return self._explode_step(first, chain)
+
+    def _explode_step(self, roll: Pmf, tail: Pmf) -> Pmf:
+        result: Pmf = {}
+        for face, p in roll.items():
+            if face < self.explode:
+                result[face] = result.get(face, 0) + p
+            else:
+                for rest, q in tail.items():
+                    result[face + rest] = result.get(face + rest, 0) + p * q
+        return result
+
+    def die_bounds(self) -> Tuple[int, int]:
+        """Lowest and highest value of one die, without building its PMF"""
+        faces = range(1, self.sides + 1)
+        if self.reroll and not self.reroll_once:
+            faces = [face for face in faces if face not in self.reroll]
+        return self._chain_total(min(faces), 1), self._chain_total(max(faces), self.sides)
+
+    def _chain_total(self, first: int, face: int) -> int:
+        # Extremes follow the same face down the explosion chain: the smallest
+        # face stops it as early as possible, the largest runs it the longest
+        total = value = first
+        for _ in range(EXPLODE_LIMIT):
+            if self.explode is None or value < self.explode:
+                break
+            value = face
+            total += value
+        return total
+
+    def bounds(self) -> Tuple[int, int]:
+        low, high = self.die_bounds()
+        low, high = self.kept * low, self.kept * high
+        return (low, high) if self.sign > 0 else (-high, -low)
+
+    def pmf(self) -> Pmf:
+        die = self.die_pmf()
+        if self.keep and self.kept < self.count:
+            pmf = _keep_pmf(die, self.count, self.kept, self.keep[0] == KEEP_HIGHEST)
+        else:
+            pmf = _power(die, self.kept)
+        return pmf if self.sign > 0 else {-value: p for value, p in pmf.items()}
+
+    def mean(self) -> Fraction:
+        if self.keep and self.kept < self.count:
+            return _mean(self.pmf())
+        return self.sign * self.count * _mean(self.die_pmf())
+
+
+Term = Union[Constant, DiceTerm]
+
+
+@dataclass
+class Evaluation:
+    """One evaluation of a compiled expression"""
+
+    total: int
+    rolls: List[int]  # Every die rolled, in order
+    faces: List[int]  # Sides of each entry in rolls
+    dropped: List[int]  # Dice rolled but not counted
+    totals: Tuple[int, ...]  # Both totals under advantage/disadvantage
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """Immutable AST of a dice expression plus its exact statistics"""
+
+    source: str
+    normalized: str
+    terms: Tuple[Term, ...]
+    mode: str = NORMAL
+
+    @property
+    def dice_terms(self) -> Tuple[DiceTerm, ...]:
+        return tuple(term for term in self.terms if isinstance(term, DiceTerm))
+
+    @property
+    def is_simple(self) -> bool:
+        """One plain NdM term plus constants: batchable as a flat draw"""
+        dice = self.dice_terms
+        return len(dice) == 1 and not (dice[0].keep or dice[0].explode or dice[0].reroll) and dice[0].sign > 0
+
+    @property
+    def constant(self) -> int:
+        return sum(term.sign * term.value for term in self.terms if isinstance(term, Constant))
+
+    def _evaluate_once(self, rng, rolls: List[int], faces: List[int], dropped: List[int]) -> int:
+        total = 0
+        for term in self.terms:
+            if isinstance(term, Constant):
+                total += term.sign * term.value
+                continue
+            values = term.roll(rng)
+            kept, lost = term.select(values)
+            rolls.extend(values)
+            faces.extend([term.sides] * len(values))
+            dropped.extend(lost)
+            total += term.sign * sum(kept)
+        return total
+
+    def evaluate(self, rng) -> Evaluation:
+        """Roll the expression against a RandomSource"""
+        rolls: List[int] = []
+        faces: List[int] = []
+        dropped: List[int] = []
+        totals = [self._evaluate_once(rng, rolls, faces, dropped)]
+        if self.mode != NORMAL:
+            totals.append(self._evaluate_once(rng, rolls, faces, dropped))
+        total = max(totals) if self.mode == ADVANTAGE else min(totals)
+        return Evaluation(total, rolls, faces, dropped, tuple(totals))
+
+    @cached_property
+    def min(self) -> int:
+        return sum(term.bounds()[0] for term in self.terms)
+
+    @cached_property
+    def max(self) -> int:
+        return sum(term.bounds()[1] for term in self.terms)
+
+    @cached_property
+    def mean(self) -> Fraction:
+        """Exact expected total"""
+        if self.mode != NORMAL:
+            return _mean(self.pmf)
+        return sum((term.mean() if isinstance(term, DiceTerm) else Fraction(term.sign * term.value)
+                    for term in self.terms), Fraction(0))
+
+    @cached_property
+    def pmf(self) -> Pmf:
+        """Exact probability of every possible total"""
+        pmf: Pmf = {0: Fraction(1)}
+        for term in self.terms:
+            pmf = _convolve(pmf, term.pmf())
+        if self.mode == NORMAL:
+            return pmf
+        result: Pmf = {}
+        below = Fraction(0)
+        for value in sorted(pmf):
+            # P(max == v) = F(v)^2 - F(v-1)^2; the minimum mirrors it with survival
+            at_most = below + pmf[value]
+            if self.mode == ADVANTAGE:
+                result[value] = at_most ** 2 - below ** 2
+            else:
+                result[value] = (1 - below) ** 2 - (1 - at_most) ** 2
+            below = at_most
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "expression": self.normalized,
+            "min": self.min,
+            "max": self.max,
+            "mean": float(self.mean),
+            "mean_exact": str(self.mean),
+        }
+
+
+def _convolve(a: Pmf, b: Pmf) -> Pmf:
+    result: Pmf = {}
+    for x, p in a.items():
+        for y, q in b.items():
+            result[x + y] = result.get(x + y, 0) + p * q
+    return result
+
+
+def _power(die: Pmf, count: int) -> Pmf:
+    result: Pmf = {0: Fraction(1)}
+    base = die
+    while count:
+        if count & 1:
+            result = _convolve(result, base)
+        count >>= 1
+        if count:
+            base = _convolve(base, base)
+    return result
+
+
+def _keep_pmf(die: Pmf, count: int, keep: int, highest: bool) -> Pmf:
+    """Distribution of the sum of the best `keep` of `count` iid dice"""
+    # Assign dice to faces from the best face down; the first `keep` assigned are kept
+    states: Dict[Tuple[int, int], Fraction] = {(0, 0): Fraction(1)}
+    for face in sorted(die, reverse=highest):
+        p = die[face]
+        nxt: Dict[Tuple[int, int], Fraction] = {}
+        for (assigned, kept_sum), weight in states.items():
+            remaining = count - assigned
+            for showing in range(remaining + 1):
+                kept_here = max(0, min(showing, keep - assigned))
+                key = (assigned + showing, kept_sum + face * kept_here)
+                nxt[key] = nxt.get(key, 0) + weight * comb(remaining, showing) * p ** showing
+        states = nxt
+    result: Pmf = {}
+    for (assigned, kept_sum), weight in states.items():
+        if assigned == count and weight:
+            result[kept_sum] = result.get(kept_sum, 0) + weight
+    return result
+
+
+def _mean(pmf: Pmf) -> Fraction:
+    return sum((value * p for value, p in pmf.items()), Fraction(0))
+
+
+def _parse_modifiers(text: str, count: int, sides: int, expression: str) -> dict:
+    options: dict = {"reroll": set()}
+    position = 0
+    while position < len(text):
+        match = _MODIFIER.match(text, position)
+        if not match:
+            raise ValueError(f"Invalid dice expression: {expression}")
+        op, cmp, number = match.groups()
+        position = match.end()
+        n = int(number) if number else None
+
+        if op in ("kh", "k", "kl", "dh", "dl"):
+            if "keep" in options or cmp:
+                raise ValueError(f"Invalid dice expression: {expression}")
+            n = 1 if n is None else n
+            if not 0 < n <= count or (op in ("dh", "dl") and n >= count):
+                raise ValueError(f"Cannot keep or drop {n} of {count} dice: {expression}")
+            options["keep"] = {
+                "kh": (KEEP_HIGHEST, n),
+                "k": (KEEP_HIGHEST, n),
+                "kl": (KEEP_LOWEST, n),
+                "dh": (KEEP_LOWEST, count - n),
+                "dl": (KEEP_HIGHEST, count - n),
+            }[op]
+        elif op == "!":
+            if cmp == "<":
+                raise ValueError(f"Invalid dice expression: {expression}")
+            threshold = sides if n is None else n
+            if not 1 < threshold <= sides:
+                raise ValueError(f"Explosion threshold must be between 2 and {sides}: {expression}")
+            options["explode"] = threshold
+        else:
+            if n is None:
+                raise ValueError(f"Invalid dice expression: {expression}")
+            if cmp == "<":
+                faces = range(1, min(n, sides) + 1)
+            elif cmp == ">":
+                faces = range(max(n, 1), sides + 1)
+            else:
+                faces = [n] if 1 <= n <= sides else []
+            options["reroll"].update(faces)
+            options["reroll_once"] = op == "ro"
+
+    if len(options["reroll"]) >= sides and not options.get("reroll_once"):
+        raise ValueError(f"Reroll would never stop: {expression}")
+    options["reroll"] = frozenset(options["reroll"])
+    return options
+
+
+def parse_expression(expression: str) -> CompiledExpression:
+    """Compile an expression without the cache"""
+    text = re.sub(r"\s+", "", expression.lower())
+    mode = NORMAL
+    for word, word_mode in _MODE_WORDS:
+        if word in text:
+            mode = word_mode
+            text = text.replace(word, "")
+            break
+    if not text:
+        raise ValueError(f"Invalid dice expression: {expression}")
+    if text[0] not in "+-":
+        text = "+" + text
+
+    terms: List[Term] = []
+    position = 0
+    while position < len(text):
+        match = _TERM.match(text, position)
+        if not match:
+            raise ValueError(f"Invalid dice expression: {expression}")
+        sign_text, count_text, sides_text, modifiers, constant = match.groups()
+        sign = -1 if sign_text == "-" else 1
+        position = match.end()
+        if constant is not None:
+            terms.append(Constant(int(constant), sign))
+            continue
+        count = int(count_text) if count_text else 1
+        sides = 100 if sides_text == "%" else int(sides_text)
+        if not 0 < count <= MAX_DICE or not 0 < sides <= MAX_SIDES:
+            raise ValueError(f"Dice out of range (1-{MAX_DICE} dice, 1-{MAX_SIDES} sides): {expression}")
+        terms.append(DiceTerm(count, sides, sign, **_parse_modifiers(modifiers, count, sides, expression)))
+
+    normalized = text[1:] if text.startswith("+") else text
+    if mode != NORMAL:
+        normalized = f"{normalized} {mode}"
+    return CompiledExpression(expression, normalized, tuple(terms), mode)
+
+
+_cache: "OrderedDict[str, CompiledExpression]" = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    """Compiled form of an expression, from the LRU cache when seen before"""
+    compiled = _cache.get(expression)
+    if compiled is not None:
+        _cache.move_to_end(expression)
+        _cache_stats["hits"] += 1
+        return compiled
+    compiled = parse_expression(expression)
+    _cache[expression] = compiled
+    _cache_stats["misses"] += 1
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return compiled
+
+
+def cache_info() -> Dict[str, int]:
+    return {**_cache_stats, "size": len(_cache), "max_size": CACHE_SIZE}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    _cache_stats.update(hits=0, misses=0)
@@ -1,13 +1,16 @@
 import logging
-import math
-from typing import Dict, Any, List
-from .memory import SessionMemory, cleanup_old_sessions
+from typing import Dict, Any, AsyncIterator, Generator, List, Optional, Tuple, Union
+from .memory import SessionMemory, cleanup_old_sessions, peek_memory
 from .character import init_character, update_from_action
-from .resonance import analyze_imagination
 from .frame_engine import select_frame, FRAME_LIBRARY
-from .ethics import detect_railroading, validate_player_input
-from .hybrid_engine import generate_narrative  # NEW: Hybrid system
-from .config import settings
+from .ethics import detect_railroading
+from .text_analyzer import ACTION_MARKERS, analyze_input
+from .geomancer import GeomancerWindow
+from .hybrid_engine import agenerate_narrative, astream_narrative, generate_narrative  # NEW: Hybrid system
+from .narration_stream import chunk_message
+from .randomness import get_session_rng
+from .prompt_context import HEAD, KEEP, PromptSection, assemble_prompt, session_context
+from .config import DebugLevel, settings
 from .world_engine import WorldEngine
 from .faction_engine import FactionEngine
 from .npc_engine import NPCEngine
@@ -24,19 +27,25 @@ def _ensure_geomancer_state(memory: Dict[str, Any]) -> Dict[str, Any]:
     geomancer.setdefault("drift", 0.0)
     geomancer.setdefault("equilibrium", 1.0)
     geomancer.setdefault("instability", 0.0)
-    geomancer.setdefault("history", [])
+    history = geomancer.get("history")
+    if not isinstance(history, GeomancerWindow):
+        # Sessions created before the sliding window kept a plain list
+        geomancer["history"] = GeomancerWindow(history=history or ())
     memory.setdefault("geomancer_enabled", True)
     return geomancer
 
 
+def _geomancer_snapshot(geomancer: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe copy of the geomancer state for debug payloads."""
+    window = geomancer["history"]
+    return {**geomancer, "history": window.to_list(), "window_size": window.size}
+
+
 def classify_action(text: str):
     text = text.lower()
 
-    coop_markers = ["help", "assist", "support", "together", "protect"]
-    chaos_markers = ["kill", "burn", "explode", "betray", "steal"]
-
-    C_i = sum(1 for w in coop_markers if w in text)
-    D_i = sum(1 for w in chaos_markers if w in text)
+    C_i = sum(1 for w in ACTION_MARKERS["coop"] if w in text)
+    D_i = sum(1 for w in ACTION_MARKERS["disrupt"] if w in text)
 
     if C_i > D_i:
         return "coop", C_i, D_i
@@ -45,10 +54,10 @@ def classify_action(text: str):
     return "neutral", C_i, D_i
 
 
-def update_geomancer(mem: Dict[str, Any], text: str) -> float:
+def update_geomancer(mem: Dict[str, Any], text: str, action: Optional[Tuple[str, int, int]] = None) -> float:
     g = _ensure_geomancer_state(mem)
 
-    action_type, C_i, D_i = classify_action(text)
+    action_type, C_i, D_i = action if action is not None else classify_action(text)
 
     # Relevance (scene overlap)
     scene_words = set(mem.get("scene", "").lower().split())
@@ -66,23 +75,10 @@ def update_geomancer(mem: Dict[str, Any], text: str) -> float:
     lambda_decay, delta_disruption, mu_coop = 0.85, 0.5, 0.4
     g["T"] = lambda_decay * g["T"] + delta_disruption * g["D"] - mu_coop * g["C"]
 
-    # Track history for entropy
-    g["history"].append(action_type)
-    g["history"] = g["history"][-20:]
-
-    counts = {
-        "coop": g["history"].count("coop"),
-        "disrupt": g["history"].count("disrupt"),
-        "neutral": g["history"].count("neutral"),
-    }
-    total = sum(counts.values())
-    H = 0.0
-    if total > 0:
-        for v in counts.values():
-            if v > 0:
-                p = v / total
-                H -= p * math.log(p)
-    g["H"] = H
+    # Track history for entropy (sliding window, O(1) per action)
+    window = g["history"]
+    window.push(action_type)
+    g["H"] = window.entropy
 
     # Long-term campaign drift and party equilibrium/instability
     eta = 0.05
@@ -93,30 +89,128 @@ def update_geomancer(mem: Dict[str, Any], text: str) -> float:
 
     return U
 
+def resolve_debug_level(
+    session_id: str,
+    requested: Optional[Union[DebugLevel, str]] = None
+) -> DebugLevel:
+    """Debug tier for a request: explicit request > campaign setting > server default."""
+    if requested is None:
+        memory = peek_memory(session_id)
+        requested = memory.get("debug_level") if memory else None
+    if requested is None:
+        return settings.debug_level
+    return DebugLevel(requested)
+
+
 def process_roll20_event(
     session_id: str,
     player_name: str,
     text: str,
-    selected: List[str]
+    selected: List[str],
+    debug_level: Optional[Union[DebugLevel, str]] = None
 ) -> Dict[str, Any]:
     """
     Process a single Roll20 event and generate response.
-    Returns dict with 'chat' and/or 'roll' keys.
+    Returns dict with 'chat' and/or 'roll' keys, plus 'debug' unless the
+    resolved debug tier is 'none'.
+    """
+    level = resolve_debug_level(session_id, debug_level)
+    steps = _process_roll20_event(session_id, player_name, text, selected, level)
+    try:
+        narrative_request = next(steps)
+        steps.send(generate_narrative(**narrative_request))
+    except StopIteration as done:
+        response = done.value
+    if level == DebugLevel.NONE:
+        response.pop("debug", None)
+    return response
+
+
+async def aprocess_roll20_event(
+    session_id: str,
+    player_name: str,
+    text: str,
+    selected: List[str],
+    debug_level: Optional[Union[DebugLevel, str]] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Async process_roll20_event for endpoints.
+
+    The bookkeeping is identical; only the narration step is awaited, so a
+    slow LLM call no longer blocks other tables. `timeout` bounds each LLM call.
+    """
+    level = resolve_debug_level(session_id, debug_level)
+    steps = _process_roll20_event(session_id, player_name, text, selected, level)
+    try:
+        narrative_request = next(steps)
+        steps.send(await agenerate_narrative(**narrative_request, timeout=timeout))
+    except StopIteration as done:
+        response = done.value
+    if level == DebugLevel.NONE:
+        response.pop("debug", None)
+    return response
+
+
+async def astream_roll20_event(
+    session_id: str,
+    player_name: str,
+    text: str,
+    selected: List[str],
+    debug_level: Optional[Union[DebugLevel, str]] = None,
+    granularity: str = "sentence",
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming aprocess_roll20_event.
+
+    Yields {"type": "narration_chunk", ...} messages while the narration is
+    generated, then one {"type": "final", ...} message carrying the same
+    response process_roll20_event would return. Commands and invalid input
+    produce only the final message.
+    """
+    level = resolve_debug_level(session_id, debug_level)
+    steps = _process_roll20_event(session_id, player_name, text, selected, level)
+    try:
+        narrative_request = next(steps)
+        parts = []
+        async for chunk in astream_narrative(**narrative_request, granularity=granularity, timeout=timeout):
+            yield chunk_message(len(parts), chunk)
+            parts.append(chunk)
+        steps.send("".join(parts).strip())
+    except StopIteration as done:
+        response = done.value
+    if level == DebugLevel.NONE:
+        response.pop("debug", None)
+    yield {"type": "final", **response}
+
+
+def _process_roll20_event(
+    session_id: str,
+    player_name: str,
+    text: str,
+    selected: List[str],
+    level: DebugLevel
+) -> Generator[Dict[str, Any], str, Dict[str, Any]]:
+    """
+    The Roll20 pipeline as a generator: it yields the generate_narrative
+    arguments once, is sent the narration text, and returns the response.
+    Early exits (commands, invalid input) return without yielding.
     """
     # Clean up old sessions periodically
     if hash(session_id) % 10 == 0:  # Roughly 10% of calls
         cleanup_old_sessions()
     
-    # Validate input
-    validation = validate_player_input(text)
-    if not validation["valid"]:
-        logger.warning(f"Invalid input from {player_name}: {validation['issues']}")
+    # Validate and analyze input in a single pass
+    analysis = analyze_input(text)
+    if not analysis.valid:
+        logger.warning(f"Invalid input from {player_name}: {analysis.issues}")
         return {
-            "chat": f"⚠️ <i>Input issue: {validation['issues'][0]}</i>",
-            "debug": {"validation_issues": validation["issues"]}
+            "chat": f"⚠️ <i>Input issue: {analysis.issues[0]}</i>",
+            "debug": {"validation_issues": analysis.issues}
         }
     
-    text = validation["sanitized"]
+    text = analysis.sanitized
     session = SessionMemory(session_id)
     memory = session.get()
     _ensure_geomancer_state(memory)
@@ -157,7 +251,7 @@ def process_roll20_event(
                     f"C={geom['C']:.2f}, D={geom['D']:.2f}, T={geom['T']:.2f}, H={geom['H']:.2f}, "
                     f"Drift={geom['drift']:.2f}, Eq={geom['equilibrium']:.2f}, Instab={geom['instability']:.2f}"
                 ),
-                "debug": {"geomancer": geom, "geomancer_enabled": enabled}
+                "debug": {"geomancer": _geomancer_snapshot(geom), "geomancer_enabled": enabled}
             }
 
         if parts[1] in ["on", "off"]:
@@ -168,8 +262,16 @@ def process_roll20_event(
                 "debug": {"geomancer_enabled": enabled}
             }
 
+        if parts[1] == "window" and len(parts) == 3 and parts[2].isdigit() and int(parts[2]) > 0:
+            size = int(parts[2])
+            memory["geomancer"]["history"].resize(size)
+            return {
+                "chat": f"🧭 <b>Geomancer window set to {size} actions</b>",
+                "debug": {"geomancer_window": size}
+            }
+
         return {
-            "chat": "⚠️ <i>Usage: geomancer [on|off|status]</i>",
+            "chat": "⚠️ <i>Usage: geomancer [on|off|status|window N]</i>",
             "debug": {"invalid_geomancer_command": text}
         }
     
@@ -195,6 +297,19 @@ def process_roll20_event(
             }
         }
     
+    if text.lower() == "debug" or text.lower().startswith("debug "):
+        parts = text.lower().split()
+        if len(parts) == 2 and parts[1] in [tier.value for tier in DebugLevel]:
+            memory["debug_level"] = parts[1]
+            return {
+                "chat": f"🔧 <b>Debug output set to {parts[1]}</b>",
+                "debug": {"debug_level": parts[1]}
+            }
+        return {
+            "chat": "⚠️ <i>Usage: debug [none|summary|full]</i>",
+            "debug": {"invalid_debug_command": text}
+        }
+    
     if text.lower() == "scene":
         # Return current scene
         return {
@@ -207,12 +322,13 @@ def process_roll20_event(
     if player_name not in players:
         players[player_name] = init_character(player_name)
     
-    # Analyze imagination
-    imagination_score, imagination_signals = analyze_imagination(text)
+    # Imagination and action class come from the single-pass analysis
+    imagination_score, imagination_signals = analysis.imagination
+    action_type = analysis.action_type
 
     geom_score = None
     if memory.get("geomancer_enabled", True):
-        geom_score = update_geomancer(memory, text)
+        geom_score = update_geomancer(memory, text, analysis.action)
 
     geom = memory["geomancer"]
 
@@ -222,7 +338,6 @@ def process_roll20_event(
     faction_engine = FactionEngine(world_graph)
     npc_engine = NPCEngine(world_graph)
 
-    action_type, _, _ = classify_action(text)
     event = {
         "player": player_name,
         "action_text": text,
@@ -235,8 +350,9 @@ def process_roll20_event(
     }
     world_metrics = world_engine.apply_event(event)
     faction_deltas = faction_engine.apply_event_impact(event)
-    faction_balance = faction_engine.update_power_balance()
+    faction_balance = faction_engine.update_power_balance()  # Also refreshes world_graph["faction_balance"]
     npc_engine.record_event_memory(event)
+    npc_engine.mark_factions_changed(delta["faction"] for delta in faction_deltas)
     npc_updates = npc_engine.recalculate_loyalties()
     hooks = npc_engine.find_active_hooks()
     world_graph["pending_hooks"] = hooks[:5]
@@ -289,15 +405,19 @@ Write in the style of a {memory['persona']} dungeon master.
 """
     
     # Generate response using hybrid engine (templates or LLM based on config)
-    response_text = generate_narrative(
+    context = session_context(memory)
+    response_text = yield dict(
         frame_key=selected_frame["key"],
         tone=memory["persona"],
         scene_context=f"{memory['scene']}\n\n{tone_modifier}" if tone_modifier else memory["scene"],
         player_action=text,
-        imagination_signals=imagination_signals
+        imagination_signals=imagination_signals,
+        history=context.sections(),
+        rng=get_session_rng(session_id, "templates")
     )
     
     # Update memory with this interaction
+    context.record_and_compact(f"{player_name}: {text[:100]} -> {response_text[:160]}")
     memory["recent_actions"].append(text[:100])  # Store truncated
     memory["recent_outcomes"].append(selected_frame["key"])
     session.update_scene(f"After '{text[:50]}...': {response_text[:100]}...")
@@ -313,43 +433,53 @@ Write in the style of a {memory['persona']} dungeon master.
     if tone_modifier:
         response["chat"] += f"\n\n<i>{tone_modifier}</i>"
     
-    # Add debug info for GM
+    if rail_analysis["detected"]:
+        response["chat"] += f"\n\n⚠️ <i>GM Note: {rail_analysis['warning']}</i>"
+    
+    if level == DebugLevel.NONE:
+        return response
+    
+    # Add debug info for GM; the full tier's world/faction/NPC sections are
+    # only assembled when someone asked for them
     debug_info = {
         "imagination_score": round(imagination_score, 2),
-        "imagination_signals": imagination_signals,
         "frame_selected": selected_frame["key"],
-        "frame_score": round(selected_frame.get("selection_score", 0), 2),
-        "player_momentum": round(player_momentum, 2),
         "rail_detected": rail_analysis["detected"],
         "session_actions": memory["session_stats"]["total_actions"],
-        "avg_imagination": round(memory["session_stats"]["avg_imagination"], 2),
-        "geomancer_enabled": memory.get("geomancer_enabled", True),
         "geomancer_utility": round(geom_score, 2) if geom_score is not None else None,
-        "geomancer_C": round(geom["C"], 2),
-        "geomancer_D": round(geom["D"], 2),
-        "geomancer_T": round(geom["T"], 2),
-        "geomancer_H": round(geom["H"], 2),
-        "geomancer_drift": round(geom["drift"], 2),
-        "geomancer_equilibrium": round(geom["equilibrium"], 2),
-        "geomancer_instability": round(geom["instability"], 2),
-        "world_metrics": {
-            "cohesion": round(world_metrics.get("cohesion", 0.0), 2),
-            "disruption": round(world_metrics.get("disruption", 0.0), 2),
-            "tension": round(world_metrics.get("tension", 0.0), 2),
-            "entropy": round(world_metrics.get("entropy", 0.0), 2),
-            "drift": round(world_metrics.get("drift", 0.0), 2),
-            "equilibrium": round(world_metrics.get("equilibrium", 0.0), 2),
-            "instability": round(world_metrics.get("instability", 0.0), 2),
-        },
-        "faction_deltas": faction_deltas,
-        "faction_balance": faction_balance,
-        "npc_updates": npc_updates,
-        "pending_hooks": hooks[:5],
     }
     
+    if level == DebugLevel.FULL:
+        debug_info.update({
+            "imagination_signals": imagination_signals,
+            "frame_score": round(selected_frame.get("selection_score", 0), 2),
+            "player_momentum": round(player_momentum, 2),
+            "avg_imagination": round(memory["session_stats"]["avg_imagination"], 2),
+            "geomancer_enabled": memory.get("geomancer_enabled", True),
+            "geomancer_C": round(geom["C"], 2),
+            "geomancer_D": round(geom["D"], 2),
+            "geomancer_T": round(geom["T"], 2),
+            "geomancer_H": round(geom["H"], 2),
+            "geomancer_drift": round(geom["drift"], 2),
+            "geomancer_equilibrium": round(geom["equilibrium"], 2),
+            "geomancer_instability": round(geom["instability"], 2),
+            "world_metrics": {
+                "cohesion": round(world_metrics.get("cohesion", 0.0), 2),
+                "disruption": round(world_metrics.get("disruption", 0.0), 2),
+                "tension": round(world_metrics.get("tension", 0.0), 2),
+                "entropy": round(world_metrics.get("entropy", 0.0), 2),
+                "drift": round(world_metrics.get("drift", 0.0), 2),
+                "equilibrium": round(world_metrics.get("equilibrium", 0.0), 2),
+                "instability": round(world_metrics.get("instability", 0.0), 2),
+            },
+            "faction_deltas": faction_deltas,
+            "faction_balance": faction_balance,
+            "npc_updates": npc_updates,
+            "pending_hooks": hooks[:5],
+        })
+    
     if rail_analysis["detected"]:
         debug_info["rail_warning"] = rail_analysis["warning"]
-        response["chat"] += f"\n\n⚠️ <i>GM Note: {rail_analysis['warning']}</i>"
     
     response["debug"] = debug_info
     
@@ -369,6 +499,71 @@ def process_action(session_id: str, player_name: str, action_text: str):
     For Roll20 integration, use process_roll20_event instead.
     """
     from .llm import generate_narration_with_persona
+
+    steps = _process_action(session_id, player_name, action_text)
+    try:
+        prompt, persona_key = next(steps)
+        steps.send(generate_narration_with_persona(session_id, prompt, persona_key))
+    except StopIteration as done:
+        return done.value
+
+
+async def astream_action(
+    session_id: str,
+    player_name: str,
+    action_text: str,
+    granularity: str = "sentence",
+    timeout: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming process_action for the websocket.
+
+    Narration text is forwarded as narration_chunk messages while it is
+    generated, and each finished sentence is synthesized on the TTS worker
+    pool and announced as an ordered audio_segment message, so playback
+    starts after the first sentence. The final "narration" message is the
+    process_action payload with "audio_segments" in place of "audio_url".
+    Turn-claim and whisper replies are yielded as-is.
+    """
+    from .llm import PERSONAS, TTS_MODEL, astream_text
+    from .narration_stream import rechunk
+    from .tts_pipeline import gateway_synthesizer, speak_while_streaming
+
+    steps = _process_action(session_id, player_name, action_text)
+    try:
+        prompt, persona_key = next(steps)
+        persona = PERSONAS.get(persona_key, PERSONAS["classic"])
+        parts = []
+        segments = []
+        async for item in speak_while_streaming(
+            rechunk(astream_text(persona_key, prompt, timeout=timeout), granularity),
+            persona["voice"],
+            TTS_MODEL,
+            gateway_synthesizer(persona["voice"], TTS_MODEL, timeout),
+        ):
+            if isinstance(item, str):
+                yield chunk_message(len(parts), item)
+                parts.append(item)
+            else:
+                yield item.to_message()
+                segments.append(item.audio_url)
+
+        steps.send({
+            "text": "".join(parts).strip(),
+            "audio_segments": segments,
+            "voice": persona["voice"],
+            "persona_name": persona["name"]
+        })
+    except StopIteration as done:
+        yield done.value
+
+
+def _process_action(session_id: str, player_name: str, action_text: str):
+    """
+    Turn logic shared by process_action and astream_action: a generator that
+    yields (prompt, persona_key) once, is sent the narration result and
+    returns the websocket payload. Turn claims and whispers return early.
+    """
     from .memory import get_memory, update_memory
 
     # Import here to avoid circular imports
@@ -433,20 +628,22 @@ def process_action(session_id: str, player_name: str, action_text: str):
     # Active player action (or freeform if no one has turn)
     recent = memory.get("recent_actions", [])[-4:]
     players = ", ".join(memory.get("players", [])) or "The heroes"
+    context = session_context(memory)
     
-    prompt = f"""
-Current scene: {memory.get("scene", "A mysterious tavern")}
-Players: {players}
-Active player: {active or "anyone"}
-Recent actions: {" | ".join(recent) if recent else "None yet"}
-{player_name} says: "{action_text}"
-
-Narrate the outcome in character. Keep under 100 words.
-"""
+    # Older turns live on in the rolling summary; the prompt stays within budget
+    prompt = "\n" + assemble_prompt([
+        PromptSection("scene", memory.get("scene", "A mysterious tavern"), priority=3, policy=HEAD, min_tokens=40, label="Current scene"),
+        PromptSection("players", players, policy=KEEP, label="Players"),
+        PromptSection("active", active or "anyone", policy=KEEP, label="Active player"),
+        *context.sections(),
+        PromptSection("action", f'{player_name} says: "{action_text}"', policy=KEEP),
+        PromptSection("instructions", "\nNarrate the outcome in character. Keep under 100 words.", policy=KEEP),
+    ], settings.prompt_token_budget).text + "\n"
     
-    result = generate_narration_with_persona(session_id, prompt, persona_key)
+    result = yield prompt, persona_key
     
     # Update recent actions
+    context.record_and_compact(f"{player_name}: {action_text} -> {result['text'][:160]}")
     new_actions = recent + [f"{player_name}: {action_text}"]
     memory["recent_actions"] = new_actions[-5:]
     update_memory(session_id, "recent_actions", memory["recent_actions"])
@@ -454,7 +651,8 @@ Narrate the outcome in character. Keep under 100 words.
     return {
         "type": "narration",
         "text": result["text"],
-        "audio_base64": result["audio_base64"],
+        "audio_url": result.get("audio_url"),
+        "audio_segments": result.get("audio_segments"),
         "active_player": active,
         "persona_name": result["persona_name"]
     }
@@ -0,0 +1,307 @@
+"""
+Append-only RNG draw log
+
+When a player disputes a roll, DiceSystem.roll_history (in memory, per
+instance) is all there is. A draw log keeps a durable record instead: one
+record per consuming call on a session stream, holding the stream's seed and
+generator version, the counter range the call consumed, the consumer name,
+its arguments and a digest of its result.
+
+Because session streams are counter-mode and seekable, that is enough to
+re-execute any resolution bit-exactly: rebuild the stream from its seed,
+seek to the logged counter and run the consumer again (see replay_records
+and scripts/replay_draw_log.py).
+
+Records are buffered in memory and written as gzip-compressed JSON
+segments of `segment_records` entries, so a roll costs one tuple append;
+only the newest `max_segments` segments per session are kept on disk.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .config import settings
+from .randomness import RandomMode, RandomSource
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = "voicedm.drawlog.v1"
+SEGMENT_SUFFIX = ".json.gz"
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+class DrawRecord(NamedTuple):
+    """One consuming call on a deterministic stream"""
+
+    seq: int
+    stream: str  # Seed of the stream drawn from
+    version: int  # Its deterministic generator (STREAM_COUNTER / STREAM_LEGACY)
+    start: int  # Counter before the call
+    end: int  # Counter after it
+    consumer: str  # Replayer name, e.g. "dice.roll"
+    args: Any
+    result: Any  # Digest the replay must reproduce
+
+    @property
+    def draws(self) -> int:
+        return self.end - self.start
+
+
+def session_directory(root: str, session_id: str) -> Path:
+    """Filesystem-safe, collision-free directory for a session's segments"""
+    digest = hashlib.sha256(session_id.encode()).hexdigest()[:8]
+    return Path(root) / f"{_UNSAFE.sub('_', session_id)[:48]}-{digest}"
+
+
+def totals_digest(totals: Iterable[int]) -> int:
+    """CRC32 of a batch's totals, for results too large to log whole"""
+    return zlib.crc32(",".join(str(int(total)) for total in totals).encode())
+
+
+class DrawLog:
+    """Bounded, segmented draw log for one session"""
+
+    def __init__(
+        self,
+        root: str,
+        session_id: str,
+        segment_records: int = 4096,
+        max_segments: int = 64,
+    ):
+        """
+        Args:
+            root: Directory holding every session's logs
+            session_id: Session whose draws are logged
+            segment_records: Records per segment file
+            max_segments: Segments kept; older ones are deleted
+        """
+        if segment_records <= 0 or max_segments <= 0:
+            raise ValueError("segment_records and max_segments must be positive")
+        self.session_id = session_id
+        self.directory = session_directory(root, session_id)
+        self.segment_records = segment_records
+        self.max_segments = max_segments
+        self._buffer: List[tuple] = []  # (rng, start, end, consumer, args, result)
+        self._lock = threading.Lock()
+        self.bytes_written = 0
+
+        # Resume numbering after an existing log (e.g. across restarts)
+        segments = self.segments()
+        self._next_segment = self._segment_index(segments[-1]) + 1 if segments else 0
+        self._first_seq = 0  # Sequence number of the first buffered record
+        if segments:
+            document = self._load_segment(segments[-1])
+            self._first_seq = document["first_seq"] + len(document["records"])
+
+    @staticmethod
+    def _segment_index(path: Path) -> int:
+        return int(path.name[: -len(SEGMENT_SUFFIX)])
+
+    def segments(self) -> List[Path]:
+        """Segment files on disk, oldest first"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"), key=self._segment_index)
+
+    def record(self, rng: RandomSource, start: int, consumer: str, args: Any, result: Any) -> None:
+        """Log a call that drew from `rng` starting at counter `start`"""
+        with self._lock:
+            self._buffer.append((rng, start, rng.position, consumer, args, result))
+            if len(self._buffer) >= self.segment_records:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write buffered records out as a segment"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        # Seeds repeat on every record, so each segment lists its streams once
+        streams: List[list] = []
+        stream_index: Dict[int, int] = {}
+        rows = []
+        for rng, start, end, consumer, args, result in self._buffer:
+            index = stream_index.get(id(rng))
+            if index is None:
+                index = stream_index[id(rng)] = len(streams)
+                streams.append([rng.seed, rng.stream_version])
+            rows.append([index, start, end, consumer, args, result])
+        document = {
+            "format": LOG_FORMAT,
+            "session_id": self.session_id,
+            "first_seq": self._first_seq,
+            "streams": streams,
+            "records": rows,
+        }
+        data = gzip.compress(_ENCODER.encode(document).encode(), compresslevel=6)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self._next_segment:08d}{SEGMENT_SUFFIX}"
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            logger.exception("Could not write draw log segment %s", path)
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self._next_segment += 1
+        self._first_seq += len(self._buffer)
+        self.bytes_written += len(data)
+        self._buffer = []
+
+        for stale in self.segments()[: -self.max_segments]:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _load_segment(path: Path) -> Dict[str, Any]:
+        with gzip.open(path, "rb") as handle:
+            document = json.loads(handle.read())
+        if document.get("format") != LOG_FORMAT:
+            raise ValueError(f"{path} is not a {LOG_FORMAT} segment")
+        return document
+
+    @classmethod
+    def _read_segment(cls, path: Path) -> Iterator[DrawRecord]:
+        document = cls._load_segment(path)
+        streams = document["streams"]
+        for offset, (index, start, end, consumer, args, result) in enumerate(document["records"]):
+            seed, version = streams[index]
+            yield DrawRecord(document["first_seq"] + offset, seed, version, start, end, consumer, args, result)
+
+    def records(self) -> Iterator[DrawRecord]:
+        """Every retained record, oldest first, including unflushed ones"""
+        for path in self.segments():
+            yield from self._read_segment(path)
+        with self._lock:
+            buffered = [
+                DrawRecord(self._first_seq + offset, rng.seed, rng.stream_version, start, end, consumer, args, result)
+                for offset, (rng, start, end, consumer, args, result) in enumerate(self._buffer)
+            ]
+        yield from buffered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "records": self._first_seq + len(self._buffer),
+            "buffered": len(self._buffer),
+            "segments": len(self.segments()),
+            "bytes_written": self.bytes_written,
+            "directory": str(self.directory),
+        }
+
+
+_logs: Dict[str, DrawLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_draw_log(session_id: str) -> Optional[DrawLog]:
+    """The session's draw log, or None when settings.draw_log_dir is unset"""
+    if not settings.draw_log_dir:
+        return None
+    log = _logs.get(session_id)
+    if log is None:
+        with _logs_lock:
+            log = _logs.get(session_id)
+            if log is None:
+                log = DrawLog(
+                    settings.draw_log_dir,
+                    session_id,
+                    settings.draw_log_segment_records,
+                    settings.draw_log_max_segments,
+                )
+                _logs[session_id] = log
+    return log
+
+
+def close_draw_log(session_id: str) -> None:
+    """Flush a session's log and forget it (its segments stay on disk)"""
+    with _logs_lock:
+        log = _logs.pop(session_id, None)
+    if log is not None:
+        log.flush()
+
+
+def flush_draw_logs() -> None:
+    for log in list(_logs.values()):
+        log.flush()
+
+
+atexit.register(flush_draw_logs)
+
+
+# Replay
+
+def _replay_roll(rng: RandomSource, args: Any) -> Any:
+    from .dice import DiceSystem
+
+    result = DiceSystem(rng=rng).roll(args)
+    return [result.total, result.rolls]
+
+
+def _replay_roll_many(rng: RandomSource, args: Any) -> Any:
+    from .dice import DiceSystem
+
+    expression, count = args
+    batch = DiceSystem(rng=rng).roll_many(expression, count)
+    return [batch.count, totals_digest(batch.totals)]
+
+
+REPLAYERS: Dict[str, Callable[[RandomSource, Any], Any]] = {
+    "dice.roll": _replay_roll,
+    "dice.roll_many": _replay_roll_many,
+}
+
+
+class ReplayMismatch(NamedTuple):
+    record: DrawRecord
+    actual: Any
+    end: int  # Counter the replay finished at
+
+
+def replay_records(records: Iterable[DrawRecord]) -> Dict[str, Any]:
+    """
+    Re-execute logged calls and compare them with the log.
+
+    Returns:
+        Counts of replayed records, mismatches (result or consumed draws
+        differ) and records whose consumer has no replayer
+    """
+    replayed = 0
+    mismatches: List[ReplayMismatch] = []
+    unknown: List[DrawRecord] = []
+    for record in records:
+        replayer = REPLAYERS.get(record.consumer)
+        if replayer is None:
+            unknown.append(record)
+            continue
+        rng = RandomSource(record.stream, RandomMode.DETERMINISTIC, record.version)
+        rng.seek(record.start)
+        actual = replayer(rng, record.args)
+        replayed += 1
+        if actual != record.result or rng.position != record.end:
+            mismatches.append(ReplayMismatch(record, actual, rng.position))
+    return {
+        "replayed": replayed,
+        "matched": replayed - len(mismatches),
+        "mismatches": mismatches,
+        "unknown": unknown,
+    }
@@ -4,6 +4,7 @@ import random
 from typing import Any, Dict, List, Optional
 
 from server.engine.shard_engine import MemythicEvent, Shard
+from server.randomness import RandomSource
 
 
 @dataclass
@@ -28,8 +29,16 @@ class MemythicEngine:
         ("order", "chaos"): -0.2,
     }
 
-    def __init__(self, shard: Shard, db_session: Optional[Any] = None, world_id: Optional[str] = None):
+    def __init__(
+        self,
+        shard: Shard,
+        db_session: Optional[Any] = None,
+        world_id: Optional[str] = None,
+        rng: Optional[RandomSource] = None,
+    ):
         self.shard = shard
+        # A "fluctuation" stream makes world ticks replayable; module random otherwise.
+        self.rng = rng
         self.db = db_session
         self.world_id = world_id or shard.world_id
         self.symbol_history: List[Dict[str, Any]] = []
@@ -128,8 +137,12 @@ class MemythicEngine:
         self.shard.memythic_charge = max(0.0, self.shard.memythic_charge - decay)
 
         for symbol in self.shard.symbols.values():
-            symbol.charge = max(0.0, symbol.charge + random.uniform(-0.02, 0.02))
-            if random.random() < 0.1:
+            if self.rng is not None:
+                drift, roll = self.rng.rand_float(-0.02, 0.02), self.rng.rand_float()
+            else:
+                drift, roll = random.uniform(-0.02, 0.02), random.random()
+            symbol.charge = max(0.0, symbol.charge + drift)
+            if roll < 0.1:
                 self._spontaneous_resonance(symbol)
 
         self.shard._update_stability()
@@ -145,7 +158,7 @@ class MemythicEngine:
         if not others:
             return
 
-        other = random.choice(others)
+        other = self.rng.choice(others) if self.rng is not None else random.choice(others)
         for (arch1, arch2), value in self.RESONANCE_PAIRS.items():
             if (symbol.archetype == arch1 and other.archetype == arch2) or (
                 symbol.archetype == arch2 and other.archetype == arch1
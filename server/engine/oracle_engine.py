@@ -5,6 +5,8 @@ import logging
 import random
 from typing import Dict, List, Optional
 
+from server.randomness import RandomSource
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,16 +58,27 @@ class OracleEngine:
         tuple(sorted(["throne", "chain"])): "Power binds as much as it elevates",
     }
 
-    def __init__(self):
+    def __init__(self, rng: Optional[RandomSource] = None):
         self.symbol_deck = self.SYMBOLS.copy()
         self.draw_history: List[Dict[str, Optional[str]]] = []
+        # A session's "oracle" stream makes draws replayable; module random otherwise.
+        self.rng = rng
+
+    def _choice(self, items):
+        return self.rng.choice(items) if self.rng is not None else random.choice(items)
+
+    def _uniform(self, low: float, high: float) -> float:
+        return self.rng.rand_float(low, high) if self.rng is not None else random.uniform(low, high)
 
     def draw_symbol(self, intent: Optional[OracleIntent] = None, context: Optional[str] = None) -> SymbolDraw:
         if not self.symbol_deck:
-            self.symbol_deck = self.SYMBOLS.copy()
-            random.shuffle(self.symbol_deck)
+            if self.rng is not None:
+                self.symbol_deck = self.rng.shuffle(self.SYMBOLS)
+            else:
+                self.symbol_deck = self.SYMBOLS.copy()
+                random.shuffle(self.symbol_deck)
 
-        symbol_data = random.choice(self.symbol_deck)
+        symbol_data = self._choice(self.symbol_deck)
         self.symbol_deck.remove(symbol_data)
 
         meaning = self._interpret_symbol(symbol_data, intent, context)
@@ -92,7 +105,7 @@ class OracleEngine:
         return draw
 
     def _interpret_symbol(self, symbol_data: Dict[str, object], intent: Optional[OracleIntent], context: Optional[str]) -> str:
-        base_meaning = random.choice(symbol_data["meanings"])  # type: ignore[index]
+        base_meaning = self._choice(symbol_data["meanings"])  # type: ignore[index]
         if intent == OracleIntent.CLARITY:
             return f"{base_meaning} becomes clear"
         if intent == OracleIntent.DIRECTION:
@@ -130,7 +143,7 @@ class OracleEngine:
 
         if context and len(context) > 50:
             base += 0.1
-        return min(1.0, base + random.uniform(-0.1, 0.1))
+        return min(1.0, base + self._uniform(-0.1, 0.1))
 
     def get_spread(self, count: int = 3, intent: Optional[OracleIntent] = None) -> List[SymbolDraw]:
         return [self.draw_symbol(intent) for _ in range(max(1, count))]
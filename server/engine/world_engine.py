@@ -37,6 +37,7 @@ from server.engine.services import NarrativeService, PartyService, WorldService
 from server.engine.thread_engine import ThreadEngine
 from server.engine.veil_engine import VeilEngine
 from server.mechanics.dice import DiceEngine, RandomnessMode
+from server.randomness import get_stream_registry
 
 logger = logging.getLogger(__name__)
 
@@ -56,11 +57,23 @@ class WorldEngine:
         self.shard = shard_engine
         self.shard_state = shard_engine.get_or_create_shard_for_world(world_id)
 
-        base_oracle = OracleEngine()
+        # Deterministic worlds draw oracle symbols and fluctuations from
+        # checkpointable per-world streams so a tick sequence can be replayed.
+        streams = None
+        if config.RANDOMNESS_MODE == "det":
+            seed = f"{config.RANDOMNESS_SEED}:{world_id}" if config.RANDOMNESS_SEED else None
+            streams = get_stream_registry().get(f"world:{world_id}", seed=seed)
+
+        base_oracle = OracleEngine(rng=streams.stream("oracle") if streams else None)
         self.registry.register("oracle", base_oracle)
         self.oracle = self.registry.get("oracle")
 
-        self.registry.register("memythic", MemythicEngine(self.shard_state, db_session=db, world_id=world_id))
+        self.registry.register("memythic", MemythicEngine(
+            self.shard_state,
+            db_session=db,
+            world_id=world_id,
+            rng=streams.stream("fluctuation") if streams else None,
+        ))
         self.memythic = self.registry.get("memythic")
 
         self.registry.register("anchor", AnchorEngine(db, world_id))
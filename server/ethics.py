@@ -4,6 +4,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_INPUT_LENGTH = 500
+
+# (pattern, description, trigger literals) - every match of a pattern starts
+# with one of its triggers, which lets server.text_analyzer find candidates in
+# its single pass and only run the full regex at those positions.
+PROBLEMATIC_PATTERNS = [
+    (r"\b(hack|exploit|cheat|bypass)\s+(system|game|dice|roll)", "Attempting to manipulate game systems",
+     ("hack", "exploit", "cheat", "bypass")),
+    (r"\b(dox|personal info|address|phone|real name)\b", "Sharing personal information",
+     ("dox", "personal info", "address", "phone", "real name")),
+    (r"\b(racist|sexist|homophobic|transphobic)\b", "Discriminatory language",
+     ("racist", "sexist", "homophobic", "transphobic")),
+    (r"<script|javascript:|onload=|onerror=", "Potential XSS attempt",
+     ("<script", "javascript:", "onload=", "onerror=")),
+]
+
+_COMPILED_PATTERNS = [(re.compile(pattern), description) for pattern, description, _ in PROBLEMATIC_PATTERNS]
+
 def detect_railroading(actions: List[str], outcomes: List[str], threshold: int = 3) -> Dict[str, Any]:
     """
     Detect potential railroading patterns in recent actions/outcomes.
@@ -62,23 +80,17 @@ def validate_player_input(text: str) -> Dict[str, Any]:
     if not text or len(text.strip()) == 0:
         return {"valid": False, "issues": ["Empty input"], "sanitized": ""}
     
-    if len(text) > 500:
-        issues.append(f"Input too long ({len(text)} chars, max 500)")
+    if len(text) > MAX_INPUT_LENGTH:
+        issues.append(f"Input too long ({len(text)} chars, max {MAX_INPUT_LENGTH})")
     
     # Check for potential issues (basic content moderation)
-    problematic_patterns = [
-        (r"\b(hack|exploit|cheat|bypass)\s+(system|game|dice|roll)", "Attempting to manipulate game systems"),
-        (r"\b(dox|personal info|address|phone|real name)\b", "Sharing personal information"),
-        (r"\b(racist|sexist|homophobic|transphobic)\b", "Discriminatory language"),
-        (r"<script|javascript:|onload=|onerror=", "Potential XSS attempt"),
-    ]
-    
-    for pattern, description in problematic_patterns:
-        if re.search(pattern, text.lower()):
+    text_lower = text.lower()
+    for pattern, description in _COMPILED_PATTERNS:
+        if pattern.search(text_lower):
             issues.append(description)
     
     # Sanitize (basic)
-    sanitized = text[:500].strip()  # Simple truncation for now
+    sanitized = text[:MAX_INPUT_LENGTH].strip()  # Simple truncation for now
     
     return {
         "valid": len(issues) == 0,
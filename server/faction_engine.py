@@ -1,18 +1,109 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Set, Tuple
+
+from .text_analyzer import PhraseMatcher
+
+# Private world-graph key holding the cached FactionIndex
+INDEX_KEY = "_faction_index"
+
+
+class FactionIndex:
+    """
+    Keyword -> faction inverted index over one world graph's factions.
+
+    Faction names and goals are compiled into a single PhraseMatcher, so one
+    scan of the action text finds every mentioned faction; territories are a
+    plain hash lookup on the event location.
+    """
+
+    def __init__(self, factions: Dict[str, Dict[str, Any]]):
+        self.faction_ids = frozenset(factions)
+        self.by_name: Dict[str, Set[str]] = {}
+        self.by_goal: Dict[str, Set[str]] = {}
+        self.by_territory: Dict[str, Set[str]] = {}
+
+        for faction_id, faction in factions.items():
+            name = str(faction.get("name", "")).lower()
+            if name:
+                self.by_name.setdefault(name, set()).add(faction_id)
+            for goal in faction.get("goals", []):
+                goal = str(goal).lower()
+                if goal:
+                    self.by_goal.setdefault(goal, set()).add(faction_id)
+            for territory in faction.get("territory", []):
+                self.by_territory.setdefault(str(territory).lower(), set()).add(faction_id)
+
+        self._matcher = PhraseMatcher(list(self.by_name) + list(self.by_goal))
+
+    def is_current(self, factions: Dict[str, Any]) -> bool:
+        """Cheap guard against factions added or removed behind our back."""
+        return factions.keys() == self.faction_ids
+
+    def lookup(self, action_text: str, location: str) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Return (named, goal-aligned, territory) faction ids for one event."""
+        named: Set[str] = set()
+        aligned: Set[str] = set()
+        for keyword in self._matcher.find_all(action_text):
+            named.update(self.by_name.get(keyword, ()))
+            aligned.update(self.by_goal.get(keyword, ()))
+        territory = self.by_territory.get(location, set()) if location else set()
+        return named, aligned, territory
 
 
 class FactionEngine:
-    def __init__(self, world_state: Dict[str, Any]):
+    def __init__(self, world_state: Dict[str, Any], use_index: bool = True):
+        # use_index=False scores each faction by scanning its keywords (the
+        # reference path), for benchmarks and cross-checks
         self.world = world_state
+        self.use_index = use_index
         self.factions = world_state.setdefault("factions", {})
         self.world.setdefault("faction_log", [])
 
+    @property
+    def index(self) -> FactionIndex:
+        """Inverted index cached on the world graph, rebuilt when factions change."""
+        index = self.world.get(INDEX_KEY)
+        if index is None or not index.is_current(self.factions):
+            index = FactionIndex(self.factions)
+            self.world[INDEX_KEY] = index
+        return index
+
+    def invalidate_index(self) -> None:
+        """Drop the cached index after editing a faction's name, goals or territory."""
+        self.world.pop(INDEX_KEY, None)
+
+    def set_faction(self, faction_id: str, faction: Dict[str, Any]) -> None:
+        """Add or replace a faction and refresh the keyword index."""
+        self.factions[faction_id] = faction
+        self.invalidate_index()
+
+    def remove_faction(self, faction_id: str) -> None:
+        self.factions.pop(faction_id, None)
+        self.invalidate_index()
+
     def apply_event_impact(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Update factions based on player action and return a delta log."""
         deltas: List[Dict[str, Any]] = []
 
+        action_type = event.get("action_type", "neutral")
+        if self.use_index:
+            named, aligned, territory = self.index.lookup(
+                event.get("action_text", "").lower(),
+                event.get("location", "").lower(),
+            )
+        C = float(event.get("C", 0.0))
+        D = float(event.get("D", 0.0))
+
+        # Only 8 keyword combinations exist, so score each at most once
+        impacts: Dict[Tuple[bool, bool, bool], float] = {}
+
         for faction_id, faction in self.factions.items():
-            impact = self._calculate_faction_impact(event, faction)
+            if self.use_index:
+                key = (faction_id in named, faction_id in territory, faction_id in aligned)
+                impact = impacts.get(key)
+                if impact is None:
+                    impact = impacts[key] = self._score_impact(action_type, *key, C, D)
+            else:
+                impact = self._calculate_faction_impact(event, faction)
             if impact == 0:
                 continue
 
@@ -55,7 +146,34 @@ class FactionEngine:
         self.world["faction_balance"] = snapshot
         return snapshot
 
+    @staticmethod
+    def _score_impact(action_type: str, named: bool, in_territory: bool, aligned: bool, C: float, D: float) -> float:
+        # Same arithmetic, in the same order, as _calculate_faction_impact
+        impact = 0.0
+
+        if named:
+            if action_type == "disrupt":
+                impact -= 0.3
+            elif action_type == "coop":
+                impact += 0.2
+
+        if in_territory and action_type == "disrupt":
+            impact -= 0.1
+
+        if aligned:
+            impact += 0.15
+
+        impact += (C - D) * 0.03
+
+        if impact > 0.4:
+            impact = 0.4
+        if impact < -0.4:
+            impact = -0.4
+
+        return round(impact, 3)
+
     def _calculate_faction_impact(self, event: Dict[str, Any], faction: Dict[str, Any]) -> float:
+        """Score a single faction by scanning its keywords (reference path)."""
         action_type = event.get("action_type", "neutral")
         action_text = event.get("action_text", "").lower()
         location = event.get("location", "").lower()
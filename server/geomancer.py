@@ -0,0 +1,83 @@
+"""
+Sliding-window statistics for the geomancer
+
+Keeps the last N action types in a deque together with running counts and a
+running sum of c*log(c), so recording an action and reading the Shannon
+entropy of the window are both O(1):
+
+    H = log(N) - (1/N) * sum(c * log(c))
+"""
+
+import math
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List
+
+DEFAULT_WINDOW_SIZE = 20
+ACTION_TYPES = ("coop", "disrupt", "neutral")
+
+
+class GeomancerWindow:
+    """Fixed-size history of action types with incremental counts and entropy."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE, history: Iterable[str] = ()):
+        if size < 1:
+            raise ValueError("Geomancer window size must be at least 1")
+        self._items: Deque[str] = deque(maxlen=size)
+        self._counts: Dict[str, int] = {}
+        # c*log(c) for every count the window can hold
+        self._clogc = [0.0] + [c * math.log(c) for c in range(1, size + 1)]
+        self._clogc_sum = 0.0
+        for action_type in history:
+            self.push(action_type)
+
+    @property
+    def size(self) -> int:
+        return self._items.maxlen
+
+    def push(self, action_type: str) -> None:
+        """Record an action, evicting the oldest one once the window is full."""
+        if len(self._items) == self._items.maxlen:
+            self._adjust(self._items[0], -1)
+        self._items.append(action_type)
+        self._adjust(action_type, 1)
+
+    def _adjust(self, action_type: str, delta: int) -> None:
+        old = self._counts.get(action_type, 0)
+        new = old + delta
+        self._clogc_sum += self._clogc[new] - self._clogc[old]
+        if new:
+            self._counts[action_type] = new
+        else:
+            del self._counts[action_type]
+
+    def count(self, action_type: str) -> int:
+        return self._counts.get(action_type, 0)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {action_type: self.count(action_type) for action_type in ACTION_TYPES}
+
+    @property
+    def entropy(self) -> float:
+        total = len(self._items)
+        if total == 0:
+            return 0.0
+        # Clamp tiny negative values left by floating point cancellation
+        return max(0.0, math.log(total) - self._clogc_sum / total)
+
+    def resize(self, size: int) -> None:
+        """Change the window size, keeping the most recent actions."""
+        recent = list(self._items)[-size:] if size > 0 else []
+        self.__init__(size, recent)
+
+    def to_list(self) -> List[str]:
+        return list(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __repr__(self) -> str:
+        return f"GeomancerWindow(size={self.size}, counts={self.counts})"
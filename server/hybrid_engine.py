@@ -11,52 +11,175 @@ Design Philosophy:
 This makes the system:
 - Safe (LLM can't make ethical mistakes)
 - Cheap (minimal tokens)
-- Resilient (degrades gracefully)
+- Resilient (degrades gracefully; a tripped circuit breaker switches
+  narration to TEMPLATE until the provider recovers)
 - Auditable (template base is deterministic)
 """
 
+import hashlib
 import logging
-from typing import Optional
+import random
+from typing import AsyncIterator, List, Optional
 
 from .config import NarrationMode, settings
-from .template_engine import render_template
+from .narration_stream import rechunk
+from .polish_cache import PolishCache
+from .polish_tables import PolishTables
+from .prompt_context import HEAD, KEEP, PromptSection, assemble_prompt
+from .template_engine import TemplateRender, draw_template
 
 logger = logging.getLogger(__name__)
 
+POLISH_SYSTEM_PROMPT = "You are a narrative polisher. Preserve meaning, enhance style."
+
+# Template renders repeat, so polished text is cached by content
+polish_cache = PolishCache(
+    max_entries=settings.polish_cache_size,
+    ttl=settings.polish_cache_ttl,
+    path=settings.polish_cache_path or None,
+)
+
+
+_polish_tables: Optional[PolishTables] = None
+_polish_tables_loaded = False
+
+
+def get_polish_tables() -> Optional[PolishTables]:
+    """Precomputed polish tables from settings.polish_tables_path, loaded once."""
+    global _polish_tables, _polish_tables_loaded
+    if not _polish_tables_loaded:
+        _polish_tables_loaded = True
+        if settings.polish_tables_path:
+            try:
+                _polish_tables = PolishTables.load(settings.polish_tables_path)
+                logger.info(f"Loaded {len(_polish_tables)} precomputed polish cells")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Polish tables unavailable, polishing live: {e}")
+    return _polish_tables
+
+
+def set_polish_tables(tables: Optional[PolishTables]) -> None:
+    """Install tables directly (tests, hot reload); None disables them."""
+    global _polish_tables, _polish_tables_loaded
+    _polish_tables = tables
+    _polish_tables_loaded = True
+
+
+def _precomputed_polish(draw: TemplateRender, rng=None) -> Optional[str]:
+    """Narration built from a precomputed prose variant, if the cell is covered."""
+    tables = get_polish_tables()
+    if tables is None:
+        return None
+    variants = tables.variants(draw.cell, _persona_fingerprint(draw.tone))
+    if not variants:
+        return None
+    return draw.compose(variants[(rng or random).randint(0, len(variants) - 1)])
+
+
+def _persona_fingerprint(tone: str) -> str:
+    """Changes whenever the polish prompt or the persona definition changes."""
+    try:
+        from .llm import PERSONAS
+
+        persona = PERSONAS.get(tone)
+    except ImportError:
+        persona = None
+    payload = f"{POLISH_SYSTEM_PROMPT}\x1f{sorted(persona.items()) if persona else tone}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def effective_narration_mode(asynchronous: bool = False) -> NarrationMode:
+    """
+    The configured mode, or TEMPLATE while the breaker guarding the LLM path
+    (the sync client, or the gateway's default provider) rejects calls.
+    """
+    mode = settings.narration_mode
+    if mode == NarrationMode.TEMPLATE:
+        return mode
+    breaker = _llm_breaker(asynchronous)
+    if breaker is not None and not breaker.available:
+        logger.debug(f"{breaker.name} circuit open, narrating from templates")
+        return NarrationMode.TEMPLATE
+    return mode
+
+
+def _llm_breaker(asynchronous: bool):
+    if asynchronous:
+        from .llm_gateway import current_gateway
+
+        gateway = current_gateway()
+        return gateway.breaker() if gateway is not None else None
+    try:
+        from .llm import sync_breaker
+    except ImportError:
+        return None
+    return sync_breaker
+
+
+def _polish_prompt(text: str, tone: str) -> str:
+    return f"""Rewrite this game narration in a {tone} tone. Keep the same meaning and all options. Make it flow naturally.
+
+Original:
+{text}
+
+Rewritten:"""
+
+
+def _llm_prompt(
+    frame_key: str,
+    tone: str,
+    scene_context: str,
+    player_action: str,
+    history: Optional[List[PromptSection]] = None,
+) -> str:
+    """Full-generation prompt, fitted into settings.prompt_token_budget."""
+    sections = [
+        PromptSection("scene", scene_context, priority=3, policy=HEAD, min_tokens=40, label="SCENE"),
+        *(history or []),
+        PromptSection("action", player_action, policy=KEEP, label="PLAYER ACTION"),
+        PromptSection("frame", frame_key, policy=KEEP, label="FRAME"),
+        PromptSection(
+            "instructions",
+            f"\nNarrate what happens next in a {tone} style. Then offer 2-4 meaningful choices.\nKeep under 150 words.",
+            policy=KEEP,
+        ),
+    ]
+    return f"\n{assemble_prompt(sections, settings.prompt_token_budget).text}\n"
+
 
 def _try_llm_polish(text: str, tone: str) -> Optional[str]:
     """
     Attempt to polish template output with LLM.
     Returns None on any failure (API key missing, rate limit, etc.)
     """
+    fingerprint = _persona_fingerprint(tone)
+    cached = polish_cache.get(text, tone, settings.openai_model, fingerprint)
+    if cached is not None:
+        return cached
+
     if not settings.openai_api_key or not settings.openai_api_key.startswith("sk-"):
         logger.debug("No valid OpenAI API key, skipping LLM polish")
         return None
 
     try:
-        from .llm import get_client
+        from .llm import _chat, get_client
 
         client = get_client()
 
-        polish_prompt = f"""Rewrite this game narration in a {tone} tone. Keep the same meaning and all options. Make it flow naturally.
-
-Original:
-{text}
-
-Rewritten:"""
-
-        response = client.chat.completions.create(
-            model=settings.openai_model,
+        # Bounded by the request deadline and guarded by the sync breaker
+        polished = _chat(
+            client,
+            settings.openai_model,
+            [
+                {"role": "system", "content": POLISH_SYSTEM_PROMPT},
+                {"role": "user", "content": _polish_prompt(text, tone)},
+            ],
             temperature=0.7,
             max_tokens=300,
-            messages=[
-                {"role": "system", "content": "You are a narrative polisher. Preserve meaning, enhance style."},
-                {"role": "user", "content": polish_prompt},
-            ],
-        )
-
-        polished = response.choices[0].message.content.strip()
+        ).strip()
         logger.debug(f"LLM polish successful ({len(polished)} chars)")
+        if polished:
+            polish_cache.put(text, tone, settings.openai_model, polished, fingerprint)
         return polished
 
     except Exception as e:
@@ -64,12 +187,42 @@ Rewritten:"""
         return None
 
 
+async def _atry_llm_polish(text: str, tone: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Async _try_llm_polish through the pooled gateway; None on any failure or deadline."""
+    from .llm_gateway import ChatRequest, gateway_available, get_gateway
+
+    fingerprint = _persona_fingerprint(tone)
+    cached = polish_cache.get(text, tone, settings.openai_model, fingerprint)
+    if cached is not None:
+        return cached
+
+    if not gateway_available():
+        logger.debug("No LLM gateway available, skipping LLM polish")
+        return None
+
+    try:
+        request = ChatRequest.from_prompt(
+            POLISH_SYSTEM_PROMPT, _polish_prompt(text, tone), temperature=0.7, max_tokens=300
+        )
+        polished = await get_gateway().complete(request, timeout=timeout)
+        logger.debug(f"LLM polish successful ({len(polished)} chars)")
+        if polished:
+            polish_cache.put(text, tone, settings.openai_model, polished, fingerprint)
+        return polished or None
+
+    except Exception as e:
+        logger.warning(f"LLM polish failed (falling back to template): {e!r}")
+        return None
+
+
 def generate_narrative(
     frame_key: str,
     tone: str = "classic",
     scene_context: str = "",
     player_action: str = "",
     imagination_signals: list = None,
+    history: Optional[List[PromptSection]] = None,
+    rng=None,
 ) -> str:
     """
     Generate narrative using the configured narration mode.
@@ -78,22 +231,25 @@ def generate_narrative(
     - TEMPLATE: Pure templates, instant, zero dependencies
     - HYBRID: Templates + optional LLM polish (degrades gracefully)
     - LLM: Full LLM generation (legacy mode, requires API key)
+
+    `history` (campaign context sections) only reaches the LLM mode prompt;
+    polish never sees it. `rng` is the session's random stream for template
+    draws (randint(a, b)); the random module when omitted.
     """
-    mode = settings.narration_mode
+    mode = effective_narration_mode()
 
-    template_output = render_template(
-        frame_key=frame_key,
-        tone=tone,
-        scene_context=scene_context,
-        player_action=player_action,
-        imagination_signals=imagination_signals,
-    )
+    draw = draw_template(frame_key, tone, rng)
+    template_output = draw.compose()
 
     if mode == NarrationMode.TEMPLATE:
         logger.debug(f"Template mode: {len(template_output)} chars")
         return template_output
 
     if mode == NarrationMode.HYBRID:
+        precomputed = _precomputed_polish(draw, rng)
+        if precomputed:
+            logger.debug("Hybrid mode: precomputed polish applied")
+            return precomputed
         polished = _try_llm_polish(template_output, tone)
         if polished:
             logger.debug("Hybrid mode: LLM polish applied")
@@ -105,15 +261,7 @@ def generate_narrative(
         try:
             from .llm import generate_text
 
-            prompt = f"""
-SCENE: {scene_context}
-PLAYER ACTION: {player_action}
-FRAME: {frame_key}
-
-Narrate what happens next in a {tone} style. Then offer 2-4 meaningful choices.
-Keep under 150 words.
-"""
-            result = generate_text(tone, prompt)
+            result = generate_text(tone, _llm_prompt(frame_key, tone, scene_context, player_action, history))
             logger.debug(f"LLM mode: Full generation ({len(result)} chars)")
             return result
 
@@ -124,17 +272,168 @@ Keep under 150 words.
     return template_output
 
 
+async def agenerate_narrative(
+    frame_key: str,
+    tone: str = "classic",
+    scene_context: str = "",
+    player_action: str = "",
+    imagination_signals: list = None,
+    history: Optional[List[PromptSection]] = None,
+    timeout: Optional[float] = None,
+    rng=None,
+) -> str:
+    """
+    Async generate_narrative for event-loop callers.
+
+    Same modes and fallbacks; LLM calls go through the pooled gateway and
+    `timeout` bounds each one (queueing included).
+    """
+    mode = effective_narration_mode(asynchronous=True)
+
+    draw = draw_template(frame_key, tone, rng)
+    template_output = draw.compose()
+
+    if mode == NarrationMode.HYBRID:
+        precomputed = _precomputed_polish(draw, rng)
+        if precomputed:
+            logger.debug("Hybrid mode: precomputed polish applied")
+            return precomputed
+        polished = await _atry_llm_polish(template_output, tone, timeout=timeout)
+        if polished:
+            logger.debug("Hybrid mode: LLM polish applied")
+            return polished
+        logger.debug("Hybrid mode: Using template (LLM unavailable)")
+        return template_output
+
+    if mode == NarrationMode.LLM:
+        try:
+            from .llm import agenerate_text
+
+            result = await agenerate_text(
+                tone, _llm_prompt(frame_key, tone, scene_context, player_action, history), timeout=timeout
+            )
+            logger.debug(f"LLM mode: Full generation ({len(result)} chars)")
+            return result
+
+        except Exception as e:
+            logger.warning(f"LLM mode failed, falling back to template: {e!r}")
+            return template_output
+
+    return template_output
+
+
+async def astream_narrative(
+    frame_key: str,
+    tone: str = "classic",
+    scene_context: str = "",
+    player_action: str = "",
+    imagination_signals: list = None,
+    history: Optional[List[PromptSection]] = None,
+    granularity: str = "sentence",
+    timeout: Optional[float] = None,
+    rng=None,
+) -> AsyncIterator[str]:
+    """
+    Streaming agenerate_narrative: yields sentence (or raw token) chunks.
+
+    Cached, precomputed and template narration arrive at once; live LLM
+    output is forwarded as it streams. If the model fails before its first
+    chunk the template is streamed instead; a failure mid-stream ends the
+    narration at what was already sent.
+    """
+    async for chunk in rechunk(
+        _astream_narrative(frame_key, tone, scene_context, player_action, history, timeout, rng), granularity
+    ):
+        yield chunk
+
+
+async def _astream_narrative(
+    frame_key: str,
+    tone: str,
+    scene_context: str,
+    player_action: str,
+    history: Optional[List[PromptSection]],
+    timeout: Optional[float],
+    rng=None,
+) -> AsyncIterator[str]:
+    from .llm_gateway import ChatRequest, gateway_available, get_gateway
+
+    mode = effective_narration_mode(asynchronous=True)
+
+    draw = draw_template(frame_key, tone, rng)
+    template_output = draw.compose()
+
+    if mode == NarrationMode.HYBRID:
+        precomputed = _precomputed_polish(draw, rng)
+        if precomputed:
+            yield precomputed
+            return
+
+        fingerprint = _persona_fingerprint(tone)
+        cached = polish_cache.get(template_output, tone, settings.openai_model, fingerprint)
+        if cached is not None:
+            yield cached
+            return
+
+        if not gateway_available():
+            yield template_output
+            return
+
+        request = ChatRequest.from_prompt(
+            POLISH_SYSTEM_PROMPT, _polish_prompt(template_output, tone), temperature=0.7, max_tokens=300
+        )
+        chunks = get_gateway().stream(request, timeout=timeout)
+    elif mode == NarrationMode.LLM:
+        from .llm import astream_text
+
+        chunks = astream_text(tone, _llm_prompt(frame_key, tone, scene_context, player_action, history), timeout=timeout)
+    else:
+        yield template_output
+        return
+
+    streamed = []
+    try:
+        async for chunk in chunks:
+            streamed.append(chunk)
+            yield chunk
+    except Exception as e:
+        logger.warning(f"Narration stream failed after {len(streamed)} chunks: {e!r}")
+        if not streamed:
+            yield template_output
+        return
+
+    if not "".join(streamed).strip():
+        yield template_output
+    elif mode == NarrationMode.HYBRID:
+        polished = "".join(streamed).strip()
+        if polished:
+            polish_cache.put(template_output, tone, settings.openai_model, polished, fingerprint)
+
+
 def get_narration_stats() -> dict:
     """Get statistics about current narration mode."""
     from .template_engine import get_template_stats
 
     template_stats = get_template_stats()
 
+    try:
+        from .llm import breaker_stats, coalescing_stats
+
+        coalescing = coalescing_stats()
+        breakers = breaker_stats()
+    except ImportError:
+        coalescing = breakers = None
+
     return {
         "mode": settings.narration_mode.value,
+        "effective_mode": effective_narration_mode(asynchronous=True).value,
         "llm_available": bool(settings.openai_api_key and settings.openai_api_key.startswith("sk-")),
         "llm_model": settings.openai_model if settings.narration_mode == NarrationMode.LLM else None,
         "template_stats": template_stats,
+        "polish_cache": polish_cache.stats(),
+        "coalescing": coalescing,
+        "breakers": breakers,
+        "polish_tables": get_polish_tables().stats() if get_polish_tables() else None,
         "fallback_strategy": "templates" if settings.narration_mode != NarrationMode.TEMPLATE else "none_needed",
         "dependencies_required": 0 if settings.narration_mode == NarrationMode.TEMPLATE else 1,
     }
\ No newline at end of file
@@ -1,6 +1,9 @@
 from openai import OpenAI
 import os
-import base64
+
+from .circuit_breaker import CircuitBreaker, budget
+from .config import settings
+from .single_flight import SingleFlight, request_key
 
 # Lazy client initialization to avoid errors during import
 _client = None
@@ -14,6 +17,66 @@ def get_client():
         _client = OpenAI(api_key=api_key)
     return _client
 
+TTS_MODEL = "tts-1"
+
+# Concurrent identical blocking calls (from worker threads) share one request
+_sync_flights = SingleFlight("sync")
+
+# Breaker for the blocking client; the async gateway keeps one per provider
+sync_breaker = CircuitBreaker.from_settings("openai-sync")
+
+def _call_timeout() -> float:
+    """Per-call timeout for the blocking client, within the request deadline."""
+    timeout = budget(settings.llm_timeout)
+    if timeout <= 0:
+        raise TimeoutError("request deadline already passed")
+    return timeout
+
+def _chat(client, model: str, messages: list, temperature: float = None, max_tokens: int = None) -> str:
+    """One chat completion under the breaker, coalesced with identical in-flight calls."""
+    kwargs = {} if temperature is None else {"temperature": temperature}
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    key = request_key("chat", model, temperature, max_tokens, [(m["role"], m["content"]) for m in messages])
+    timeout = _call_timeout()
+
+    def call() -> str:
+        response = client.chat.completions.create(model=model, messages=messages, timeout=timeout, **kwargs)
+        return response.choices[0].message.content
+
+    return _sync_flights.run_sync(key, lambda: sync_breaker.call(call))
+
+def _speech(client, text: str, voice: str, model: str = TTS_MODEL) -> bytes:
+    """One TTS call under the breaker, coalesced with identical in-flight calls."""
+    key = request_key("speech", model, voice, text)
+    timeout = _call_timeout()
+    return _sync_flights.run_sync(
+        key,
+        lambda: sync_breaker.call(
+            lambda: client.audio.speech.create(model=model, voice=voice, input=text, timeout=timeout).content
+        ),
+    )
+
+def coalescing_stats() -> dict:
+    """Single-flight metrics for the sync client and the async gateway."""
+    from .llm_gateway import current_gateway
+
+    gateway = current_gateway()
+    return {
+        "sync": _sync_flights.stats(),
+        "gateway": gateway.flights.stats() if gateway is not None else None,
+    }
+
+def breaker_stats() -> dict:
+    """Circuit breaker state for the sync client and each gateway provider."""
+    from .llm_gateway import current_gateway
+
+    gateway = current_gateway()
+    return {
+        "sync": sync_breaker.stats(),
+        "gateway": gateway.breaker_stats() if gateway is not None else None,
+    }
+
 # === DM PERSONAS ===
 PERSONAS = {
     "classic": {
@@ -42,46 +105,43 @@ def generate_narration_with_persona(session_id: str, prompt: str, persona_key: s
     persona = PERSONAS.get(persona_key, PERSONAS["classic"])
     client = get_client()
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        temperature=0.8,
-        messages=[
+    text = _chat(
+        client,
+        "gpt-4o-mini",
+        [
             {"role": "system", "content": persona["system_prompt"]},
             {"role": "user", "content": prompt}
-        ]
-    )
-    text = response.choices[0].message.content.strip()
+        ],
+        temperature=0.8,
+    ).strip()
     
-    # Generate TTS audio
-    audio_response = client.audio.speech.create(
-        model="tts-1",
-        voice=persona["voice"],
-        input=text
+    # Generate TTS audio once per (text, voice, model); clients fetch it by URL
+    from .audio_cache import audio_cache
+
+    audio_url = audio_cache.get_or_synthesize(
+        text, persona["voice"], TTS_MODEL, lambda: _speech(client, text, persona["voice"])
     )
-    audio_bytes = audio_response.content
-    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
     
     return {
         "text": text,
-        "audio_base64": audio_base64,
+        "audio_url": audio_url,
         "voice": persona["voice"],
         "persona_name": persona["name"]
     }
 
 def generate_narration(prompt: str) -> str:
     client = get_client()
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": "You are a Dungeon Master narrating a fantasy adventure. Describe scenes vividly but briefly."},
-                  {"role": "user", "content": prompt}]
+    return _chat(
+        client,
+        "gpt-4o-mini",
+        [{"role": "system", "content": "You are a Dungeon Master narrating a fantasy adventure. Describe scenes vividly but briefly."},
+         {"role": "user", "content": prompt}]
     )
-    return response.choices[0].message.content
 
 def text_to_speech(text: str) -> bytes:
     # Returns audio bytes for client playback
     client = get_client()
-    response = client.audio.speech.create(model="tts-1", voice="alloy", input=text)
-    return response.content
+    return _speech(client, text, "alloy")
 
 def speech_to_text(audio_bytes: bytes) -> str:
     # For server-side STT if needed; MVP uses client-side
@@ -97,14 +157,81 @@ def generate_text(persona_key: str, prompt: str) -> str:
     persona = PERSONAS.get(persona_key, PERSONAS["classic"])
     client = get_client()
     
-    response = client.chat.completions.create(
-        model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        temperature=0.8,
-        messages=[
+    text = _chat(
+        client,
+        os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        [
             {"role": "system", "content": persona["system_prompt"]},
             {"role": "user", "content": prompt}
-        ]
+        ],
+        temperature=0.8,
     )
     
-    return response.choices[0].message.content.strip()
+    return text.strip()
 
+
+# === ASYNC VARIANTS (event-loop friendly, via the pooled gateway) ===
+
+async def agenerate_narration_with_persona(
+    session_id: str, prompt: str, persona_key: str = "classic", timeout: float = None, segmented: bool = False
+) -> dict:
+    """
+    Async generate_narration_with_persona; the event loop stays free while waiting.
+
+    With segmented=True the narration is synthesized sentence by sentence on
+    the TTS worker pool and the result carries ordered "audio_segments" URLs
+    instead of one "audio_url".
+    """
+    from .audio_cache import audio_cache
+    from .llm_gateway import ChatRequest, SpeechRequest, get_gateway
+
+    persona = PERSONAS.get(persona_key, PERSONAS["classic"])
+    gateway = get_gateway()
+
+    text = await gateway.complete(
+        ChatRequest.from_prompt(persona["system_prompt"], prompt, model="gpt-4o-mini"),
+        timeout=timeout,
+    )
+    result = {
+        "text": text,
+        "voice": persona["voice"],
+        "persona_name": persona["name"]
+    }
+
+    if segmented:
+        from .narration_stream import split_sentences
+        from .tts_pipeline import gateway_synthesizer, synthesize_segments
+
+        synthesize = gateway_synthesizer(persona["voice"], TTS_MODEL, timeout)
+        result["audio_segments"] = [
+            segment.audio_url
+            async for segment in synthesize_segments(split_sentences(text), persona["voice"], TTS_MODEL, synthesize)
+        ]
+        return result
+
+    speech = SpeechRequest(text=text, voice=persona["voice"], model=TTS_MODEL)
+    result["audio_url"] = await audio_cache.aget_or_synthesize(
+        text, speech.voice, speech.model, lambda: gateway.synthesize(speech, timeout=timeout)
+    )
+    return result
+
+async def agenerate_text(persona_key: str, prompt: str, timeout: float = None) -> str:
+    """Async generate_text."""
+    from .llm_gateway import ChatRequest, get_gateway
+
+    persona = PERSONAS.get(persona_key, PERSONAS["classic"])
+    return await get_gateway().complete(
+        ChatRequest.from_prompt(persona["system_prompt"], prompt, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini")),
+        timeout=timeout,
+    )
+
+async def astream_text(persona_key: str, prompt: str, timeout: float = None):
+    """Streaming generate_text; yields text chunks as the model produces them."""
+    from .llm_gateway import ChatRequest, get_gateway
+
+    persona = PERSONAS.get(persona_key, PERSONAS["classic"])
+    request = ChatRequest.from_prompt(
+        persona["system_prompt"], prompt, model=os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    )
+    async for chunk in get_gateway().stream(request, timeout=timeout):
+        yield chunk
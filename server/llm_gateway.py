@@ -0,0 +1,511 @@
+"""
+Async LLM Gateway - pooled, bounded, deadline-aware model access
+
+The synchronous OpenAI client blocks the event loop for the full length of a
+narration call, so one slow table stalls every other table on the server.
+The gateway gives async code a single entry point instead:
+
+- Backends implement a small interface (chat completion, streaming, speech)
+- OpenAIBackend wraps AsyncOpenAI on a shared, connection-pooled httpx client
+- FakeBackend is a deterministic local backend for tests and offline play
+- Each provider gets its own concurrency semaphore, so a burst of tables
+  queues fairly instead of opening unbounded upstream connections
+- Every call has a deadline covering both the queue wait and the request,
+  tightened by the request deadline an endpoint opened (deadline_scope)
+- Each provider has a circuit breaker, so a failing or slow provider is
+  rejected at once instead of costing every caller a full timeout
+- Identical concurrent requests are coalesced into one upstream call
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .circuit_breaker import CircuitBreaker, budget
+from .config import settings
+from .single_flight import SingleFlight, request_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChatRequest:
+    """One chat completion call; hashable so it can key caches."""
+
+    messages: Tuple[Tuple[str, str], ...]  # (role, content)
+    model: str
+    temperature: float = 0.8
+    max_tokens: Optional[int] = None
+
+    @classmethod
+    def from_prompt(
+        cls,
+        system_prompt: str,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: float = 0.8,
+        max_tokens: Optional[int] = None,
+    ) -> "ChatRequest":
+        return cls(
+            messages=(("system", system_prompt), ("user", prompt)),
+            model=model or settings.openai_model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    def to_openai(self) -> list:
+        return [{"role": role, "content": content} for role, content in self.messages]
+
+    def fingerprint(self) -> str:
+        """Normalized hash used to coalesce duplicate in-flight calls."""
+        return request_key("chat", self.model, self.temperature, self.max_tokens, self.messages)
+
+
+@dataclass(frozen=True)
+class SpeechRequest:
+    """One text-to-speech call."""
+
+    text: str
+    voice: str = "alloy"
+    model: str = "tts-1"
+
+    def fingerprint(self) -> str:
+        return request_key("speech", self.model, self.voice, self.text)
+
+
+class LLMBackend(ABC):
+    """Interface every model provider implements."""
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, request: ChatRequest) -> str:
+        """Return the full completion text."""
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        """Yield completion text in chunks; defaults to one chunk."""
+        yield await self.complete(request)
+
+    async def synthesize(self, request: SpeechRequest) -> bytes:
+        raise NotImplementedError(f"{self.name} backend has no speech support")
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+
+
+class OpenAIBackend(LLMBackend):
+    """AsyncOpenAI on a shared keep-alive connection pool."""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, max_connections: int = 20, timeout: float = 60.0):
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        # Retries and deadlines are handled by the gateway
+        self._client = AsyncOpenAI(api_key=api_key, http_client=self._http, max_retries=0)
+
+    async def complete(self, request: ChatRequest) -> str:
+        kwargs = {}
+        if request.max_tokens is not None:
+            kwargs["max_tokens"] = request.max_tokens
+        response = await self._client.chat.completions.create(
+            model=request.model,
+            temperature=request.temperature,
+            messages=request.to_openai(),
+            **kwargs,
+        )
+        return response.choices[0].message.content.strip()
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        kwargs = {}
+        if request.max_tokens is not None:
+            kwargs["max_tokens"] = request.max_tokens
+        response = await self._client.chat.completions.create(
+            model=request.model,
+            temperature=request.temperature,
+            messages=request.to_openai(),
+            stream=True,
+            **kwargs,
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def synthesize(self, request: SpeechRequest) -> bytes:
+        response = await self._client.audio.speech.create(
+            model=request.model,
+            voice=request.voice,
+            input=request.text,
+        )
+        return response.content
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+class FakeBackend(LLMBackend):
+    """
+    Deterministic local backend for tests and offline development.
+
+    Completions echo the last user message (or whatever `responder` returns),
+    streams split that text on spaces, and speech is a stable byte string
+    derived from the request. `latency` is applied per call; speech adds
+    `speech_latency_per_char` so longer lines take longer, like real TTS.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responder: Optional[Callable[[ChatRequest], str]] = None,
+        chunk_latency: float = 0.0,
+        speech_latency_per_char: float = 0.0,
+    ):
+        self.latency = latency
+        self.chunk_latency = chunk_latency
+        self.speech_latency_per_char = speech_latency_per_char
+        self.responder = responder or (lambda request: request.messages[-1][1].strip())
+        self.calls = 0
+        self.speech_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _enter(self) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def complete(self, request: ChatRequest) -> str:
+        self.calls += 1
+        await self._enter()
+        try:
+            return self.responder(request)
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        text = await self.complete(request)
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            yield word if i == len(words) - 1 else word + " "
+
+    async def synthesize(self, request: SpeechRequest) -> bytes:
+        self.speech_calls += 1
+        await self._enter()
+        try:
+            if self.speech_latency_per_char:
+                await asyncio.sleep(self.speech_latency_per_char * len(request.text))
+            digest = hashlib.sha256(f"{request.model}|{request.voice}|{request.text}".encode()).digest()
+            return b"FAKEAUDIO" + digest + request.text.encode()
+        finally:
+            self.in_flight -= 1
+
+
+class FaultInjectingBackend(LLMBackend):
+    """
+    Wraps another backend and injects failures and slow calls.
+
+    Each call takes the next outcome from `script` ("ok", "error", "slow" or
+    "hang") and, once the script is used up, fails with probability
+    `error_rate` or is delayed by `slow_latency` with probability
+    `slow_rate`, drawn from a seeded RNG so runs are reproducible.
+    "hang" sleeps until the caller's deadline cancels it.
+    """
+
+    name = "faulty"
+
+    def __init__(
+        self,
+        inner: Optional[LLMBackend] = None,
+        error_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 1.0,
+        script: Optional[List[str]] = None,
+        seed: int = 0,
+    ):
+        self.inner = inner or FakeBackend()
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.script = list(script or [])
+        self.injected: Dict[str, int] = {"ok": 0, "error": 0, "slow": 0, "hang": 0}
+        self._rng = random.Random(seed)
+
+    def _next_fault(self) -> str:
+        if self.script:
+            fault = self.script.pop(0)
+        elif self._rng.random() < self.error_rate:
+            fault = "error"
+        elif self._rng.random() < self.slow_rate:
+            fault = "slow"
+        else:
+            fault = "ok"
+        self.injected[fault] += 1
+        return fault
+
+    async def _inject(self) -> None:
+        fault = self._next_fault()
+        if fault == "error":
+            raise ConnectionError(f"injected {self.name} failure")
+        if fault == "slow":
+            await asyncio.sleep(self.slow_latency)
+        elif fault == "hang":
+            await asyncio.Event().wait()
+
+    async def complete(self, request: ChatRequest) -> str:
+        await self._inject()
+        return await self.inner.complete(request)
+
+    async def stream(self, request: ChatRequest) -> AsyncIterator[str]:
+        await self._inject()
+        async for chunk in self.inner.stream(request):
+            yield chunk
+
+    async def synthesize(self, request: SpeechRequest) -> bytes:
+        await self._inject()
+        return await self.inner.synthesize(request)
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Serves previously recorded completions, keyed by request messages.
+
+    Used for offline builds: record responses once (JSONL lines of
+    {"messages": [[role, content], ...], "response": "..."}) and replay them
+    without network access. Several responses for the same messages are
+    served round-robin; unknown requests raise KeyError.
+    """
+
+    name = "replay"
+
+    def __init__(self, records: Optional[Dict[str, List[str]]] = None):
+        self.records: Dict[str, List[str]] = records or {}
+        self._served: Dict[str, int] = {}
+
+    @staticmethod
+    def key(messages) -> str:
+        payload = json.dumps([list(message) for message in messages], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def record(self, messages, response: str) -> None:
+        self.records.setdefault(self.key(messages), []).append(response)
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "ReplayBackend":
+        backend = cls()
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    backend.record(entry["messages"], entry["response"])
+        return backend
+
+    async def complete(self, request: ChatRequest) -> str:
+        key = self.key(request.messages)
+        responses = self.records[key]
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        return responses[served % len(responses)]
+
+
+class _Provider:
+    def __init__(self, backend: LLMBackend, max_concurrency: int, breaker: CircuitBreaker):
+        self.backend = backend
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker
+
+
+class LLMGateway:
+    """
+    Routes calls to named providers under per-provider concurrency limits.
+
+    Concurrent identical completions and syntheses share one upstream call
+    (see single_flight); streams are never coalesced. Calls to a provider
+    whose breaker is open fail fast with CircuitOpenError.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None, coalesce: bool = True):
+        self.default_timeout = default_timeout if default_timeout is not None else settings.llm_timeout
+        self._providers: Dict[str, _Provider] = {}
+        self.default_provider: Optional[str] = None
+        self.coalesce = coalesce
+        self.flights = SingleFlight("gateway")
+
+    def register(
+        self,
+        backend: LLMBackend,
+        max_concurrency: int = 8,
+        name: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """Add a provider; the first one registered becomes the default."""
+        name = name or backend.name
+        self._providers[name] = _Provider(backend, max_concurrency, breaker or CircuitBreaker.from_settings(name))
+        if self.default_provider is None:
+            self.default_provider = name
+
+    def backend(self, provider: Optional[str] = None) -> LLMBackend:
+        return self._provider(provider).backend
+
+    def breaker(self, provider: Optional[str] = None) -> CircuitBreaker:
+        return self._provider(provider).breaker
+
+    def breaker_stats(self) -> Dict[str, Dict]:
+        return {name: provider.breaker.stats() for name, provider in self._providers.items()}
+
+    def _provider(self, provider: Optional[str]) -> _Provider:
+        name = provider or self.default_provider
+        if name not in self._providers:
+            raise ValueError(f"Unknown LLM provider: {name}")
+        return self._providers[name]
+
+    def _deadline(self, timeout: Optional[float]) -> float:
+        deadline = budget(timeout if timeout is not None else self.default_timeout)
+        if deadline <= 0:
+            # Nothing left of the request budget; don't count this against the provider
+            raise asyncio.TimeoutError("request deadline already passed")
+        return deadline
+
+    async def _bounded(self, provider: _Provider, call, timeout: Optional[float]):
+        async def run():
+            async with provider.semaphore:
+                return await call()
+
+        # The deadline covers waiting for a slot as well as the call itself
+        deadline = self._deadline(timeout)
+        return await provider.breaker.acall(lambda: asyncio.wait_for(run(), deadline))
+
+    async def _call(self, provider: Optional[str], request, call, timeout: Optional[float], coalesce: Optional[bool]):
+        target = self._provider(provider)
+        if not (self.coalesce if coalesce is None else coalesce):
+            return await self._bounded(target, lambda: call(target.backend), timeout)
+
+        deadline = self._deadline(timeout)
+        key = f"{provider or self.default_provider}:{request.fingerprint()}"
+        return await self.flights.run(
+            key, lambda: self._bounded(target, lambda: call(target.backend), deadline), deadline
+        )
+
+    async def complete(
+        self,
+        request: ChatRequest,
+        provider: Optional[str] = None,
+        timeout: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+    ) -> str:
+        """Completion text; pass coalesce=False when duplicates must be separate samples."""
+        return await self._call(provider, request, lambda backend: backend.complete(request), timeout, coalesce)
+
+    async def synthesize(
+        self,
+        request: SpeechRequest,
+        provider: Optional[str] = None,
+        timeout: Optional[float] = None,
+        coalesce: Optional[bool] = None,
+    ) -> bytes:
+        return await self._call(provider, request, lambda backend: backend.synthesize(request), timeout, coalesce)
+
+    async def stream(
+        self,
+        request: ChatRequest,
+        provider: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream chunks while holding one provider slot; the deadline covers the whole stream.
+
+        The breaker judges the stream by its time to first chunk; a consumer
+        that stops early records no outcome.
+        """
+        target = self._provider(provider)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._deadline(timeout)
+
+        target.breaker.acquire()
+        started = time.monotonic()
+        first_chunk: Optional[float] = None
+        try:
+            await asyncio.wait_for(target.semaphore.acquire(), max(0.0, deadline - loop.time()))
+        except Exception:
+            target.breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            target.breaker.release()
+            raise
+        try:
+            chunks = target.backend.stream(request).__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                if first_chunk is None:
+                    first_chunk = time.monotonic() - started
+                yield chunk
+        except Exception:
+            target.breaker.record_failure(time.monotonic() - started)
+            raise
+        except BaseException:
+            target.breaker.release()
+            raise
+        else:
+            target.breaker.record_success(first_chunk if first_chunk is not None else time.monotonic() - started)
+        finally:
+            target.semaphore.release()
+
+    async def aclose(self) -> None:
+        for provider in self._providers.values():
+            await provider.backend.aclose()
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_gateway() -> LLMGateway:
+    """Shared gateway, built lazily from settings (OpenAI provider)."""
+    global _gateway
+    if _gateway is None:
+        gateway = LLMGateway()
+        gateway.register(
+            OpenAIBackend(settings.openai_api_key, max_connections=settings.llm_max_connections),
+            max_concurrency=settings.llm_max_concurrency,
+        )
+        _gateway = gateway
+    return _gateway
+
+
+def current_gateway() -> Optional[LLMGateway]:
+    """The installed gateway without building one."""
+    return _gateway
+
+
+def gateway_available() -> bool:
+    """True if an installed gateway or a usable API key can serve calls."""
+    if _gateway is not None:
+        return True
+    return bool(settings.openai_api_key and settings.openai_api_key.startswith("sk-"))
+
+
+def set_gateway(gateway: Optional[LLMGateway]) -> None:
+    """Install a gateway (e.g. one backed by FakeBackend); None resets to lazy default."""
+    global _gateway
+    _gateway = gateway
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, JSONResponse
@@ -10,15 +10,17 @@ from dotenv import load_dotenv
 from .llm import generate_narration, PERSONAS
 from .dice import roll_dice
 from .memory import get_memory, update_memory
-from .dm_engine import process_action
+from .dm_engine import astream_action, process_action
+from .circuit_breaker import deadline_scope
 from .database import init_db, save_campaign, load_campaign, list_campaigns
 from .roll20_adapter import router
 from .config import settings
+from .randomness import get_stream_registry
 from .scanner import scan_qr_code, get_rulesets
-from .mechanics import quick_resolve, Governors, dice
+from .mechanics import quick_odds, quick_resolve, Governors, dice
 from .map_engine import MapEngine
 from .narrative import NarrativeEngine, LegacyLedger as NarrativeLegacyLedger
-from .api import artifacts, characters, cycles, ghoul_veil, largess, lattice, legacy, myth, myth_graph, party, resolve, sessions as sessions_api, world_state, worlds
+from .api import artifacts, audio, characters, cycles, ghoul_veil, largess, lattice, legacy, myth, myth_graph, party, resolve, sessions as sessions_api, world_state, worlds
 
 load_dotenv()
 
@@ -61,6 +63,7 @@ app.include_router(myth_graph.router)
 app.include_router(world_state.router)
 app.include_router(party.router)
 app.include_router(artifacts.router)
+app.include_router(audio.router)
 app.include_router(ghoul_veil.router)
 
 map_engine = MapEngine()
@@ -280,6 +283,7 @@ async def health_check():
         "service": "VoiceDM Roll20 Harmony",
         "version": "1.3.0",  # Bumped for featherweight update
         "narration_mode": narration_info["mode"],
+        "effective_narration_mode": narration_info["effective_mode"],
         "dependencies": {
             "openai": narration_info["llm_available"],
             "templates": True,
@@ -294,6 +298,23 @@ async def health_check():
     }
 
 
+@app.get("/health/llm")
+async def llm_health_check():
+    """LLM provider health: circuit breakers and the narration mode in effect."""
+    from .hybrid_engine import effective_narration_mode
+    from .llm import breaker_stats, coalescing_stats
+
+    effective = effective_narration_mode(asynchronous=True)
+    return {
+        "status": "degraded" if effective != settings.narration_mode else "healthy",
+        "configured_mode": settings.narration_mode.value,
+        "effective_mode": effective.value,
+        "narration_deadline": settings.narration_deadline,
+        "breakers": breaker_stats(),
+        "coalescing": coalescing_stats(),
+    }
+
+
 @app.get("/api/health")
 async def api_health_check():
     return {
@@ -319,6 +340,17 @@ async def resolve_action(
     }
 
 
+@app.get("/api/odds")
+async def resolve_odds(
+    difficulty: int,
+    base_modifier: float = 0,
+    positives: list[float] | None = Query(None),
+    negatives: list[float] | None = Query(None),
+):
+    """Exact success, critical and fumble chances for /api/resolve, without rolling"""
+    return quick_odds(difficulty, base_modifier, positives or [], negatives or []).to_dict()
+
+
 @app.post("/api/retirement/calculate")
 async def calculate_retirement(
     xp: int,
@@ -374,6 +406,17 @@ async def create_session():
     connections[session_id] = []
     return {"session_id": session_id}
 
+async def _broadcast(session_id: str, message: dict):
+    """Send to all players in session, dropping dead connections"""
+    dead_connections = []
+    for conn in connections[session_id]:
+        try:
+            await conn.send_json(message)
+        except:
+            dead_connections.append(conn)
+    for dead in dead_connections:
+        connections[session_id].remove(dead)
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     if session_id not in sessions:
@@ -394,17 +437,16 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 action_text = data["text"]
                 player_name = data.get("player_name", "Unknown")
                 
-                result = process_action(session_id, player_name, action_text)
-                
-                # Broadcast to all players in session
-                dead_connections = []
-                for conn in connections[session_id]:
-                    try:
-                        await conn.send_json(result)
-                    except:
-                        dead_connections.append(conn)
-                for dead in dead_connections:
-                    connections[session_id].remove(dead)
+                with deadline_scope(data.get("deadline", settings.narration_deadline)):
+                    if data.get("stream"):
+                        # narration_chunk messages as text arrives, then the usual narration payload
+                        async for message in astream_action(
+                            session_id, player_name, action_text, data.get("granularity", "sentence")
+                        ):
+                            await _broadcast(session_id, message)
+                    else:
+                        result = process_action(session_id, player_name, action_text)
+                        await _broadcast(session_id, result)
     except WebSocketDisconnect:
         if websocket in connections.get(session_id, []):
             connections[session_id].remove(websocket)
@@ -462,7 +504,8 @@ async def save_campaign_endpoint(session_id: str, campaign_name: str):
     try:
         save_data = {
             "memory": sessions[session_id]["memory"],
-            "state": sessions[session_id]["state"]
+            "state": sessions[session_id]["state"],
+            "rng_streams": get_stream_registry().checkpoint(session_id)
         }
         # Generate unique campaign ID (not the session ID) to support multiple sessions from one campaign
         campaign_id = f"cmp_{session_id}_{uuid.uuid4().hex[:4]}"
@@ -494,6 +537,9 @@ async def load_campaign_endpoint(campaign_id: str):
             "state": data.get("state", {"active_player": None, "turn_queue": [], "phase": "exploration"})
         }
         connections[new_session_id] = []
+        if data.get("rng_streams"):
+            # Continue the saved dice/template streams where the campaign left off
+            get_stream_registry().restore(new_session_id, data["rng_streams"])
         
         return {
             "session_id": new_session_id,
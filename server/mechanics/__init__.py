@@ -1,6 +1,8 @@
 from typing import List, Optional
 
 from .dice import DiceEngine, RandomnessMode, RollResult
+from .probability import Odds, odds, total_cdf, total_pmf
+from .simulation import Scenario, simulate
 
 
 class DiceSystem(DiceEngine):
@@ -63,6 +65,17 @@ def quick_resolve(
     return _dice.resolve(int(base_modifier), int_pos, int_neg)
 
 
+def quick_odds(
+    difficulty: int,
+    base_modifier: float = 0,
+    positives: Optional[List[float]] = None,
+    negatives: Optional[List[float]] = None,
+) -> Odds:
+    int_pos = [int(p) for p in (positives or [])]
+    int_neg = [int(n) for n in (negatives or [])]
+    return _dice.odds(int(difficulty), int(base_modifier), int_pos, int_neg)
+
+
 dice = _dice
 
 __all__ = [
@@ -72,5 +85,12 @@ __all__ = [
     "RollResult",
     "Governors",
     "quick_resolve",
+    "quick_odds",
+    "Odds",
+    "odds",
+    "total_pmf",
+    "total_cdf",
+    "Scenario",
+    "simulate",
     "dice",
 ]
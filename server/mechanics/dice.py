@@ -1,13 +1,22 @@
 import logging
 import random
-import secrets
 from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional
 
+from ..bulk_dice import BulkRolls
+from ..randomness import RandomSource, get_entropy_pool
+
 logger = logging.getLogger(__name__)
 
 
+def _weighted_sampler():
+    # Tables are built from DiceEngine's constants at import of .probability
+    from .probability import SAMPLERS
+
+    return SAMPLERS[RandomnessMode.WEIGHTED]
+
+
 class RandomnessMode(Enum):
     SECURE = "secure"
     DETERMINISTIC = "det"
@@ -62,30 +71,73 @@ class RollResult:
 class DiceEngine:
     """Core 3d6 engine with multiple randomness modes."""
 
-    def __init__(self, mode: RandomnessMode = RandomnessMode.SECURE, seed: Optional[str] = None):
+    # WEIGHTED mode: a light bell curve over sums 3..9, mirrored to 12..18
+    WEIGHTED_SUMS = tuple(range(3, 10))
+    WEIGHTED_SUM_WEIGHTS = (1, 2, 3, 4, 3, 2, 1)
+
+    def __init__(
+        self,
+        mode: RandomnessMode = RandomnessMode.SECURE,
+        seed: Optional[str] = None,
+        rng: Optional[RandomSource] = None,
+    ):
+        """
+        Args:
+            mode: Distribution and default generator of the dice
+            seed: Seed of DETERMINISTIC mode's generator
+            rng: Stream to draw every die from instead of the mode's own
+                generator (the Monte Carlo simulation injects a seeded one)
+        """
         self.mode = mode
         self.seed = seed
+        self.rng = rng
         self._rng = random.Random(seed) if mode == RandomnessMode.DETERMINISTIC else random.Random()
+        self._sampler = None
         if mode == RandomnessMode.DETERMINISTIC:
             logger.info("Initialized deterministic RNG")
 
     def roll_3d6(self) -> List[int]:
+        if self.mode == RandomnessMode.WEIGHTED:
+            return self._weighted_roll()
+        if self.rng is not None:
+            return self.rng.randints(1, 6, 3)
         if self.mode == RandomnessMode.SECURE:
-            return [secrets.randbelow(6) + 1 for _ in range(3)]
+            # Buffered OS entropy: one pooled batch instead of a syscall per die
+            return get_entropy_pool().integers(1, 6, 3)
         if self.mode == RandomnessMode.DETERMINISTIC:
             return [self._rng.randint(1, 6) for _ in range(3)]
-        if self.mode == RandomnessMode.WEIGHTED:
-            return self._weighted_roll()
         return [self._rng.randint(1, 6) for _ in range(3)]
 
+    def roll_3d6_many(self, count: int, modifier: int = 0) -> BulkRolls:
+        """
+        Roll `count` 3d6 checks in one batch.
+        
+        SECURE mode takes all 3 * count dice in one pooled entropy read;
+        seeded modes consume their generator exactly as `count` roll_3d6
+        calls would, so replays line up with single rolls. An injected
+        `rng` supplies all the dice in one randints call.
+        """
+        if self.mode == RandomnessMode.WEIGHTED:
+            integers = self.rng.randints if self.rng is not None else None
+            values = [value for triple in _weighted_sampler().sample_many(count, integers) for value in triple]
+        elif self.rng is not None:
+            values = self.rng.randints(1, 6, 3 * count)
+        elif self.mode == RandomnessMode.SECURE:
+            values = get_entropy_pool().integers(1, 6, 3 * count)
+        else:
+            randint = self._rng.randint
+            values = [randint(1, 6) for _ in range(3 * count)]
+        return BulkRolls(f"3d6{modifier:+d}" if modifier else "3d6", values, 3, 6, modifier)
+
     def _weighted_roll(self) -> List[int]:
-        # Light bell-curve weight on sums 3..9 then mirrored to 18.
-        weights = [1, 2, 3, 4, 3, 2, 1]
-        target_sum = random.choices(range(3, 10), weights=weights, k=1)[0]
-        mirror = secrets.randbelow(2) == 1
-        if mirror:
-            target_sum = 21 - target_sum
-        return self._decompose_sum(target_sum)
+        # Light bell-curve weight on sums 3..9, mirrored to 18. The sampler's
+        # alias tables hold exactly the distribution of drawing a weighted sum
+        # and splitting it with _decompose_sum, so a roll is two O(1) draws.
+        if self._sampler is None:
+            self._sampler = _weighted_sampler()
+        if self.rng is not None:
+            return list(self._sampler.sample(lambda n: self.rng.randint(0, n - 1)))
+        return list(self._sampler.sample())
 
     def _decompose_sum(self, target_sum: int) -> List[int]:
         remaining = target_sum
@@ -114,6 +166,19 @@ class DiceEngine:
         raw = int(base_modifier + sum(positives) - sum(negatives))
         return max(min_mod, min(max_mod, raw))
 
+    def odds(
+        self,
+        difficulty: int,
+        base_modifier: int = 0,
+        positives: Optional[List[int]] = None,
+        negatives: Optional[List[int]] = None,
+    ):
+        """Exact odds that resolve() with these modifiers meets `difficulty`, without rolling."""
+        from .probability import odds
+
+        modifier = self.calculate_modifier(base_modifier, positives or [], negatives or [])
+        return odds(difficulty, modifier, self.mode)
+
     def resolve(
         self,
         base_modifier: int = 0,
@@ -0,0 +1,265 @@
+"""
+Exact outcome tables for 3d6 resolution
+
+Every DiceEngine mode rolls three d6, so its whole behaviour is a
+distribution over 216 ordered triples. The tables below hold that
+distribution exactly (as Fractions) for each mode, built once at import:
+
+- SECURE, DETERMINISTIC and LINEAR roll three independent uniform dice
+- WEIGHTED draws a bell-weighted sum from 3..9, mirrors it to 12..18 half
+  the time, then splits it into dice the way DiceEngine._decompose_sum does
+
+From a table come the PMF and CDF of the natural total, and with a
+modifier the odds of meeting a difficulty, of a critical (6, 6, 6) and of
+a fumble (1, 1, 1) - instantly, and exactly enough for tests to compare
+distributions with == instead of statistically.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from fractions import Fraction
+from itertools import product
+from math import lcm
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+from ..randomness import AliasTable, get_entropy_pool
+from .dice import DiceEngine, RandomnessMode
+
+Triple = Tuple[int, int, int]
+
+MIN_TOTAL = 3
+MAX_TOTAL = 18
+CRITICAL: Triple = (6, 6, 6)
+FUMBLE: Triple = (1, 1, 1)
+
+
+def _add(pmf: Dict[Triple, Fraction], triple: Triple, p: Fraction) -> None:
+    pmf[triple] = pmf.get(triple, Fraction(0)) + p
+
+
+def _uniform_triples(weight: Fraction = Fraction(1)) -> Dict[Triple, Fraction]:
+    return {triple: weight / 216 for triple in product(range(1, 7), repeat=3)}
+
+
+def decomposition_pmf(total: int) -> Dict[Triple, Fraction]:
+    """Exact distribution of the triples DiceEngine._decompose_sum(total) returns"""
+    pmf: Dict[Triple, Fraction] = {}
+
+    def fallback(p: Fraction) -> None:
+        for triple, q in _uniform_triples(p).items():
+            _add(pmf, triple, q)
+
+    low, high = max(1, total - 12), min(6, total - 2)
+    if low > high:
+        fallback(Fraction(1))
+        return pmf
+    for first in range(low, high + 1):
+        p_first = Fraction(1, high - low + 1)
+        remaining = total - first
+        low2, high2 = max(1, remaining - 6), min(6, remaining - 1)
+        if low2 > high2:
+            fallback(p_first)
+            continue
+        for second in range(low2, high2 + 1):
+            p = p_first / (high2 - low2 + 1)
+            third = remaining - second
+            if 1 <= third <= 6:
+                _add(pmf, (first, second, third), p)
+            else:
+                fallback(p)
+    return pmf
+
+
+def weighted_sum_pmf() -> Dict[int, Fraction]:
+    """Exact distribution of the target sum WEIGHTED mode draws"""
+    total_weight = sum(DiceEngine.WEIGHTED_SUM_WEIGHTS)
+    sums: Dict[int, Fraction] = {}
+    for total, weight in zip(DiceEngine.WEIGHTED_SUMS, DiceEngine.WEIGHTED_SUM_WEIGHTS):
+        p = Fraction(weight, total_weight) / 2  # Kept or mirrored to 21 - total
+        sums[total] = sums.get(total, Fraction(0)) + p
+        sums[21 - total] = sums.get(21 - total, Fraction(0)) + p
+    return dict(sorted(sums.items()))
+
+
+def _weighted_triples() -> Dict[Triple, Fraction]:
+    pmf: Dict[Triple, Fraction] = {}
+    for total, p in weighted_sum_pmf().items():
+        for triple, q in decomposition_pmf(total).items():
+            _add(pmf, triple, p * q)
+    return pmf
+
+
+@dataclass(frozen=True)
+class OutcomeTable:
+    """Exact distribution of one mode's 3d6 rolls"""
+
+    mode: RandomnessMode
+    triples: Mapping[Triple, Fraction]
+    totals: Mapping[int, Fraction]  # Natural total -> probability, 3..18
+    at_most: Tuple[Fraction, ...]  # CDF indexed by natural total
+
+    @classmethod
+    def build(cls, mode: RandomnessMode, triples: Dict[Triple, Fraction]) -> "OutcomeTable":
+        totals = {total: Fraction(0) for total in range(MIN_TOTAL, MAX_TOTAL + 1)}
+        for triple, p in triples.items():
+            totals[sum(triple)] += p
+        cumulative = Fraction(0)
+        at_most = [Fraction(0)] * (MAX_TOTAL + 1)
+        for total in range(MIN_TOTAL, MAX_TOTAL + 1):
+            cumulative += totals[total]
+            at_most[total] = cumulative
+        return cls(mode, MappingProxyType(dict(triples)), MappingProxyType(totals), tuple(at_most))
+
+    @property
+    def critical(self) -> Fraction:
+        return self.triples.get(CRITICAL, Fraction(0))
+
+    @property
+    def fumble(self) -> Fraction:
+        return self.triples.get(FUMBLE, Fraction(0))
+
+    def cdf(self, natural: int) -> Fraction:
+        """P(natural total <= natural)"""
+        if natural < MIN_TOTAL:
+            return Fraction(0)
+        return self.at_most[min(natural, MAX_TOTAL)]
+
+    def at_least(self, natural: int) -> Fraction:
+        """P(natural total >= natural)"""
+        return 1 - self.cdf(natural - 1)
+
+    @property
+    def mean(self) -> Fraction:
+        return sum((total * p for total, p in self.totals.items()), Fraction(0))
+
+
+def _build_tables() -> Mapping[RandomnessMode, OutcomeTable]:
+    uniform = _uniform_triples()
+    return MappingProxyType({
+        RandomnessMode.SECURE: OutcomeTable.build(RandomnessMode.SECURE, uniform),
+        RandomnessMode.DETERMINISTIC: OutcomeTable.build(RandomnessMode.DETERMINISTIC, uniform),
+        RandomnessMode.LINEAR: OutcomeTable.build(RandomnessMode.LINEAR, uniform),
+        RandomnessMode.WEIGHTED: OutcomeTable.build(RandomnessMode.WEIGHTED, _weighted_triples()),
+    })
+
+
+TABLES = _build_tables()
+
+
+def _integer_weights(probabilities: List[Fraction]) -> List[int]:
+    scale = lcm(*(p.denominator for p in probabilities))
+    return [int(p * scale) for p in probabilities]
+
+
+class TripleSampler:
+    """
+    Constant-time 3d6 sampling from an outcome table.
+    
+    Two alias draws: a natural total, then one of the triples with that
+    total. Both use integer weights taken from the table's Fractions, so
+    the sampled triples follow the table exactly.
+    """
+
+    def __init__(self, table: OutcomeTable):
+        self.mode = table.mode
+        by_total: Dict[int, List[Triple]] = {}
+        for triple, p in sorted(table.triples.items()):
+            if p:
+                by_total.setdefault(sum(triple), []).append(triple)
+        self.totals: Tuple[int, ...] = tuple(sorted(by_total))
+        self.triples: Mapping[int, Tuple[Triple, ...]] = MappingProxyType(
+            {total: tuple(triples) for total, triples in by_total.items()}
+        )
+        self._total_alias = AliasTable(_integer_weights([table.totals[total] for total in self.totals]))
+        self._triple_alias = {
+            total: AliasTable(_integer_weights([table.triples[triple] for triple in triples]))
+            for total, triples in self.triples.items()
+        }
+
+    def sample(self, randbelow=None) -> Triple:
+        randbelow = randbelow or get_entropy_pool().randbelow
+        total = self.totals[self._total_alias.sample(randbelow)]
+        return self.triples[total][self._triple_alias[total].sample(randbelow)]
+
+    def sample_many(self, count: int, integers=None) -> List[Triple]:
+        """`count` triples, each stage drawn in one batch (see AliasTable.sample_many)"""
+        totals = [self.totals[index] for index in self._total_alias.sample_many(count, integers)]
+        draws = {
+            total: iter([
+                self.triples[total][index] for index in self._triple_alias[total].sample_many(n, integers)
+            ])
+            for total, n in Counter(totals).items()
+        }
+        return [next(draws[total]) for total in totals]
+
+    def probabilities(self) -> Dict[Triple, Fraction]:
+        """Exact triple distribution implied by the two alias tables"""
+        result: Dict[Triple, Fraction] = {}
+        for total, p_total in zip(self.totals, self._total_alias.probabilities()):
+            for triple, p in zip(self.triples[total], self._triple_alias[total].probabilities()):
+                result[triple] = p_total * p
+        return result
+
+
+SAMPLERS: Mapping[RandomnessMode, TripleSampler] = MappingProxyType(
+    {mode: TripleSampler(table) for mode, table in TABLES.items()}
+)
+
+
+class Odds(NamedTuple):
+    """Exact chances of one resolution against a difficulty"""
+
+    mode: RandomnessMode
+    difficulty: int
+    modifier: int
+    success: Fraction  # total >= difficulty
+    critical: Fraction  # natural 6, 6, 6
+    fumble: Fraction  # natural 1, 1, 1
+    expected_total: Fraction
+
+    @property
+    def failure(self) -> Fraction:
+        return 1 - self.success
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "mode": self.mode.value,
+            "difficulty": self.difficulty,
+            "modifier": self.modifier,
+            "success": float(self.success),
+            "failure": float(self.failure),
+            "critical": float(self.critical),
+            "fumble": float(self.fumble),
+            "expected_total": float(self.expected_total),
+            "exact": {
+                "success": str(self.success),
+                "critical": str(self.critical),
+                "fumble": str(self.fumble),
+            },
+        }
+
+
+def odds(difficulty: int, modifier: int = 0, mode: RandomnessMode = RandomnessMode.SECURE) -> Odds:
+    """Exact odds that 3d6 + modifier meets `difficulty` in a mode"""
+    table = TABLES[mode]
+    return Odds(
+        mode=mode,
+        difficulty=difficulty,
+        modifier=modifier,
+        success=table.at_least(difficulty - modifier),
+        critical=table.critical,
+        fumble=table.fumble,
+        expected_total=table.mean + modifier,
+    )
+
+
+def total_pmf(mode: RandomnessMode = RandomnessMode.SECURE, modifier: int = 0) -> Dict[int, Fraction]:
+    """P(total == t) for every reachable total of 3d6 + modifier"""
+    return {total + modifier: p for total, p in TABLES[mode].totals.items() if p}
+
+
+def total_cdf(mode: RandomnessMode = RandomnessMode.SECURE, modifier: int = 0) -> Dict[int, Fraction]:
+    """P(total <= t) for every total from the minimum to the maximum"""
+    table = TABLES[mode]
+    return {total + modifier: table.cdf(total) for total in range(MIN_TOTAL, MAX_TOTAL + 1)}
@@ -0,0 +1,230 @@
+"""
+Monte Carlo simulation of 3d6 resolution
+
+probability.py gives the exact odds of one check; tuning mechanics means
+sweeping many scenarios (modes, difficulties, pressure modifiers) and
+checking that what actually gets rolled agrees. This module rolls
+millions of resolutions through DiceEngine.roll_3d6_many across a process
+pool and aggregates them into histograms, rates with Wilson confidence
+intervals, and a JSON report that sets each rate beside its exact value.
+
+Work is cut into fixed-size shards. Each shard injects its own counter-mode
+stream, seeded from (seed, scenario, shard), into the engine in place of
+the mode's generator (the entropy pool for SECURE), so shards are
+independent, a report depends only on the seed and trial count (never on
+the number of workers), and throughput scales with the cores available.
+"""
+
+import json
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..randomness import STREAM_COUNTER, RandomMode, RandomSource
+from .dice import DiceEngine, RandomnessMode
+from .probability import odds
+
+REPORT_FORMAT = "voicedm.simulation.v1"
+SHARD_SIZE = 100_000
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One resolution setup to simulate"""
+
+    name: str
+    mode: RandomnessMode = RandomnessMode.SECURE
+    difficulty: int = 10
+    base_modifier: int = 0
+    positives: Tuple[int, ...] = ()
+    negatives: Tuple[int, ...] = ()
+
+    @property
+    def modifier(self) -> int:
+        """Modifier resolve() would apply, after pressure clamping"""
+        return DiceEngine(self.mode).calculate_modifier(self.base_modifier, list(self.positives), list(self.negatives))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "mode": self.mode.value,
+            "difficulty": self.difficulty,
+            "base_modifier": self.base_modifier,
+            "positives": list(self.positives),
+            "negatives": list(self.negatives),
+            "modifier": self.modifier,
+        }
+
+
+def shard_seed(seed: str, scenario: Scenario, shard: int) -> str:
+    return f"{seed}:{scenario.name}:{shard}"
+
+
+def run_shard(scenario: Scenario, seed: str, shard: int, trials: int) -> Dict[str, Any]:
+    """Roll one shard; module-level so a process pool can pickle it"""
+    rng = RandomSource(shard_seed(seed, scenario, shard), RandomMode.DETERMINISTIC, STREAM_COUNTER)
+    batch = DiceEngine(scenario.mode, rng=rng).roll_3d6_many(trials, scenario.modifier)
+    return {
+        "trials": trials,
+        "totals": batch.histogram(),
+        "critical": batch.count_all(6),
+        "fumble": batch.count_all(1),
+    }
+
+
+def _run_task(task: Tuple[Scenario, str, int, int]) -> Dict[str, Any]:
+    return run_shard(*task)
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion"""
+    if trials <= 0:
+        return (0.0, 1.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (max(0.0, centre - spread), min(1.0, centre + spread))
+
+
+@dataclass
+class ScenarioResult:
+    """Merged shards of one scenario"""
+
+    scenario: Scenario
+    trials: int = 0
+    totals: Counter = field(default_factory=Counter)  # Total, modifier included -> rolls
+    critical: int = 0
+    fumble: int = 0
+
+    def add(self, shard: Dict[str, Any]) -> None:
+        self.trials += shard["trials"]
+        self.totals.update(shard["totals"])
+        self.critical += shard["critical"]
+        self.fumble += shard["fumble"]
+
+    @property
+    def histogram(self) -> Dict[int, int]:
+        """Rolls per total, modifier included"""
+        return dict(sorted(self.totals.items()))
+
+    @property
+    def successes(self) -> int:
+        difficulty = self.scenario.difficulty
+        return sum(n for total, n in self.histogram.items() if total >= difficulty)
+
+    def mean_interval(self, confidence: float = 0.95) -> Tuple[float, float, float]:
+        """Mean total and its normal-approximation interval"""
+        if not self.trials:
+            return (0.0, 0.0, 0.0)
+        histogram = self.histogram
+        mean = sum(total * n for total, n in histogram.items()) / self.trials
+        variance = sum(n * (total - mean) ** 2 for total, n in histogram.items()) / max(1, self.trials - 1)
+        half = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(variance / self.trials)
+        return (mean, mean - half, mean + half)
+
+    def to_dict(self, confidence: float = 0.95) -> Dict[str, Any]:
+        exact = odds(self.scenario.difficulty, self.scenario.modifier, self.scenario.mode)
+        rates = {}
+        for key, count, expected in (
+            ("success", self.successes, exact.success),
+            ("critical", self.critical, exact.critical),
+            ("fumble", self.fumble, exact.fumble),
+        ):
+            low, high = wilson_interval(count, self.trials, confidence)
+            rates[key] = {
+                "count": count,
+                "rate": count / self.trials if self.trials else 0.0,
+                "interval": [low, high],
+                "exact": float(expected),
+                "within_interval": low <= float(expected) <= high,
+            }
+        mean, low, high = self.mean_interval(confidence)
+        return {
+            "scenario": self.scenario.to_dict(),
+            "trials": self.trials,
+            "rates": rates,
+            "mean_total": {"value": mean, "interval": [low, high], "exact": float(exact.expected_total)},
+            "histogram": {str(total): n for total, n in self.histogram.items()},
+        }
+
+
+@dataclass
+class SimulationReport:
+    """Machine-readable outcome of simulate()"""
+
+    seed: str
+    trials: int
+    workers: int
+    shard_size: int
+    confidence: float
+    elapsed: float
+    results: List[ScenarioResult]
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.trials * len(self.results)
+        return {
+            "format": REPORT_FORMAT,
+            "seed": self.seed,
+            "trials_per_scenario": self.trials,
+            "workers": self.workers,
+            "shard_size": self.shard_size,
+            "confidence": self.confidence,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "resolutions_per_second": round(total / self.elapsed) if self.elapsed else None,
+            "scenarios": [result.to_dict(self.confidence) for result in self.results],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+def simulate(
+    scenarios: Sequence[Scenario],
+    trials: int,
+    seed: str = "simulation",
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+    confidence: float = 0.95,
+) -> SimulationReport:
+    """
+    Roll `trials` resolutions of every scenario.
+
+    Args:
+        scenarios: Setups to simulate; names must be unique
+        trials: Resolutions per scenario
+        seed: Root seed; with `trials` and `shard_size` it fixes the report
+        workers: Processes to use (default: CPU count); 1 runs in-process
+        shard_size: Resolutions per stream / unit of work
+        confidence: Level for every interval in the report
+    """
+    names = [scenario.name for scenario in scenarios]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique")
+    if trials <= 0 or shard_size <= 0:
+        raise ValueError("trials and shard_size must be positive")
+    workers = workers or os.cpu_count() or 1
+
+    tasks = []
+    for index, scenario in enumerate(scenarios):
+        for shard, start in enumerate(range(0, trials, shard_size)):
+            tasks.append((index, (scenario, seed, shard, min(shard_size, trials - start))))
+    results = [ScenarioResult(scenario) for scenario in scenarios]
+
+    started = time.perf_counter()
+    if workers == 1:
+        shards = [_run_task(task) for _, task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_run_task, [task for _, task in tasks]))
+    for (index, _), shard in zip(tasks, shards):
+        results[index].add(shard)
+    elapsed = time.perf_counter() - started
+
+    return SimulationReport(seed, trials, workers, shard_size, confidence, elapsed, results)
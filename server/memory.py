@@ -1,7 +1,11 @@
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
+from .geomancer import GeomancerWindow
+from .randomness import get_stream_registry
+from .draw_log import close_draw_log
+
 logger = logging.getLogger(__name__)
 
 _MEM: Dict[str, Dict[str, Any]] = {}
@@ -100,7 +104,7 @@ class SessionMemory:
                     "drift": 0.0,
                     "equilibrium": 1.0,
                     "instability": 0.0,
-                    "history": []
+                    "history": GeomancerWindow()
                 },
                 "session_stats": {
                     "total_actions": 0,
@@ -135,7 +139,8 @@ class SessionMemory:
         geomancer.setdefault("drift", 0.0)
         geomancer.setdefault("equilibrium", 1.0)
         geomancer.setdefault("instability", 0.0)
-        geomancer.setdefault("history", [])
+        if not isinstance(geomancer.get("history"), GeomancerWindow):
+            geomancer["history"] = GeomancerWindow(history=geomancer.get("history") or ())
         
         _MEM[self.session_id]["last_access"] = time.time()
     
@@ -162,6 +167,10 @@ class SessionMemory:
         # Track frame usage
         stats["frame_uses"][outcome] = stats["frame_uses"].get(outcome, 0) + 1
 
+def peek_memory(session_id: str) -> Optional[Dict[str, Any]]:
+    """Return session memory if it exists, without creating or touching it"""
+    return _MEM.get(session_id)
+
 def cleanup_old_sessions():
     """Remove sessions older than timeout"""
     now = time.time()
@@ -172,6 +181,8 @@ def cleanup_old_sessions():
     
     for session_id in to_remove:
         del _MEM[session_id]
+        get_stream_registry().drop(session_id)
+        close_draw_log(session_id)
         logger.info(f"Cleaned up stale session: {session_id[:8]}...")
 
 # Legacy compatibility functions
@@ -0,0 +1,91 @@
+"""
+Streaming narration helpers
+
+Narration used to reach players only once generation (and TTS) had fully
+finished. Streaming paths instead yield text as it is produced:
+
+- "token" granularity forwards model chunks as they arrive
+- "sentence" granularity buffers chunks into whole sentences, which read
+  better in chat and are the unit the TTS pipeline synthesizes
+
+Chunks keep their trailing whitespace, so "".join(chunks) is exactly the
+streamed text; every stream ends with one consolidated message for clients
+that don't render partial output.
+"""
+
+import json
+import re
+from typing import Any, AsyncIterator, List, Optional
+
+GRANULARITIES = ("sentence", "token")
+
+# A sentence ends at terminal punctuation plus any closing quotes and
+# whitespace, or at a line break; a bare list number such as "1. " is not one.
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+|\n+")
+_LIST_MARKER = re.compile(r"\s*\d+[.)]\s*")
+
+
+class SentenceChunker:
+    """Incrementally cuts streamed text into sentences."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; returns the sentences it completed."""
+        self._buffer += text
+        sentences: List[str] = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            # Whitespace at the very end may continue in the next chunk
+            if match.end() == len(self._buffer):
+                break
+            if _LIST_MARKER.fullmatch(self._buffer, start, match.end()):
+                continue
+            sentences.append(self._buffer[start:match.end()])
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Whatever is left once the stream ends."""
+        rest, self._buffer = self._buffer, ""
+        return rest or None
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of a complete text; "".join() of the result is the text."""
+    chunker = SentenceChunker()
+    sentences = chunker.feed(text)
+    rest = chunker.flush()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+async def rechunk(chunks: AsyncIterator[str], granularity: str = "sentence") -> AsyncIterator[str]:
+    """Re-cut a raw chunk stream at the requested granularity."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown stream granularity: {granularity}")
+    if granularity == "token":
+        async for chunk in chunks:
+            if chunk:
+                yield chunk
+        return
+
+    chunker = SentenceChunker()
+    async for chunk in chunks:
+        for sentence in chunker.feed(chunk):
+            yield sentence
+    rest = chunker.flush()
+    if rest:
+        yield rest
+
+
+def chunk_message(index: int, text: str) -> dict:
+    return {"type": "narration_chunk", "index": index, "text": text}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """One Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,4 +1,53 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Set
+
+from .text_analyzer import PhraseMatcher
+
+# Private world-graph key holding the cached NPCIndex
+INDEX_KEY = "_npc_index"
+
+
+class NPCIndex:
+    """
+    Faction -> NPC index plus the set of NPCs whose loyalty is stale.
+
+    NPC ids and faction ids are compiled into one PhraseMatcher so finding the
+    NPCs an action mentions is a single scan. Every NPC starts dirty, so the
+    first recalculation after a (re)build covers the whole cast.
+    """
+
+    def __init__(self, npcs: Dict[str, Dict[str, Any]]):
+        self.npc_ids = frozenset(npcs)
+        self.order = {npc_id: position for position, npc_id in enumerate(npcs)}
+        self.by_faction: Dict[Any, Set[str]] = {}
+        self.by_keyword: Dict[str, Set[str]] = {}
+        # An empty id is a substring of every action
+        self.always: Set[str] = set()
+
+        for npc_id, npc in npcs.items():
+            self.by_faction.setdefault(npc.get("faction"), set()).add(npc_id)
+            keyword = npc_id.lower()
+            if keyword:
+                self.by_keyword.setdefault(keyword, set()).add(npc_id)
+            else:
+                self.always.add(npc_id)
+            faction_keyword = str(npc.get("faction", "")).lower()
+            if faction_keyword:
+                self.by_keyword.setdefault(faction_keyword, set()).add(npc_id)
+
+        self._matcher = PhraseMatcher(self.by_keyword)
+        self.dirty: Set[str] = set(npcs)
+        self.active_hooks: Dict[str, List[Dict[str, str]]] = {}
+
+    def is_current(self, npcs: Dict[str, Any]) -> bool:
+        """Cheap guard against NPCs added or removed behind our back."""
+        return npcs.keys() == self.npc_ids
+
+    def mentioned(self, action_text: str) -> Set[str]:
+        """NPCs whose id or faction id appears in the (lowercased) action text."""
+        relevant = set(self.always)
+        for keyword in self._matcher.find_all(action_text):
+            relevant.update(self.by_keyword[keyword])
+        return relevant
 
 
 class NPCEngine:
@@ -6,12 +55,44 @@ class NPCEngine:
         self.world = world_state
         self.npcs = world_state.setdefault("npcs", {})
 
-    def recalculate_loyalties(self) -> Dict[str, Dict[str, float]]:
-        """Update NPC trust based on faction attitude + remembered impact."""
+    @property
+    def index(self) -> NPCIndex:
+        """Index cached on the world graph, rebuilt when the cast changes."""
+        index = self.world.get(INDEX_KEY)
+        if index is None or not index.is_current(self.npcs):
+            index = NPCIndex(self.npcs)
+            self.world[INDEX_KEY] = index
+        return index
+
+    def invalidate_index(self) -> None:
+        """Drop the cached index after editing an NPC's faction, trust or hooks."""
+        self.world.pop(INDEX_KEY, None)
+
+    def mark_factions_changed(self, faction_ids: Iterable[str]) -> None:
+        """Flag every NPC of the given factions for loyalty recalculation."""
+        index = self.index
+        for faction_id in faction_ids:
+            index.dirty.update(index.by_faction.get(faction_id, ()))
+
+    def recalculate_loyalties(self, full: bool = False) -> Dict[str, Dict[str, float]]:
+        """
+        Update NPC trust based on faction attitude + remembered impact.
+
+        Only NPCs marked dirty (new memories or changed factions) are
+        recomputed; full=True is the batch path for world ticks.
+        """
         updates: Dict[str, Dict[str, float]] = {}
         factions = self.world.get("factions", {})
+        index = self.index
+
+        if full:
+            targets = list(self.npcs)
+        else:
+            targets = sorted(index.dirty, key=index.order.__getitem__)
+        index.dirty.clear()
 
-        for npc_id, npc in self.npcs.items():
+        for npc_id in targets:
+            npc = self.npcs[npc_id]
             faction_id = npc.get("faction")
             faction = factions.get(faction_id, {})
             faction_attitude = float(faction.get("attitude", {}).get("players", 0.0))
@@ -30,21 +111,23 @@ class NPCEngine:
 
             updates[npc_id] = {"trust_players": round(trust_players, 3)}
 
+            hooks = self._hooks_for(npc_id, npc)
+            if hooks:
+                index.active_hooks[npc_id] = hooks
+            else:
+                index.active_hooks.pop(npc_id, None)
+
         return updates
 
-    def record_event_memory(self, event: Dict[str, Any]) -> None:
+    def record_event_memory(self, event: Dict[str, Any]) -> Set[str]:
         """NPCs store short memory entries when affected by player actions."""
         action_text = event.get("action_text", "").lower()
         action_type = event.get("action_type", "neutral")
+        index = self.index
 
-        for npc_id, npc in self.npcs.items():
-            relevant = npc_id.lower() in action_text
-            npc_faction = str(npc.get("faction", "")).lower()
-            if npc_faction and npc_faction in action_text:
-                relevant = True
-
-            if not relevant:
-                continue
+        relevant = index.mentioned(action_text)
+        for npc_id in relevant:
+            npc = self.npcs[npc_id]
 
             impact = 0.0
             if action_type == "coop":
@@ -62,43 +145,59 @@ class NPCEngine:
             if len(memory) > 12:
                 npc["memory"] = memory[-12:]
 
+        index.dirty.update(relevant)
+        return relevant
+
     def find_active_hooks(self) -> List[Dict[str, str]]:
         """Return deterministic hook triggers from current NPC trust state."""
-        active: List[Dict[str, str]] = []
+        index = self.index
+        if index.dirty:
+            # Trust of dirty NPCs is pending; fall back to a full scan
+            active: List[Dict[str, str]] = []
+            for npc_id, npc in self.npcs.items():
+                active.extend(self._hooks_for(npc_id, npc))
+            return active
+
+        active = []
+        for npc_id in sorted(index.active_hooks, key=index.order.__getitem__):
+            active.extend(index.active_hooks[npc_id])
+        return active
 
-        for npc_id, npc in self.npcs.items():
-            trust = float(npc.get("trust", {}).get("players", 0.0))
-            hooks = npc.get("hooks", {})
-
-            fear_hook = hooks.get("fear")
-            desire_hook = hooks.get("desire")
-            debt_hook = hooks.get("debt")
-
-            if trust < -0.5 and fear_hook:
-                active.append(
-                    {
-                        "npc": npc_id,
-                        "type": "fear",
-                        "description": f"{npc_id} is afraid of the players and {fear_hook}",
-                    }
-                )
-
-            if trust > 0.7 and desire_hook:
-                active.append(
-                    {
-                        "npc": npc_id,
-                        "type": "desire",
-                        "description": f"{npc_id} trusts the players and wants {desire_hook}",
-                    }
-                )
-
-            if trust > 0.5 and debt_hook:
-                active.append(
-                    {
-                        "npc": npc_id,
-                        "type": "debt",
-                        "description": f"{npc_id} remembers owing the players and {debt_hook}",
-                    }
-                )
+    @staticmethod
+    def _hooks_for(npc_id: str, npc: Dict[str, Any]) -> List[Dict[str, str]]:
+        active: List[Dict[str, str]] = []
+        trust = float(npc.get("trust", {}).get("players", 0.0))
+        hooks = npc.get("hooks", {})
+
+        fear_hook = hooks.get("fear")
+        desire_hook = hooks.get("desire")
+        debt_hook = hooks.get("debt")
+
+        if trust < -0.5 and fear_hook:
+            active.append(
+                {
+                    "npc": npc_id,
+                    "type": "fear",
+                    "description": f"{npc_id} is afraid of the players and {fear_hook}",
+                }
+            )
+
+        if trust > 0.7 and desire_hook:
+            active.append(
+                {
+                    "npc": npc_id,
+                    "type": "desire",
+                    "description": f"{npc_id} trusts the players and wants {desire_hook}",
+                }
+            )
+
+        if trust > 0.5 and debt_hook:
+            active.append(
+                {
+                    "npc": npc_id,
+                    "type": "debt",
+                    "description": f"{npc_id} remembers owing the players and {debt_hook}",
+                }
+            )
 
         return active
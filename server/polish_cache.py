@@ -0,0 +1,155 @@
+"""
+Content-addressed cache for hybrid narrative polish
+
+Template renders come from a small finite library, so the same text reaches
+the polisher over and over. Polished output is cached under a hash of the
+normalized template text, the persona and the model:
+
+- An in-memory LRU tier serves repeated scenes with zero LLM calls
+- An optional SQLite file tier survives restarts and is shared by workers
+- Each entry remembers the persona fingerprint it was polished under; when a
+  persona's prompt changes, or the TTL passes, the entry is dropped on read
+- Hit/miss counters are exposed through stats()
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    """Collapse whitespace so cosmetic differences share one entry."""
+    return " ".join(text.split())
+
+
+def cache_key(text: str, persona: str, model: str) -> str:
+    """Content address for one polish request."""
+    payload = "\x1f".join((model, persona, normalize(text)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PolishCache:
+    """Two-tier (memory LRU + optional SQLite) cache of polished narration."""
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl: float = 86400.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path or None
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (polished, created_at, persona, fingerprint)
+        self._entries: "OrderedDict[str, Tuple[str, float, str, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS polish_cache ("
+                "key TEXT PRIMARY KEY, polished TEXT NOT NULL, created REAL NOT NULL, "
+                "persona TEXT NOT NULL, fingerprint TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def _fresh(self, created: float, fingerprint: str, current: str) -> bool:
+        return fingerprint == current and self._clock() - created < self.ttl
+
+    def get(self, text: str, persona: str, model: str, fingerprint: str = "") -> Optional[str]:
+        """Polished text for this template render, or None (counted as a miss)."""
+        key = cache_key(text, persona, model)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._fresh(entry[1], entry[3], fingerprint):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.invalidations += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT polished, created, persona, fingerprint FROM polish_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if self._fresh(row[1], row[3], fingerprint):
+                        self._remember(key, tuple(row))
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                    self._db.execute("DELETE FROM polish_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.invalidations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, persona: str, model: str, polished: str, fingerprint: str = "") -> None:
+        key = cache_key(text, persona, model)
+        entry = (polished, self._clock(), persona, fingerprint)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO polish_cache VALUES (?, ?, ?, ?, ?)", (key, *entry))
+                self._db.commit()
+
+    def _remember(self, key: str, entry: Tuple[str, float, str, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_persona(self, persona: str) -> int:
+        """Drop every entry polished for a persona; returns how many were in memory."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] == persona]
+            for key in stale:
+                del self._entries[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM polish_cache WHERE persona = ?", (persona,))
+                self._db.commit()
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM polish_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "disk_tier": self.path is not None,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,194 @@
+"""
+Precomputed polish tables for hybrid narration
+
+TEMPLATE_LIBRARY is finite: every render is one (frame, tone, atmosphere,
+consequence) prose cell followed by a shuffled option list. The build step
+polishes N variants of every prose cell ahead of time, through the async LLM
+gateway with any backend (OpenAI, a replayed recording, or the fake backend).
+Hybrid mode then serves LLM-quality prose at template latency and only
+polishes live for cells the table does not cover.
+
+File layout (compact, indexed, one cell decompressed at a time):
+
+    b"VDMPT1\\n" | u32 header length | header JSON | cell payloads
+
+The header holds build metadata plus {"frame|tone|a|c": [offset, length]};
+each payload is the zlib-compressed variants joined by a record separator.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .template_engine import TEMPLATE_LIBRARY
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VDMPT1\n"
+_SEPARATOR = "\x1e"
+
+Cell = Tuple[str, str, int, int]
+
+
+def cell_key(cell: Cell) -> str:
+    frame_key, tone, atmosphere_index, consequence_index = cell
+    return f"{frame_key}|{tone}|{atmosphere_index}|{consequence_index}"
+
+
+def iter_cells(
+    frames: Optional[Iterable[str]] = None,
+    tones: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[Cell, str]]:
+    """Every (cell, prose) pair in the template library, optionally filtered."""
+    frames = set(frames) if frames else None
+    tones = set(tones) if tones else None
+    for frame_key, frame in TEMPLATE_LIBRARY.items():
+        if frames is not None and frame_key not in frames:
+            continue
+        for tone, tone_data in frame["tones"].items():
+            if tones is not None and tone not in tones:
+                continue
+            for a, atmosphere in enumerate(tone_data["atmosphere"]):
+                for c, consequence in enumerate(tone_data["consequence"]):
+                    yield (frame_key, tone, a, c), f"{atmosphere}\n\n{consequence}"
+
+
+def write_polish_tables(path: str, cells: Dict[Cell, List[str]], meta: Dict) -> None:
+    index: Dict[str, List[int]] = {}
+    payloads: List[bytes] = []
+    offset = 0
+    for cell, variants in cells.items():
+        if not variants:
+            continue
+        payload = zlib.compress(_SEPARATOR.join(variants).encode("utf-8"), 9)
+        index[cell_key(cell)] = [offset, len(payload)]
+        payloads.append(payload)
+        offset += len(payload)
+
+    header = json.dumps({"meta": meta, "cells": index}, separators=(",", ":")).encode("utf-8")
+    with open(path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack(">I", len(header)))
+        handle.write(header)
+        for payload in payloads:
+            handle.write(payload)
+
+
+class PolishTables:
+    """Read-only view of a polish table file."""
+
+    def __init__(self, meta: Dict, index: Dict[str, List[int]], data: bytes):
+        self.meta = meta
+        self._index = index
+        self._data = data
+        self._decoded: Dict[str, Tuple[str, ...]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str) -> "PolishTables":
+        with open(path, "rb") as handle:
+            blob = handle.read()
+        if not blob.startswith(MAGIC):
+            raise ValueError(f"{path} is not a polish table file")
+        start = len(MAGIC)
+        (header_length,) = struct.unpack_from(">I", blob, start)
+        start += 4
+        header = json.loads(blob[start:start + header_length].decode("utf-8"))
+        return cls(header["meta"], header["cells"], blob[start + header_length:])
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, cell: Cell) -> bool:
+        return cell_key(cell) in self._index
+
+    def variants(self, cell: Cell, fingerprint: Optional[str] = None) -> Tuple[str, ...]:
+        """
+        Polished variants for a cell, or () if uncovered.
+
+        A fingerprint that differs from the one the tone was built with means
+        the persona or polish prompt changed since the build, so the cell is
+        treated as uncovered.
+        """
+        key = cell_key(cell)
+        location = self._index.get(key)
+        if location is None or (
+            fingerprint is not None and self.meta.get("fingerprints", {}).get(cell[1]) != fingerprint
+        ):
+            self.misses += 1
+            return ()
+
+        variants = self._decoded.get(key)
+        if variants is None:
+            offset, length = location
+            text = zlib.decompress(self._data[offset:offset + length]).decode("utf-8")
+            variants = tuple(text.split(_SEPARATOR))
+            self._decoded[key] = variants
+        self.hits += 1
+        return variants
+
+    def stats(self) -> Dict:
+        return {
+            "cells": len(self._index),
+            "variants_per_cell": self.meta.get("variants"),
+            "model": self.meta.get("model"),
+            "bytes": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def build_polish_tables(
+    path: str,
+    gateway,
+    variants: int = 3,
+    frames: Optional[Iterable[str]] = None,
+    tones: Optional[Iterable[str]] = None,
+    provider: Optional[str] = None,
+) -> Dict:
+    """
+    Polish every template cell `variants` times and write the table file.
+
+    Calls go through the gateway, so its concurrency limit and deadlines
+    apply. Cells whose polish fails are left out and fall back to live polish.
+    """
+    from .config import settings
+    from .hybrid_engine import POLISH_SYSTEM_PROMPT, _persona_fingerprint, _polish_prompt
+    from .llm_gateway import ChatRequest
+
+    cells = list(iter_cells(frames, tones))
+
+    async def polish(cell: Cell, prose: str) -> Tuple[Cell, List[str]]:
+        request = ChatRequest.from_prompt(
+            POLISH_SYSTEM_PROMPT, _polish_prompt(prose, cell[1]), temperature=0.7, max_tokens=300
+        )
+        results = await asyncio.gather(
+            # Each variant is its own sample, so identical requests must not coalesce
+            *(gateway.complete(request, provider=provider, coalesce=False) for _ in range(variants)),
+            return_exceptions=True,
+        )
+        polished: List[str] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Polish failed for {cell_key(cell)}: {result!r}")
+            elif result and result not in polished:
+                polished.append(result)
+        return cell, polished
+
+    built = dict(await asyncio.gather(*(polish(cell, prose) for cell, prose in cells)))
+    tone_names = sorted({cell[1] for cell in built})
+    meta = {
+        "version": 1,
+        "model": settings.openai_model,
+        "provider": provider or gateway.default_provider,
+        "variants": variants,
+        "fingerprints": {tone: _persona_fingerprint(tone) for tone in tone_names},
+    }
+    write_polish_tables(path, built, meta)
+
+    covered = sum(1 for polished in built.values() if polished)
+    return {"cells": len(cells), "covered": covered, "path": path}
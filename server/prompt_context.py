@@ -0,0 +1,402 @@
+"""
+Campaign context compaction and token-budgeted prompt assembly
+
+Prompts built from session memory used to carry the last few actions and
+silently forget everything older, or grow with the campaign when more
+history was included. Instead each session keeps a CampaignContext:
+
+- the most recent turns verbatim
+- older turns waiting to be folded into the summary ("pending")
+- a rolling summary of everything before that, capped in tokens
+
+Once enough turns are pending, a summarizer refreshes the summary in the
+background (a task on the running loop, or a worker thread for sync
+callers); prompts keep using the previous summary plus the pending turns
+until the refresh lands. assemble_prompt() then fits the sections into a
+token budget with deterministic truncation policies, so prompt size - and
+with it LLM latency - stays flat however long the campaign runs.
+
+Tokens are estimated at four characters each; it only needs to be stable,
+not exact.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+ELLIPSIS = "…"
+
+# Truncation policies
+KEEP = "keep"  # never cut
+HEAD = "head"  # keep the start
+TAIL = "tail"  # keep the end (newest lines of a log)
+DROP = "drop"  # all or nothing
+
+POLICIES = (KEEP, HEAD, TAIL, DROP)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_text(text: str, max_tokens: int, policy: str = TAIL) -> str:
+    """
+    Cut text to at most max_tokens, deterministically.
+
+    Multi-line text loses whole lines (the oldest for TAIL, the newest for
+    HEAD); a single line is cut at a word boundary and marked with an
+    ellipsis. Returns "" when nothing fits.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens <= 0 or policy == DROP:
+        return ""
+
+    lines = text.split("\n")
+    if len(lines) > 1:
+        kept: List[str] = []
+        ordered = reversed(lines) if policy == TAIL else iter(lines)
+        for line in ordered:
+            candidate = [line] + kept if policy == TAIL else kept + [line]
+            if estimate_tokens("\n".join(candidate)) > max_tokens:
+                break
+            kept = candidate
+        if kept:
+            return "\n".join(kept)
+        text = lines[-1] if policy == TAIL else lines[0]
+
+    room = max_tokens * CHARS_PER_TOKEN - len(ELLIPSIS)
+    if room <= 0:
+        return ""
+    if policy == TAIL:
+        cut = text[-room:]
+        space = cut.find(" ")
+        if 0 <= space < len(cut) - 1:
+            cut = cut[space + 1:]
+        return ELLIPSIS + cut
+    cut = text[:room]
+    space = cut.rfind(" ")
+    if space > 0:
+        cut = cut[:space]
+    return cut + ELLIPSIS
+
+
+@dataclass
+class PromptSection:
+    """One labelled block of a prompt."""
+
+    name: str
+    text: str
+    priority: int = 0  # lower priorities are cut first
+    policy: str = TAIL
+    min_tokens: int = 0  # cut no further than this before dropping lower priorities
+    label: Optional[str] = None  # rendered as "LABEL: text"; None renders text alone
+
+    def render(self, text: Optional[str] = None) -> str:
+        text = self.text if text is None else text
+        return f"{self.label}: {text}" if self.label else text
+
+
+@dataclass
+class AssembledPrompt:
+    text: str
+    tokens: int
+    budget: int
+    sections: Dict[str, int] = field(default_factory=dict)  # tokens per included section
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def assemble_prompt(sections: Iterable[PromptSection], budget: int, separator: str = "\n") -> AssembledPrompt:
+    """
+    Join non-empty sections in order, fitting them into `budget` tokens.
+
+    Sections are cut lowest priority first (later sections first among
+    equals): down to their min_tokens on a first pass, then dropped
+    entirely on a second. KEEP sections are never touched, so the prompt
+    only exceeds the budget if they alone do.
+    """
+    sections = [section for section in sections if section.text]
+    for section in sections:
+        if section.policy not in POLICIES:
+            raise ValueError(f"Unknown truncation policy: {section.policy}")
+
+    texts = [section.text for section in sections]
+
+    def size() -> int:
+        rendered = [section.render(text) for section, text in zip(sections, texts) if text]
+        return estimate_tokens(separator.join(rendered))
+
+    order = sorted(
+        (i for i, section in enumerate(sections) if section.policy != KEEP),
+        key=lambda i: (sections[i].priority, -i),
+    )
+    truncated: List[str] = []
+    for floor_to_min in (True, False):
+        for i in order:
+            over = size() - budget
+            if over <= 0:
+                break
+            if not texts[i]:
+                continue
+            section = sections[i]
+            have = estimate_tokens(texts[i])
+            keep = have - over
+            if floor_to_min:
+                if section.policy == DROP:
+                    continue
+                keep = max(section.min_tokens, keep)
+            elif section.policy == DROP or keep < max(section.min_tokens, 1):
+                # Less than the section's useful minimum is not worth sending
+                texts[i] = ""
+                continue
+            if keep >= have:
+                continue
+            texts[i] = truncate_text(texts[i], keep, section.policy)
+            if section.name not in truncated:
+                truncated.append(section.name)
+
+    kept = [(section, text) for section, text in zip(sections, texts) if text]
+    text = separator.join(section.render(body) for section, body in kept)
+    dropped = [section.name for section, body in zip(sections, texts) if not body]
+    return AssembledPrompt(
+        text=text,
+        tokens=estimate_tokens(text),
+        budget=budget,
+        sections={section.name: estimate_tokens(body) for section, body in kept},
+        truncated=[name for name in truncated if name not in dropped],
+        dropped=dropped,
+    )
+
+
+# === Summarizers ===
+
+# (previous summary, turns to fold in, token cap) -> new summary
+Summarizer = Callable[[str, List[str], int], Awaitable[str]]
+
+
+class StubSummarizer:
+    """
+    Local, deterministic summarizer for tests and template-only play.
+
+    Keeps the first clause of each turn and appends it to the previous
+    summary, dropping the oldest material once the cap is reached.
+    """
+
+    def __init__(self, clause_chars: int = 80):
+        self.clause_chars = clause_chars
+        self.calls = 0
+
+    async def __call__(self, summary: str, turns: List[str], max_tokens: int) -> str:
+        self.calls += 1
+        clauses = []
+        for turn in turns:
+            clause = turn.split(". ", 1)[0].strip().rstrip(".")
+            clauses.append(truncate_text(clause, self.clause_chars // CHARS_PER_TOKEN, HEAD) + ".")
+        combined = " ".join(part for part in [summary] + clauses if part)
+        return truncate_text(combined, max_tokens, TAIL)
+
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain the running summary of a tabletop campaign. Merge the new turns into the summary. "
+    "Keep names, open threads, promises and consequences; drop flavour text. Reply with the summary only."
+)
+
+
+class LLMSummarizer:
+    """Summarizes through the LLM gateway, falling back to `fallback` on any failure."""
+
+    def __init__(self, fallback: Optional[Summarizer] = None, timeout: Optional[float] = None):
+        self.fallback = fallback or StubSummarizer()
+        self.timeout = timeout
+
+    async def __call__(self, summary: str, turns: List[str], max_tokens: int) -> str:
+        from .llm_gateway import ChatRequest, get_gateway
+
+        prompt = (
+            f"SUMMARY SO FAR:\n{summary or '(none)'}\n\nNEW TURNS:\n" + "\n".join(turns)
+            + f"\n\nWrite the updated summary in under {max_tokens * 3 // 4} words."
+        )
+        try:
+            request = ChatRequest.from_prompt(SUMMARY_SYSTEM_PROMPT, prompt, temperature=0.2, max_tokens=max_tokens)
+            text = await get_gateway().complete(request, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Summary refresh via LLM failed, summarizing locally: {e!r}")
+            return await self.fallback(summary, turns, max_tokens)
+        return truncate_text(text.strip(), max_tokens, TAIL)
+
+
+_summarizer: Optional[Summarizer] = None
+
+
+def get_summarizer() -> Summarizer:
+    """The installed summarizer, or LLM-backed when narration uses an LLM."""
+    if _summarizer is not None:
+        return _summarizer
+    from .config import NarrationMode, settings
+    from .llm_gateway import gateway_available
+
+    if settings.narration_mode != NarrationMode.TEMPLATE and gateway_available():
+        return LLMSummarizer(timeout=settings.llm_timeout)
+    return StubSummarizer()
+
+
+def set_summarizer(summarizer: Optional[Summarizer]) -> None:
+    """Install a summarizer (e.g. StubSummarizer in tests); None restores the default."""
+    global _summarizer
+    _summarizer = summarizer
+
+
+# === Per-session context ===
+
+# Refreshes started without a running loop (sync callers)
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="context-summary")
+# Strong references so pending refresh tasks are not garbage collected
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+class CampaignContext:
+    """Rolling summary plus recent turns for one session."""
+
+    def __init__(
+        self,
+        recent_turns: int = 6,
+        summarize_every: int = 8,
+        summary_tokens: int = 160,
+        max_pending: Optional[int] = None,
+        summary: str = "",
+        summarized_turns: int = 0,
+        turns: int = 0,
+        recent: Iterable[str] = (),
+        pending: Iterable[Tuple[int, str]] = (),
+    ):
+        self.recent_turns = recent_turns
+        self.summarize_every = summarize_every
+        self.summary_tokens = summary_tokens
+        # If refreshes keep failing, the oldest pending turns are forgotten
+        self.max_pending = max_pending if max_pending is not None else summarize_every * 4
+        self.summary = summary
+        self.summarized_turns = summarized_turns
+        self.turns = turns
+        self.recent: List[str] = list(recent)
+        self.pending: List[Tuple[int, str]] = [tuple(item) for item in pending]
+        self.dropped_turns = 0
+        self.refreshes = 0
+        self.refreshing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, **state) -> "CampaignContext":
+        from .config import settings
+
+        return cls(
+            recent_turns=settings.context_recent_turns,
+            summarize_every=settings.context_summarize_every,
+            summary_tokens=settings.context_summary_tokens,
+            **state,
+        )
+
+    def record_turn(self, text: str) -> bool:
+        """Add a finished turn; returns True when a summary refresh is due."""
+        with self._lock:
+            self.turns += 1
+            self.recent.append(text)
+            while len(self.recent) > self.recent_turns:
+                turn_number = self.turns - len(self.recent) + 1
+                self.pending.append((turn_number, self.recent.pop(0)))
+            if len(self.pending) > self.max_pending:
+                overflow = len(self.pending) - self.max_pending
+                del self.pending[:overflow]
+                self.dropped_turns += overflow
+            return not self.refreshing and len(self.pending) >= self.summarize_every
+
+    async def refresh(self, summarizer: Optional[Summarizer] = None) -> bool:
+        """Fold the pending turns into the summary; False if nothing was folded."""
+        with self._lock:
+            if self.refreshing or not self.pending:
+                return False
+            self.refreshing = True
+            batch = list(self.pending)
+            summary = self.summary
+        try:
+            new_summary = await (summarizer or get_summarizer())(summary, [text for _, text in batch], self.summary_tokens)
+        except Exception as e:
+            logger.warning(f"Summary refresh failed, keeping {len(batch)} turns pending: {e!r}")
+            with self._lock:
+                self.refreshing = False
+            return False
+
+        last = batch[-1][0]
+        with self._lock:
+            self.summary = truncate_text(new_summary, self.summary_tokens, TAIL)
+            self.summarized_turns += sum(1 for number, _ in self.pending if number <= last)
+            self.pending = [item for item in self.pending if item[0] > last]
+            self.refreshes += 1
+            self.refreshing = False
+        return True
+
+    def schedule_refresh(self, summarizer: Optional[Summarizer] = None) -> None:
+        """Refresh in the background: a task on the running loop, else a worker thread."""
+        summarizer = summarizer or get_summarizer()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            _refresh_pool.submit(asyncio.run, self.refresh(summarizer))
+            return
+        task = loop.create_task(self.refresh(summarizer))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+    def record_and_compact(self, text: str, summarizer: Optional[Summarizer] = None) -> None:
+        if self.record_turn(text):
+            self.schedule_refresh(summarizer)
+
+    def sections(self) -> List[PromptSection]:
+        """History sections for assemble_prompt: summary, older turns, recent turns."""
+        with self._lock:
+            summary = self.summary
+            pending = [text for _, text in self.pending]
+            recent = list(self.recent)
+        return [
+            PromptSection("summary", summary, priority=1, policy=TAIL, label="STORY SO FAR"),
+            PromptSection("older_turns", "\n".join(pending), priority=0, policy=TAIL, label="EARLIER"),
+            PromptSection("recent_turns", "\n".join(recent), priority=2, policy=TAIL, min_tokens=40, label="RECENT TURNS"),
+        ]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "summary": self.summary,
+                "summarized_turns": self.summarized_turns,
+                "turns": self.turns,
+                "recent": list(self.recent),
+                "pending": [list(item) for item in self.pending],
+            }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "summarized_turns": self.summarized_turns,
+                "pending_turns": len(self.pending),
+                "recent_turns": len(self.recent),
+                "summary_tokens": estimate_tokens(self.summary),
+                "dropped_turns": self.dropped_turns,
+                "refreshes": self.refreshes,
+                "refreshing": self.refreshing,
+            }
+
+
+def session_context(memory: Dict) -> CampaignContext:
+    """The session's CampaignContext, created (or restored from a saved dict) on first use."""
+    context = memory.get("campaign_context")
+    if not isinstance(context, CampaignContext):
+        context = CampaignContext.from_settings(**(context or {}))
+        memory["campaign_context"] = context
+    return context
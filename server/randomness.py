@@ -8,11 +8,35 @@ Implements:
 4. Optional deterministic mode for debugging/replay
 """
 
+import os
 import secrets
 import hashlib
-from typing import Optional, List, Any, Dict
+import struct
+import sys
+import threading
+import weakref
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from fractions import Fraction
+from typing import Optional, List, Any, Dict, Sequence, Union
 from enum import Enum
 
+_WORD = struct.Struct("<Q")
+_WORD_BYTES = _WORD.size
+_WORD_SPAN = 1 << 64
+_FLOAT_SCALE = 2.0 ** -53
+
+# Deterministic generator versions. Version 1 hashes once per draw and is
+# kept so existing seeds replay bit-exact; version 2 takes eight 64-bit
+# outputs from each 64-byte blake2b block.
+STREAM_LEGACY = 1
+STREAM_COUNTER = 2
+_BLOCK = struct.Struct("<8Q")
+_BLOCK_WORDS = 8
+_BLOCK_PERSON = b"voicedm.ctr.v2"
+_default_stream_version = STREAM_COUNTER
+
 
 class RandomMode(str, Enum):
     """Randomness modes for different use cases"""
@@ -22,6 +46,371 @@ class RandomMode(str, Enum):
     LINEAR = "linear"      # Predictable sequences
 
 
+class EntropyPool:
+    """
+    Buffered OS entropy for SECURE mode.
+
+    Reads large blocks from os.urandom (the same CSPRNG secrets uses) and
+    hands the bytes out exactly once, so one syscall covers thousands of
+    dice instead of one per die. Floats take 53 bits of a 64-bit word;
+    bounded integers use rejection sampling (whole bytes for ranges up to
+    256, words above that), so there is no modulo bias. The next block is
+    fetched on a background thread while the current one is consumed, and
+    a forked child discards the inherited buffer so parent and child never
+    share output.
+    """
+
+    def __init__(self, block_size: int = 64 * 1024, background: bool = True):
+        """
+        Initialize an entropy pool.
+
+        Args:
+            block_size: Bytes read from os.urandom per refill
+            background: Prefetch the next block on a worker thread
+        """
+        self.block_size = max(_WORD_BYTES, block_size)
+        self.background = background
+        self._lock = threading.Lock()
+        self._tables: Dict[tuple, tuple] = {}
+        self._reset()
+        _pools.add(self)
+
+    def _reset(self) -> None:
+        self._buffer = b""
+        self._pos = 0
+        self._next: Optional[Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.refills = 0
+        self.bytes_served = 0
+
+    def _read_block(self) -> bytes:
+        return os.urandom(self.block_size)
+
+    def _refill(self) -> None:
+        """Swap in the next block; caller holds the lock."""
+        self._buffer = self._next.result() if self._next is not None else self._read_block()
+        self._pos = 0
+        self.refills += 1
+        if self.background:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="entropy-pool")
+            self._next = self._executor.submit(self._read_block)
+
+    def take(self, count: int) -> bytes:
+        """The next `count` random bytes."""
+        with self._lock:
+            self.bytes_served += count
+            if count >= self.block_size:
+                return os.urandom(count)
+            end = self._pos + count
+            if end <= len(self._buffer):
+                chunk = self._buffer[self._pos:end]
+                self._pos = end
+                return chunk
+            head = self._buffer[self._pos:]
+            self._refill()
+            rest = count - len(head)
+            self._pos = rest
+            return head + self._buffer[:rest]
+
+    def _byte(self) -> int:
+        with self._lock:
+            if self._pos >= len(self._buffer):
+                self._refill()
+            value = self._buffer[self._pos]
+            self._pos += 1
+            self.bytes_served += 1
+            return value
+
+    def word(self) -> int:
+        """One uniformly random 64-bit integer."""
+        with self._lock:
+            if self._pos + _WORD_BYTES > len(self._buffer):
+                self._refill()
+            (value,) = _WORD.unpack_from(self._buffer, self._pos)
+            self._pos += _WORD_BYTES
+            self.bytes_served += _WORD_BYTES
+            return value
+
+    def random(self) -> float:
+        """Uniform float in [0.0, 1.0) with 53 bits of precision."""
+        return (self.word() >> 11) * _FLOAT_SCALE
+
+    def randoms(self, count: int) -> List[float]:
+        words = _words(self.take(count * _WORD_BYTES))
+        return [(value >> 11) * _FLOAT_SCALE for value in words]
+
+    def randbelow(self, n: int) -> int:
+        """Uniform integer in [0, n), without modulo bias."""
+        if n <= 0:
+            raise ValueError("randbelow bound must be positive")
+        if n <= 256:
+            # Bytes at or above the largest multiple of n would favour low results
+            limit = 256 - 256 % n
+            while True:
+                value = self._byte()
+                if value < limit:
+                    return value % n
+        if n > _WORD_SPAN:
+            return secrets.randbelow(n)
+        limit = _WORD_SPAN - _WORD_SPAN % n
+        while True:
+            value = self.word()
+            if value < limit:
+                return value % n
+
+    def integers(self, low: int, high: int, count: int) -> List[int]:
+        """`count` independent uniform integers in [low, high]."""
+        span = high - low + 1
+        if span <= 0:
+            raise ValueError("integers range is empty")
+        if span > _WORD_SPAN:
+            return [low + secrets.randbelow(span) for _ in range(count)]
+        if 0 <= low and high <= 255:
+            return self._small_integers(low, high, count)
+
+        limit = _WORD_SPAN - _WORD_SPAN % span
+        results = [low + value % span for value in _words(self.take(count * _WORD_BYTES)) if value < limit]
+        while len(results) < count:
+            missing = count - len(results)
+            results.extend(low + value % span for value in _words(self.take(missing * _WORD_BYTES)) if value < limit)
+        return results
+
+    def _small_integers(self, low: int, high: int, count: int) -> List[int]:
+        # One byte per value: translate() maps accepted bytes to results and
+        # deletes the rejected ones, all in C
+        tables = self._tables.get((low, high))
+        if tables is None:
+            span = high - low + 1
+            limit = 256 - 256 % span
+            table = bytes(low + value % span if value < limit else 0 for value in range(256))
+            tables = (table, bytes(range(limit, 256)), limit)
+            self._tables[(low, high)] = tables
+        table, rejected, limit = tables
+
+        values = bytearray()
+        while len(values) < count:
+            missing = count - len(values)
+            # Draw enough that one round almost always suffices
+            values += self.take(missing * 256 // limit + 8).translate(table, rejected)
+        return list(values[:count])
+
+    def randbelows(self, n: int, count: int) -> List[int]:
+        """`count` independent uniform integers in [0, n)."""
+        return self.integers(0, n - 1, count)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "block_size": self.block_size,
+            "refills": self.refills,
+            "bytes_served": self.bytes_served,
+            "buffered_bytes": len(self._buffer) - self._pos,
+            "background": self.background,
+        }
+
+
+def _words(data: bytes) -> List[int]:
+    return memoryview(data).cast("Q").tolist() if sys.byteorder == "little" else list(
+        struct.unpack(f"<{len(data) // _WORD_BYTES}Q", data)
+    )
+
+
+# Pools to scrub in a forked child, which must not replay the parent's buffer
+_pools: "weakref.WeakSet[EntropyPool]" = weakref.WeakSet()
+
+
+def _reset_pools_after_fork() -> None:
+    for pool in list(_pools):
+        pool._lock = threading.Lock()
+        pool._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+_entropy_pool = EntropyPool()
+
+
+def get_entropy_pool() -> EntropyPool:
+    """The shared OS entropy pool used by SECURE and WEIGHTED modes."""
+    return _entropy_pool
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table over integer weights.
+    
+    Each sample is one bounded integer draw: it picks a column and a
+    threshold position at once, then returns the column or its alias.
+    Integer arithmetic keeps the sampled distribution exactly
+    weight / sum(weights), with no float rounding.
+    """
+    
+    def __init__(self, weights: List[int]):
+        """
+        Build the table.
+        
+        Args:
+            weights: Non-negative integer weight per outcome index
+        """
+        if not weights or any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise ValueError("Alias table needs non-negative weights with a positive sum")
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n for w in weights]  # Column capacity is `total`
+        self.size = n
+        self.threshold = total
+        self.span = n * total
+        self.keep = [total] * n
+        self.alias = list(range(n))
+        
+        small = [i for i, w in enumerate(scaled) if w < total]
+        large = [i for i, w in enumerate(scaled) if w >= total]
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.keep[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= total - scaled[low]
+            (small if scaled[high] < total else large).append(high)
+    
+    def _pick(self, value: int) -> int:
+        column, position = divmod(value, self.threshold)
+        return column if position < self.keep[column] else self.alias[column]
+    
+    def sample(self, randbelow=None) -> int:
+        """One outcome index; `randbelow(n)` defaults to the entropy pool"""
+        column, position = divmod((randbelow or _entropy_pool.randbelow)(self.span), self.threshold)
+        return column if position < self.keep[column] else self.alias[column]
+    
+    def sample_many(self, count: int, integers=None) -> List[int]:
+        """
+        `count` outcome indices from one batch of draws.
+        
+        Args:
+            count: Number of samples
+            integers: `integers(low, high, count)` batch source, e.g. a
+                seeded RandomSource.randints; defaults to the entropy pool
+        """
+        pick = self._pick
+        return [pick(value) for value in (integers or _entropy_pool.integers)(0, self.span - 1, count)]
+    
+    def probabilities(self) -> List[Fraction]:
+        """Exact probability of each index as the table samples it"""
+        mass = [0] * self.size
+        for column in range(self.size):
+            mass[column] += self.keep[column]
+            mass[self.alias[column]] += self.threshold - self.keep[column]
+        return [Fraction(m, self.span) for m in mass]
+
+
+class PreparedDistribution:
+    """
+    Weights with the non-linear choice transform already applied.
+    
+    Normalizing, raising to ^1.5 and re-normalizing happen once here; a
+    draw is then one float and a bisect of the cumulative table. The
+    table is built with the same float operations, in the same order, as
+    the per-call transform it replaces, so seeded choices replay exactly.
+    """
+    
+    def __init__(self, weights: Sequence[float], bias: Optional[float] = None):
+        """
+        Prepare a distribution.
+        
+        Args:
+            weights: Raw weight per item
+            bias: When given, get_weighted_random's pre-pass is applied
+                first (weights ** (1 + bias) if bias > 0, then normalized)
+        """
+        self.weights = tuple(weights)
+        self.bias = bias
+        self.probabilities: List[float] = []
+        self.cumulative: List[float] = []
+        
+        base = list(self.weights)
+        if bias is not None:
+            if bias > 0:
+                base = [w ** (1.0 + bias) for w in base]
+            base_total = sum(base)
+            if base_total <= 0:
+                return
+            base = [w / base_total for w in base]
+        
+        total = sum(base)
+        if total <= 0:
+            return
+        transformed = [(w / total) ** 1.5 for w in base]
+        transformed_total = sum(transformed)
+        if transformed_total <= 0:
+            return
+        
+        self.probabilities = [w / transformed_total for w in transformed]
+        cumulative = 0.0
+        for weight in self.probabilities:
+            cumulative += weight
+            self.cumulative.append(cumulative)
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    @property
+    def uniform(self) -> bool:
+        """True when the weights carry no mass and choices fall back to uniform"""
+        return not self.cumulative
+    
+    def index(self, r: float) -> Optional[int]:
+        """First index whose cumulative weight reaches r, None past the end"""
+        i = bisect_left(self.cumulative, r)
+        return i if i < len(self.cumulative) else None
+
+
+DISTRIBUTION_CACHE_SIZE = 256
+
+_distribution_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_distribution_lock = threading.Lock()
+
+
+def prepare_distribution(weights: Sequence[float], bias: Optional[float] = None) -> PreparedDistribution:
+    """
+    Prepared distribution for `weights`, cached by the identity of the object.
+    
+    The cache holds a reference to `weights`, so its id cannot be reused
+    while cached. Tuples are safe to cache as-is; if a mutable sequence is
+    prepared and later changed in place, call invalidate_distribution.
+    """
+    key = (id(weights), bias)
+    with _distribution_lock:
+        entry = _distribution_cache.get(key)
+        if entry is not None and entry[0] is weights:
+            _distribution_cache.move_to_end(key)
+            return entry[1]
+    prepared = PreparedDistribution(weights, bias)
+    with _distribution_lock:
+        _distribution_cache[key] = (weights, prepared)
+        if len(_distribution_cache) > DISTRIBUTION_CACHE_SIZE:
+            _distribution_cache.popitem(last=False)
+    return prepared
+
+
+def invalidate_distribution(weights: Optional[Sequence[float]] = None) -> int:
+    """
+    Drop cached preparations of `weights` (every one when None).
+    
+    Returns:
+        Number of cache entries removed
+    """
+    with _distribution_lock:
+        if weights is None:
+            removed = len(_distribution_cache)
+            _distribution_cache.clear()
+            return removed
+        stale = [key for key, (source, _) in _distribution_cache.items() if source is weights]
+        for key in stale:
+            del _distribution_cache[key]
+        return len(stale)
+
+
 class RandomSource:
     """
     Unified randomness source with multiple modes.
@@ -33,7 +422,8 @@ class RandomSource:
     def __init__(
         self,
         seed: Optional[str] = None,
-        mode: RandomMode = RandomMode.SECURE
+        mode: RandomMode = RandomMode.SECURE,
+        stream_version: Optional[int] = None
     ):
         """
         Initialize random source.
@@ -41,9 +431,17 @@ class RandomSource:
         Args:
             seed: Optional seed for deterministic mode
             mode: Randomness mode (secure, deterministic, weighted, linear)
+            stream_version: Deterministic generator (STREAM_COUNTER, or
+                STREAM_LEGACY to replay seeds recorded before it); defaults
+                to the configured version
         """
         self.mode = mode
-        self._counter = 0
+        self.stream_version = stream_version or _default_stream_version
+        if self.stream_version not in (STREAM_LEGACY, STREAM_COUNTER):
+            raise ValueError(f"Unknown deterministic stream version {self.stream_version}")
+        self._counter = 0  # Deterministic draws consumed
+        self._block_index = -1
+        self._block: tuple = ()
         
         if mode == RandomMode.DETERMINISTIC and seed is None:
             seed = "voicedm_deterministic"
@@ -59,16 +457,78 @@ class RandomSource:
     
     def _get_secure_float(self) -> float:
         """Get float from OS entropy pool"""
-        return secrets.randbelow(10**12) / 10**12
+        return _entropy_pool.random()
     
     def _get_deterministic_float(self) -> float:
         """Get deterministic float from seeded hash chain"""
+        if self.stream_version == STREAM_LEGACY:
+            self._counter += 1
+            h = hashlib.blake2b(
+                self._seed + self._counter.to_bytes(8, "big"),
+                digest_size=8
+            ).digest()
+            return int.from_bytes(h, "big") / 2**64
+        
+        block_index, lane = divmod(self._counter, _BLOCK_WORDS)
         self._counter += 1
-        h = hashlib.blake2b(
-            self._seed + self._counter.to_bytes(8, "big"),
-            digest_size=8
+        if block_index != self._block_index:
+            self._block = self._counter_block(block_index)
+            self._block_index = block_index
+        return (self._block[lane] >> 11) * _FLOAT_SCALE
+    
+    def _counter_block(self, block_index: int) -> tuple:
+        """The eight 64-bit outputs of one counter-mode block"""
+        digest = hashlib.blake2b(
+            self._seed + block_index.to_bytes(8, "big"),
+            digest_size=64,
+            person=_BLOCK_PERSON
         ).digest()
-        return int.from_bytes(h, "big") / 2**64
+        return _BLOCK.unpack(digest)
+    
+    def _deterministic_floats(self, count: int) -> List[float]:
+        """The next `count` deterministic floats, a whole block at a time"""
+        if self.stream_version == STREAM_LEGACY:
+            return [self._get_deterministic_float() for _ in range(count)]
+        
+        start = self._counter
+        end = start + count
+        first_block, offset = divmod(start, _BLOCK_WORDS)
+        last_block = (end - 1) // _BLOCK_WORDS
+        words: List[int] = []
+        for block_index in range(first_block, last_block + 1):
+            if block_index == self._block_index:
+                words.extend(self._block)
+            else:
+                words.extend(self._counter_block(block_index))
+        if count:
+            self._block_index = last_block
+            self._block = tuple(words[-_BLOCK_WORDS:])
+        self._counter = end
+        return [(word >> 11) * _FLOAT_SCALE for word in words[offset:offset + count]]
+    
+    @property
+    def seed(self) -> Optional[str]:
+        """Seed string identifying the deterministic stream (None if unseeded)"""
+        return self._seed.decode() if self._seed else None
+    
+    @property
+    def position(self) -> int:
+        """Index of the next deterministic draw"""
+        return self._counter
+    
+    def seek(self, position: int) -> None:
+        """
+        Move the deterministic stream so the next draw is number `position`.
+        
+        Any draw can be regenerated by seeking to its index; seeking costs
+        nothing until the next draw hashes its block.
+        
+        Args:
+            position: Zero-based draw index
+        """
+        if position < 0:
+            raise ValueError("Stream position must be non-negative")
+        self._counter = position
     
     def _get_linear_float(self) -> float:
         """Get linearly progressing value (lengthen/shorten pattern)"""
@@ -99,13 +559,18 @@ class RandomSource:
         # Scale to desired range
         return min_val + base * (max_val - min_val)
     
-    def choice(self, items: List[Any], weights: Optional[List[float]] = None) -> Any:
+    def choice(
+        self,
+        items: List[Any],
+        weights: Optional[Union[Sequence[float], PreparedDistribution]] = None
+    ) -> Any:
         """
         Choose random item from list.
         
         Args:
             items: List of items to choose from
-            weights: Optional weights for weighted selection
+            weights: Optional weights for weighted selection; tuples are
+                prepared once and cached, a PreparedDistribution is used as-is
         
         Returns:
             Selected item
@@ -121,38 +586,29 @@ class RandomSource:
         idx = int(self.rand_float(0, len(items)))
         return items[min(idx, len(items) - 1)]
     
-    def _weighted_choice(self, items: List[Any], weights: List[float]) -> Any:
+    def _weighted_choice(
+        self,
+        items: List[Any],
+        weights: Union[Sequence[float], PreparedDistribution]
+    ) -> Any:
         """Weighted random choice with non-linear probabilities"""
-        # Normalize weights
-        total = sum(weights)
-        if total <= 0:
+        if isinstance(weights, PreparedDistribution):
+            prepared = weights
+        elif isinstance(weights, tuple):
+            prepared = prepare_distribution(weights)
+        else:
+            # Lists may be mutated between calls, so they are not cached
+            prepared = PreparedDistribution(weights)
+        if prepared.uniform:
             return self.choice(items)
         
-        normalized = [w / total for w in weights]
-        
-        # Apply non-linear transformation (1.5 exponent creates non-linearity)
-        transformed = [w**1.5 for w in normalized]
-        
-        # Re-normalize
-        transformed_total = sum(transformed)
-        if transformed_total <= 0:
-            return self.choice(items)
-        
-        normalized_transformed = [w / transformed_total for w in transformed]
-        
-        # Weighted random selection
-        r = self.rand_float()
-        cumulative = 0.0
-        
-        for item, weight in zip(items, normalized_transformed):
-            cumulative += weight
-            if r <= cumulative:
-                self._weight_history.append(weight)
-                if len(self._weight_history) > 100:
-                    self._weight_history.pop(0)
-                return item
-        
-        return items[-1]
+        index = prepared.index(self.rand_float())
+        if index is None:
+            return items[-1]
+        self._weight_history.append(prepared.probabilities[index])
+        if len(self._weight_history) > 100:
+            self._weight_history.pop(0)
+        return items[index]
     
     def randint(self, a: int, b: int) -> int:
         """
@@ -168,8 +624,26 @@ class RandomSource:
         if a > b:
             a, b = b, a
         span = b - a + 1
+        if self.mode in (RandomMode.SECURE, RandomMode.WEIGHTED):
+            return a + _entropy_pool.randbelow(span)
         return a + int(self.rand_float(0, span))
     
+    def randints(self, a: int, b: int, count: int) -> List[int]:
+        """
+        Get `count` random integers in range [a, b] (inclusive).
+        
+        OS-entropy modes draw them from the pool in one batch; other modes
+        produce exactly the sequence of `count` randint calls.
+        """
+        if a > b:
+            a, b = b, a
+        if self.mode in (RandomMode.SECURE, RandomMode.WEIGHTED):
+            return _entropy_pool.integers(a, b, count)
+        if self.mode == RandomMode.DETERMINISTIC:
+            span = b - a + 1
+            return [a + int(base * span) for base in self._deterministic_floats(count)]
+        return [self.randint(a, b) for _ in range(count)]
+    
     def shuffle(self, items: List[Any]) -> List[Any]:
         """Shuffle list using current random mode"""
         shuffled = items.copy()
@@ -244,26 +718,182 @@ def set_global_seed(seed: Optional[str] = None, mode: RandomMode = RandomMode.SE
     _global_rng = RandomSource(seed=seed, mode=mode)
 
 
-def get_session_rng(session_id: str) -> RandomSource:
+def set_default_stream_version(version: int) -> None:
+    """Choose the deterministic generator new RandomSources use by default"""
+    global _default_stream_version
+    if version not in (STREAM_LEGACY, STREAM_COUNTER):
+        raise ValueError(f"Unknown deterministic stream version {version}")
+    _default_stream_version = version
+
+
+SESSION_SUBSTREAMS = ("dice", "oracle", "templates", "fluctuation")
+ROOT_STREAM = "root"
+
+
+class SessionStreams:
+    """
+    Deterministic RNG streams for one session.
+    
+    The root stream uses the session seed; each subsystem gets its own
+    stream forked from it by name, so dice rolls never shift template or
+    oracle draws. Streams persist between calls and their positions can be
+    checkpointed to JSON and restored to resume (or replay) exactly.
+    """
+    
+    def __init__(
+        self,
+        session_id: str,
+        seed: Optional[str] = None,
+        stream_version: Optional[int] = None
+    ):
+        """
+        Initialize a session's streams.
+        
+        Args:
+            session_id: Session the streams belong to
+            seed: Root seed; derived from the session ID if omitted
+            stream_version: Deterministic generator for every stream
+        """
+        self.session_id = session_id
+        if seed is None:
+            session_hash = hashlib.sha256(session_id.encode()).hexdigest()[:16]
+            seed = f"session_{session_hash}"
+        self.seed = seed
+        self.stream_version = stream_version or _default_stream_version
+        self._streams: Dict[str, RandomSource] = {}
+        self._lock = threading.Lock()
+    
+    def stream(self, name: str = ROOT_STREAM) -> RandomSource:
+        """The persistent stream for a subsystem (or the root stream)"""
+        rng = self._streams.get(name)
+        if rng is None:
+            with self._lock:
+                rng = self._streams.get(name)
+                if rng is None:
+                    seed = self.seed if name == ROOT_STREAM else f"{self.seed}:{name}"
+                    rng = RandomSource(
+                        seed=seed,
+                        mode=RandomMode.DETERMINISTIC,
+                        stream_version=self.stream_version
+                    )
+                    self._streams[name] = rng
+        return rng
+    
+    def checkpoint(self) -> Dict[str, Any]:
+        """JSON-safe snapshot of every stream's position"""
+        return {
+            "session_id": self.session_id,
+            "seed": self.seed,
+            "stream_version": self.stream_version,
+            "positions": {name: rng.position for name, rng in self._streams.items()},
+        }
+    
+    def restore(self, checkpoint: Dict[str, Any]) -> None:
+        """
+        Rewind or advance every stream to a checkpoint's positions.
+        
+        Streams the checkpoint does not mention go back to their start.
+        """
+        if checkpoint.get("seed", self.seed) != self.seed or (
+            checkpoint.get("stream_version", self.stream_version) != self.stream_version
+        ):
+            raise ValueError("Checkpoint belongs to a different seed or generator")
+        positions = checkpoint.get("positions", {})
+        for name in set(positions) | set(self._streams):
+            self.stream(name).seek(positions.get(name, 0))
+    
+    @classmethod
+    def from_checkpoint(
+        cls,
+        checkpoint: Dict[str, Any],
+        session_id: Optional[str] = None
+    ) -> "SessionStreams":
+        """Rebuild streams from a checkpoint, optionally under a new session ID"""
+        streams = cls(
+            session_id or checkpoint["session_id"],
+            seed=checkpoint["seed"],
+            stream_version=checkpoint.get("stream_version")
+        )
+        streams.restore(checkpoint)
+        return streams
+
+
+class StreamRegistry:
+    """Process-wide registry of per-session RNG streams"""
+    
+    def __init__(self):
+        self._sessions: Dict[str, SessionStreams] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, session_id: str, seed: Optional[str] = None) -> SessionStreams:
+        """The session's streams, created on first use (with `seed`, if given)"""
+        streams = self._sessions.get(session_id)
+        if streams is None:
+            with self._lock:
+                streams = self._sessions.get(session_id)
+                if streams is None:
+                    streams = SessionStreams(session_id, seed=seed)
+                    self._sessions[session_id] = streams
+        return streams
+    
+    def checkpoint(self, session_id: str) -> Dict[str, Any]:
+        return self.get(session_id).checkpoint()
+    
+    def restore(self, session_id: str, checkpoint: Dict[str, Any]) -> SessionStreams:
+        """Install a checkpoint's streams as the session's, replacing any existing ones"""
+        streams = SessionStreams.from_checkpoint(checkpoint, session_id=session_id)
+        with self._lock:
+            self._sessions[session_id] = streams
+        return streams
+    
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_stream_registry = StreamRegistry()
+
+
+def get_stream_registry() -> StreamRegistry:
+    """The registry behind get_session_rng"""
+    return _stream_registry
+
+
+def get_session_rng(session_id: str, stream: str = ROOT_STREAM) -> RandomSource:
     """
     Get a random source for a specific session.
     Creates deterministic but unique randomness per session.
+    
+    The source persists, so successive calls continue one sequence instead
+    of restarting it; pass a subsystem name (see SESSION_SUBSTREAMS) for
+    that subsystem's forked stream.
     """
-    session_hash = hashlib.sha256(session_id.encode()).hexdigest()[:16]
-    return RandomSource(seed=f"session_{session_hash}", mode=RandomMode.DETERMINISTIC)
+    return _stream_registry.get(session_id).stream(stream)
 
 
 def get_weighted_random(
     items: List[Any],
-    base_weights: Optional[List[float]] = None,
+    base_weights: Optional[Sequence[float]] = None,
     bias: float = 0.0,
     non_linear: bool = True
 ) -> Any:
-    """Get item with weighted non-linear probability"""
+    """
+    Get item with weighted non-linear probability.
+    
+    Tuple weights are prepared once per (tuple, bias) and reused; pass the
+    same tuple object on every call to benefit.
+    """
     if not items:
         raise ValueError("No items to choose from")
     
     rng = get_global_rng()
+    items = list(items)
     
     # Default to equal weights
     if base_weights is None:
@@ -272,17 +902,11 @@ def get_weighted_random(
     if len(base_weights) != len(items):
         raise ValueError("Weights must match items length")
     
-    # Apply bias for non-linear distribution
-    if non_linear and bias > 0:
-        transformed = [w ** (1.0 + bias) for w in base_weights]
+    # Bias only applies to the non-linear distribution
+    effective_bias = bias if non_linear else 0.0
+    if isinstance(base_weights, tuple):
+        prepared = prepare_distribution(base_weights, effective_bias)
     else:
-        transformed = base_weights.copy()
-    
-    # Normalize
-    total = sum(transformed)
-    if total <= 0:
-        return rng.choice(items)
-    
-    normalized = [w / total for w in transformed]
+        prepared = PreparedDistribution(base_weights, effective_bias)
     
-    return rng.choice(items, normalized)
+    return rng.choice(items, prepared)
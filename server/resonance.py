@@ -1,6 +1,19 @@
-import re
 from typing import List, Tuple
 
+# (phrases, points, signal) - shared with server.text_analyzer
+CREATIVE_PHRASES = [
+    (["what if", "imagine", "suppose"], 0.4, "hypothetical"),
+    (["instead of", "rather than", "alternative"], 0.3, "alternative"),
+    (["because", "so that", "in order to"], 0.2, "purposeful"),
+    (["risk", "gamble", "bet"], 0.3, "risky"),
+    (["improv", "adapt", "wing it"], 0.4, "adaptive"),
+    (["hidden", "secret", "concealed"], 0.3, "discovery"),
+    (["decoy", "distract", "misdirect"], 0.4, "tactical"),
+    (["hack", "bypass", "workaround"], 0.3, "clever")
+]
+
+METAPHOR_PHRASES = ["like a", "as if", "as though", "similar to"]
+
 def analyze_imagination(text: str) -> Tuple[float, List[str]]:
     """Analyze text for creative/imaginative elements"""
     text_lower = text.lower()
@@ -16,31 +29,17 @@ def analyze_imagination(text: str) -> Tuple[float, List[str]]:
         signals.append("elaborate")
     
     # Creative signals
-    creative_phrases = [
-        (["what if", "imagine", "suppose"], 0.4, "hypothetical"),
-        (["instead of", "rather than", "alternative"], 0.3, "alternative"),
-        (["because", "so that", "in order to"], 0.2, "purposeful"),
-        (["risk", "gamble", "bet"], 0.3, "risky"),
-        (["improv", "adapt", "wing it"], 0.4, "adaptive"),
-        (["hidden", "secret", "concealed"], 0.3, "discovery"),
-        (["decoy", "distract", "misdirect"], 0.4, "tactical"),
-        (["hack", "bypass", "workaround"], 0.3, "clever")
-    ]
-    
-    for phrases, points, signal in creative_phrases:
+    for phrases, points, signal in CREATIVE_PHRASES:
         if any(phrase in text_lower for phrase in phrases):
             score += points
             if signal not in signals:
                 signals.append(signal)
     
     # Metaphor/simile detection
-    metaphor_patterns = [r"like a", r"as if", r"as though", r"similar to"]
-    for pattern in metaphor_patterns:
-        if re.search(pattern, text_lower):
-            score += 0.5
-            if "metaphoric" not in signals:
-                signals.append("metaphoric")
-            break
+    if any(phrase in text_lower for phrase in METAPHOR_PHRASES):
+        score += 0.5
+        if "metaphoric" not in signals:
+            signals.append("metaphoric")
     
     # Dialogue inclusion
     if '"' in text or "'" in text:
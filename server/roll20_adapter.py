@@ -11,11 +11,17 @@ Key principles:
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import re
 
+from .circuit_breaker import deadline_scope
+from .config import DebugLevel, settings
+
 router = APIRouter()
 
+_TAG_RE = re.compile(r'<[^>]+>')
+
 
 class Roll20Event(BaseModel):
     """Incoming command from Roll20 via relay"""
@@ -25,6 +31,13 @@ class Roll20Event(BaseModel):
     text: str
     selected: list[str] = []
     ts: int | None = None
+    debug_level: DebugLevel | None = None  # Defaults to the campaign's, then settings.debug_level
+    deadline: float | None = None  # Seconds for narration; defaults to settings.narration_deadline
+
+
+def request_deadline(evt: Roll20Event) -> float:
+    """Narration budget for one event; LLM calls past it fall back to templates."""
+    return evt.deadline if evt.deadline is not None else settings.narration_deadline
 
 
 def sanitize_input(text: str, max_length: int = 500) -> str:
@@ -42,7 +55,7 @@ def sanitize_input(text: str, max_length: int = 500) -> str:
         raise ValueError(f"Input too long (max {max_length} characters)")
     
     # Strip HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _TAG_RE.sub('', text)
     
     # Remove excessive whitespace
     text = ' '.join(text.split())
@@ -74,7 +87,7 @@ async def roll20_command(evt: Roll20Event):
     
     # Import here to avoid circular dependencies
     from .memory import get_memory, update_memory
-    from .llm import generate_narration_with_persona
+    from .llm import agenerate_narration_with_persona
     
     memory = get_memory(session_id)
     
@@ -174,7 +187,8 @@ IMPORTANT:
 """
     
     try:
-        result = generate_narration_with_persona(session_id, prompt, persona)
+        with deadline_scope(request_deadline(evt)):
+            result = await agenerate_narration_with_persona(session_id, prompt, persona)
         
         # Style the response for Roll20 chat
         narration = result.get('text', '')
@@ -191,6 +205,74 @@ IMPORTANT:
         }
 
 
+@router.post("/roll20/event")
+async def roll20_event(evt: Roll20Event):
+    """
+    Run a Roll20 action through the full DM pipeline (frames, geomancer,
+    factions, NPCs) with non-blocking narration.
+    """
+    session_id = f"roll20:{evt.campaign_id}"
+
+    try:
+        clean_text = sanitize_input(evt.text)
+    except ValueError as e:
+        return {
+            "chat": f"<b>Error:</b> {str(e)}"
+        }
+
+    from .dm_engine import aprocess_roll20_event, resolve_debug_level
+
+    try:
+        # A campaign may have stored a tier this server no longer knows
+        debug_level = resolve_debug_level(session_id, evt.debug_level)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    with deadline_scope(request_deadline(evt)):
+        return await aprocess_roll20_event(
+            session_id, evt.player_name, clean_text, evt.selected, debug_level
+        )
+
+
+@router.post("/roll20/event/stream")
+async def roll20_event_stream(evt: Roll20Event, granularity: str = "sentence"):
+    """
+    Server-Sent Events version of /roll20/event.
+
+    Emits `chunk` events with narration text as it is generated and a
+    closing `final` event with the consolidated response.
+    """
+    from .dm_engine import astream_roll20_event, resolve_debug_level
+    from .narration_stream import GRANULARITIES, sse_event
+
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=422, detail=f"granularity must be one of {GRANULARITIES}")
+
+    session_id = f"roll20:{evt.campaign_id}"
+
+    try:
+        clean_text = sanitize_input(evt.text)
+        debug_level = resolve_debug_level(session_id, evt.debug_level)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def events():
+        # The response body is produced after this handler returns, so the
+        # deadline starts with the stream
+        with deadline_scope(request_deadline(evt)):
+            async for message in astream_roll20_event(
+                session_id, evt.player_name, clean_text, evt.selected, debug_level, granularity
+            ):
+                event = "chunk" if message["type"] == "narration_chunk" else "final"
+                yield sse_event(event, message)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/roll20/health")
 async def health_check():
     """Simple health check endpoint for Roll20 integration"""
@@ -0,0 +1,140 @@
+"""
+Single-flight request coalescing
+
+When several tables (or several clients at one table) trigger the same LLM
+or TTS request at the same moment, only the first caller - the leader -
+reaches the provider. Concurrent duplicates with the same key await the
+leader's call and share its result; if it fails, every waiter receives the
+same exception. Once the call settles the key is released, so later
+requests start a fresh call (caching is a separate concern).
+
+Async callers share one task, shielded so that one waiter being cancelled
+or timing out does not cancel the call for the others. Sync callers (the
+blocking OpenAI client running in worker threads) share a threading.Event.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def request_key(*parts: Any) -> str:
+    """Hash of request parts with whitespace-normalized strings."""
+
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    payload = json.dumps([normalize(part) for part in parts], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._tasks: Dict[str, asyncio.Future] = {}
+        self._calls: Dict[str, _SyncCall] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.fanned_out_errors = 0
+
+    async def run(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+    ) -> T:
+        """
+        Await factory() once per key among concurrent callers.
+
+        `timeout` bounds only this caller's wait; the shared call keeps
+        running for the other waiters.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        else:
+            self.coalesced += 1
+            task.add_done_callback(self._count_fan_out)
+
+        waiter = asyncio.shield(task)
+        if timeout is None:
+            return await waiter
+        return await asyncio.wait_for(waiter, timeout)
+
+    def _settle(self, key: str, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def _count_fan_out(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.fanned_out_errors += 1
+
+    def run_sync(self, key: str, fn: Callable[[], T]) -> T:
+        """Blocking variant for the sync client: one fn() per key across threads."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _SyncCall()
+                self._calls[key] = call
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    self.errors += 1
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+            if call.error is not None:
+                with self._lock:
+                    self.fanned_out_errors += 1
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks) + len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "errors": self.errors,
+            "fanned_out_errors": self.fanned_out_errors,
+        }
@@ -6,9 +6,19 @@ Design Philosophy:
 - Language is optional (this module provides it without ML)
 - Templates are composable, not scripted
 - Surprise comes from structure, not linguistics
+
+TEMPLATE_LIBRARY is compiled at import into immutable, indexed tables (every
+atmosphere/consequence pairing and every ordered 2-3 option pick
+pre-rendered), so a render is a few index draws and one string join. Draws
+take any RNG with randint(a, b) - the random module by default, or a
+session's RandomSource stream. This module has no package-relative imports
+so it can also be imported top-level (from template_engine import ...).
 """
+import math
 import random
-from typing import Dict, List, Tuple
+from itertools import permutations
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
 
 # Expanded template library with tone variations
 TEMPLATE_LIBRARY = {
@@ -488,12 +498,129 @@ def get_tone_variants(frame_key: str) -> List[str]:
         return ["classic"]
     return list(frame["tones"].keys())
 
+class TemplateRender(NamedTuple):
+    """One template draw, split into the prose cell and the option block."""
+    frame_key: str
+    tone: str
+    atmosphere_index: int
+    consequence_index: int
+    prose: str
+    options: Tuple[str, ...]
+
+    @property
+    def cell(self) -> Tuple[str, str, int, int]:
+        """(frame, tone, atmosphere, consequence) - the unit polish tables cover."""
+        return self.frame_key, self.tone, self.atmosphere_index, self.consequence_index
+
+    def compose(self, prose: str = None) -> str:
+        """Full narration, optionally with replacement (e.g. polished) prose."""
+        narrative = f"{self.prose if prose is None else prose}\n\n"
+        narrative += "What do you do?\n"
+        for i, option in enumerate(self.options, 1):
+            narrative += f"{i}. {option}\n"
+        return narrative.strip()
+
+def resolve_cell(frame_key: str, tone: str) -> Tuple[str, str, Dict]:
+    """Apply the frame/tone fallbacks; returns (frame_key, tone, tone_data)."""
+    if frame_key not in TEMPLATE_LIBRARY:
+        frame_key = "straight"
+    frame = TEMPLATE_LIBRARY[frame_key]
+    
+    # Fallback to classic if tone not available
+    tone_data = frame["tones"].get(tone)
+    if not tone_data:
+        # Try classic as fallback
+        tone = "classic" if "classic" in frame["tones"] else next(iter(frame["tones"]))
+        tone_data = frame["tones"][tone]
+    return frame_key, tone, tone_data
+
+class CompiledTone(NamedTuple):
+    """Immutable render tables for one (frame, tone) cell."""
+    frame_key: str
+    tone: str
+    prose: Tuple[Tuple[str, ...], ...]  # [atmosphere][consequence] -> prose
+    option_picks: Tuple[Tuple[Tuple[str, ...], ...], ...]  # [k - 2][permutation] -> options
+    option_blocks: Tuple[Tuple[str, ...], ...]  # same shape, rendered "What do you do?" block
+    draw_space: int  # one integer draw in [0, draw_space) selects a whole render
+
+def _option_block(options: Tuple[str, ...]) -> str:
+    return "What do you do?\n" + "\n".join(f"{i}. {option}" for i, option in enumerate(options, 1))
+
+def _compile_tone(frame_key: str, tone: str, tone_data: Dict) -> CompiledTone:
+    prose = tuple(
+        tuple(f"{atmosphere}\n\n{consequence}" for consequence in tone_data["consequence"])
+        for atmosphere in tone_data["atmosphere"]
+    )
+    options = tuple(tone_data["options"])
+    # Every ordered pick of 2 or 3 options; uniform k then a uniform pick
+    # matches shuffling the list and taking the first k
+    picks = tuple(tuple(permutations(options, k)) for k in range(2, min(3, len(options)) + 1))
+    blocks = tuple(tuple(_option_block(pick) for pick in by_k) for by_k in picks)
+    # A multiple of every pick count, so the last digit stays uniform for each k
+    pick_space = math.lcm(*(len(by_k) for by_k in picks))
+    draw_space = len(prose) * len(prose[0]) * len(picks) * pick_space
+    return CompiledTone(frame_key, tone, prose, picks, blocks, draw_space)
+
+def compile_templates(library: Optional[Dict] = None) -> Mapping[Tuple[str, str], CompiledTone]:
+    """Compile a template library into a read-only {(frame, tone): CompiledTone} map."""
+    library = TEMPLATE_LIBRARY if library is None else library
+    return MappingProxyType({
+        (frame_key, tone): _compile_tone(frame_key, tone, tone_data)
+        for frame_key, frame in library.items()
+        for tone, tone_data in frame["tones"].items()
+    })
+
+COMPILED_TEMPLATES = compile_templates()
+_fallbacks: Dict[Tuple[str, str], CompiledTone] = {}
+
+def recompile_templates() -> None:
+    """Rebuild the tables after TEMPLATE_LIBRARY was edited at runtime."""
+    global COMPILED_TEMPLATES
+    COMPILED_TEMPLATES = compile_templates()
+    _fallbacks.clear()
+
+def compiled_cell(frame_key: str, tone: str = "classic") -> CompiledTone:
+    """Tables for a frame/tone, applying resolve_cell's fallbacks."""
+    compiled = COMPILED_TEMPLATES.get((frame_key, tone)) or _fallbacks.get((frame_key, tone))
+    if compiled is None:
+        resolved_frame, resolved_tone, _ = resolve_cell(frame_key, tone)
+        compiled = COMPILED_TEMPLATES[(resolved_frame, resolved_tone)]
+        # Keys come from frame selection and personas, so this stays small
+        _fallbacks[(frame_key, tone)] = compiled
+    return compiled
+
+def _draw_indices(compiled: CompiledTone, rng: Any) -> Tuple[int, int, int, int]:
+    """(atmosphere, consequence, k - 2, pick) from a single mixed-radix draw."""
+    draw, atmosphere_index = divmod(rng.randint(0, compiled.draw_space - 1), len(compiled.prose))
+    draw, consequence_index = divmod(draw, len(compiled.prose[0]))
+    draw, k_index = divmod(draw, len(compiled.option_picks))
+    return atmosphere_index, consequence_index, k_index, draw % len(compiled.option_picks[k_index])
+
+def draw_template(frame_key: str, tone: str = "classic", rng: Any = None) -> TemplateRender:
+    """Draw atmosphere, consequence and options exactly as render_template does."""
+    compiled = compiled_cell(frame_key, tone)
+    a, c, k, p = _draw_indices(compiled, rng or random)
+    return TemplateRender(compiled.frame_key, compiled.tone, a, c, compiled.prose[a][c], compiled.option_picks[k][p])
+
+def render_batch(frame_key: str, tone: str = "classic", count: int = 1, rng: Any = None) -> List[str]:
+    """`count` independent renders of one frame/tone, drawn in order from `rng`."""
+    compiled = compiled_cell(frame_key, tone)
+    rng = rng or random
+    prose = compiled.prose
+    blocks = compiled.option_blocks
+    renders = []
+    for _ in range(count):
+        a, c, k, p = _draw_indices(compiled, rng)
+        renders.append(f"{prose[a][c]}\n\n{blocks[k][p]}")
+    return renders
+
 def render_template(
     frame_key: str,
     tone: str = "classic",
     scene_context: str = "",
     player_action: str = "",
-    imagination_signals: List[str] = None
+    imagination_signals: List[str] = None,
+    rng: Any = None
 ) -> str:
     """
     Generate narrative from templates. Pure deterministic, zero ML.
@@ -504,35 +631,14 @@ def render_template(
         scene_context: Current scene description (for context only)
         player_action: What the player just did (for context only)
         imagination_signals: Creative signals from player input (unused but available)
+        rng: Random stream to draw from (randint(a, b)); defaults to the random module
     
     Returns:
         Formatted narrative text with atmosphere + consequence + options
     """
-    frame = TEMPLATE_LIBRARY.get(frame_key, TEMPLATE_LIBRARY["straight"])
-    
-    # Fallback to classic if tone not available
-    tone_data = frame["tones"].get(tone)
-    if not tone_data:
-        # Try classic as fallback
-        tone_data = frame["tones"].get("classic", list(frame["tones"].values())[0])
-    
-    # Select random elements for variety
-    atmosphere = random.choice(tone_data["atmosphere"])
-    consequence = random.choice(tone_data["consequence"])
-    
-    # Select 2-3 options randomly
-    all_options = tone_data["options"].copy()
-    random.shuffle(all_options)
-    num_options = random.randint(2, min(3, len(all_options)))
-    selected_options = all_options[:num_options]
-    
-    # Compose the narrative
-    narrative = f"{atmosphere}\n\n{consequence}\n\n"
-    narrative += "What do you do?\n"
-    for i, option in enumerate(selected_options, 1):
-        narrative += f"{i}. {option}\n"
-    
-    return narrative.strip()
+    compiled = compiled_cell(frame_key, tone)
+    a, c, k, p = _draw_indices(compiled, rng or random)
+    return f"{compiled.prose[a][c]}\n\n{compiled.option_blocks[k][p]}"
 
 def get_template_stats() -> Dict:
     """Get statistics about the template library"""
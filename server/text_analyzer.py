@@ -0,0 +1,267 @@
+"""
+Single-pass player input analyzer
+
+process_roll20_event used to scan every action a dozen times: the safety
+regexes in ethics.py, the cooperative/disruptive keyword checks in
+dm_engine.classify_action and the imagination phrase lists in resonance.py.
+
+This module compiles every literal from those tables into one trie-shaped
+regex at import time and walks the lowered input once. Each hit position
+reports all phrases that start there (so overlapping phrases such as
+"like a" / "assist" or "bet" / "betray" are never lost), and the regex-only
+safety rules are verified anchored at their trigger positions.
+
+The results are identical to calling the individual functions; those remain
+the reference implementations.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from .ethics import MAX_INPUT_LENGTH, PROBLEMATIC_PATTERNS
+from .resonance import CREATIVE_PHRASES, METAPHOR_PHRASES
+
+ACTION_MARKERS = {
+    "coop": ["help", "assist", "support", "together", "protect"],
+    "disrupt": ["kill", "burn", "explode", "betray", "steal"],
+}
+
+# Tag kinds attached to phrases in the combined matcher
+_ACTION = "action"
+_CREATIVE = "creative"
+_METAPHOR = "metaphor"
+_SAFETY = "safety"
+_QUOTE = "quote"
+
+
+@dataclass
+class InputAnalysis:
+    """Everything the DM pipeline needs to know about one player input."""
+
+    valid: bool
+    issues: List[str]
+    sanitized: str
+    action_type: str = "neutral"
+    coop_hits: int = 0
+    disrupt_hits: int = 0
+    imagination_score: float = 0.0
+    imagination_signals: List[str] = field(default_factory=list)
+
+    @property
+    def action(self) -> Tuple[str, int, int]:
+        """Same shape as dm_engine.classify_action."""
+        return self.action_type, self.coop_hits, self.disrupt_hits
+
+    @property
+    def imagination(self) -> Tuple[float, List[str]]:
+        """Same shape as resonance.analyze_imagination."""
+        return self.imagination_score, self.imagination_signals
+
+    def to_validation(self) -> Dict[str, Any]:
+        """Same shape as ethics.validate_player_input."""
+        return {"valid": self.valid, "issues": self.issues, "sanitized": self.sanitized}
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Build a prefix-factored alternation that prefers the longest word."""
+    root: Dict[str, Any] = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def emit(node: Dict[str, Any]) -> str:
+        children = sorted((char, child) for char, child in node.items() if char)
+        if not children:
+            return ""
+        parts = [re.escape(char) + emit(child) for char, child in children]
+        body = parts[0] if len(parts) == 1 else "(?:" + "|".join(parts) + ")"
+        if "" in node:
+            # A shorter word ends here; the greedy optional keeps longer ones first
+            body = "(?:" + body + ")?"
+        return body
+
+    return emit(root)
+
+
+class PhraseMatcher:
+    """Finds every occurrence of a fixed phrase set in one scan, overlaps included."""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = frozenset(phrase for phrase in phrases if phrase)
+        # The regex reports the longest phrase at each position; every shorter
+        # phrase starting there is one of its prefixes.
+        self._prefixes = {
+            phrase: tuple(phrase[:end] for end in range(1, len(phrase) + 1) if phrase[:end] in self.phrases)
+            for phrase in self.phrases
+        }
+        self._search = re.compile(trie_pattern(self.phrases)).search if self.phrases else None
+
+    def scan(self, text: str) -> Iterator[Tuple[int, Tuple[str, ...]]]:
+        """Yield (position, phrases starting at that position)."""
+        if self._search is None:
+            return
+        search = self._search
+        prefixes = self._prefixes
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            yield start, prefixes[match.group()]
+            match = search(text, start + 1)
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every phrase that occurs anywhere in text (same as `phrase in text`)."""
+        found: Set[str] = set()
+        for _, phrases in self.scan(text):
+            found.update(phrases)
+        return found
+
+
+class InputAnalyzer:
+    """Compiled multi-pattern matcher over the ethics/action/imagination tables."""
+
+    def __init__(
+        self,
+        action_markers: Dict[str, List[str]] = ACTION_MARKERS,
+        creative_phrases: Sequence[Tuple[List[str], float, str]] = CREATIVE_PHRASES,
+        metaphor_phrases: Sequence[str] = METAPHOR_PHRASES,
+        problematic_patterns: Sequence[Tuple[str, str, Tuple[str, ...]]] = PROBLEMATIC_PATTERNS,
+        max_length: int = MAX_INPUT_LENGTH,
+    ):
+        self.max_length = max_length
+        self._creative = list(creative_phrases)
+        self._safety = [(re.compile(pattern), description) for pattern, description, _ in problematic_patterns]
+
+        tags: Dict[str, List[Tuple[str, Any]]] = {}
+        for action_type, markers in action_markers.items():
+            for marker in markers:
+                tags.setdefault(marker, []).append((_ACTION, (action_type, marker)))
+        for index, (phrases, _, _) in enumerate(self._creative):
+            for phrase in phrases:
+                tags.setdefault(phrase, []).append((_CREATIVE, index))
+        for phrase in metaphor_phrases:
+            tags.setdefault(phrase, []).append((_METAPHOR, None))
+        for index, (_, _, triggers) in enumerate(problematic_patterns):
+            for trigger in triggers:
+                tags.setdefault(trigger, []).append((_SAFETY, index))
+        for quote in ('"', "'"):
+            tags.setdefault(quote, []).append((_QUOTE, None))
+
+        # The regex reports the longest phrase at each position; every shorter
+        # phrase starting there is one of its prefixes, so fold their tags in.
+        self._tags: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+        for phrase in tags:
+            merged: List[Tuple[str, Any]] = []
+            for end in range(1, len(phrase) + 1):
+                merged.extend(tags.get(phrase[:end], ()))
+            self._tags[phrase] = tuple(merged)
+
+        self._search = re.compile(trie_pattern(list(tags))).search
+
+    def analyze(self, text: str) -> InputAnalysis:
+        """
+        Analyze one raw player input in a single scan.
+
+        Action and imagination features are only filled in for valid input,
+        mirroring process_roll20_event which stops at the validation step.
+        """
+        if not text or len(text.strip()) == 0:
+            return InputAnalysis(valid=False, issues=["Empty input"], sanitized="")
+
+        lowered = text.lower()
+        actions = set()
+        creative = set()
+        safety = set()
+        metaphor = quote = False
+
+        search = self._search
+        tags = self._tags
+        match = search(lowered)
+        while match is not None:
+            start = match.start()
+            for kind, value in tags[match.group()]:
+                if kind == _ACTION:
+                    actions.add(value)
+                elif kind == _CREATIVE:
+                    creative.add(value)
+                elif kind == _METAPHOR:
+                    metaphor = True
+                elif kind == _QUOTE:
+                    quote = True
+                elif value not in safety and self._safety[value][0].match(lowered, start):
+                    safety.add(value)
+            match = search(lowered, start + 1)
+
+        issues: List[str] = []
+        if len(text) > self.max_length:
+            issues.append(f"Input too long ({len(text)} chars, max {self.max_length})")
+        issues.extend(description for index, (_, description) in enumerate(self._safety) if index in safety)
+
+        sanitized = text[:self.max_length].strip()
+        analysis = InputAnalysis(valid=not issues, issues=issues, sanitized=sanitized)
+        if issues:
+            return analysis
+
+        coop = sum(1 for action_type, _ in actions if action_type == "coop")
+        disrupt = sum(1 for action_type, _ in actions if action_type == "disrupt")
+        analysis.coop_hits = coop
+        analysis.disrupt_hits = disrupt
+        if coop > disrupt:
+            analysis.action_type = "coop"
+        elif disrupt > coop:
+            analysis.action_type = "disrupt"
+
+        analysis.imagination_score, analysis.imagination_signals = self._score_imagination(
+            sanitized, creative, metaphor, quote
+        )
+        return analysis
+
+    def _score_imagination(self, text: str, creative: set, metaphor: bool, quote: bool) -> Tuple[float, List[str]]:
+        # Same accumulation order as resonance.analyze_imagination so the
+        # floating point result is bit-identical.
+        score = 0.0
+        signals: List[str] = []
+
+        if len(text) > 100:
+            score += 0.3
+            signals.append("detailed")
+        elif len(text) > 60:
+            score += 0.2
+            signals.append("elaborate")
+
+        for index, (_, points, signal) in enumerate(self._creative):
+            if index in creative:
+                score += points
+                if signal not in signals:
+                    signals.append(signal)
+
+        if metaphor:
+            score += 0.5
+            signals.append("metaphoric")
+
+        if quote:
+            score += 0.2
+            signals.append("dialogue")
+
+        if text.endswith("?"):
+            score += 0.1
+            signals.append("inquisitive")
+
+        score = min(score, 1.0)
+
+        if score < 0.1 and len(text) > 5:
+            score = 0.1
+            signals.append("participatory")
+
+        return score, signals
+
+
+# Built once at import; shared by every session
+analyzer = InputAnalyzer()
+
+
+def analyze_input(text: str) -> InputAnalysis:
+    """Analyze player input with the shared compiled analyzer."""
+    return analyzer.analyze(text)
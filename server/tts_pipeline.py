@@ -0,0 +1,172 @@
+"""
+Sentence-pipelined TTS
+
+A single TTS call over the whole narration makes time-to-first-audio grow
+with narration length. The pipeline instead synthesizes sentence by
+sentence on a bounded worker pool while the text is still streaming, and
+emits ordered audio segments: segment N is released as soon as it and every
+segment before it are ready, so playback can start after the first sentence.
+
+Segments go through the content-addressed audio cache, so repeated sentences
+(greetings, stock options) are synthesized once and served by URL.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+
+from .config import settings
+from .narration_stream import SentenceChunker
+
+logger = logging.getLogger(__name__)
+
+Synthesizer = Callable[[str], Awaitable[bytes]]
+
+
+@dataclass(frozen=True)
+class AudioSegment:
+    index: int
+    text: str
+    audio_url: str
+
+    def to_message(self) -> dict:
+        return {"type": "audio_segment", "index": self.index, "text": self.text, "audio_url": self.audio_url}
+
+
+def gateway_synthesizer(voice: str, model: str, timeout: Optional[float] = None) -> Synthesizer:
+    """Synthesize through the shared LLM gateway."""
+    from .llm_gateway import SpeechRequest, get_gateway
+
+    gateway = get_gateway()
+
+    def synthesize(text: str) -> Awaitable[bytes]:
+        return gateway.synthesize(SpeechRequest(text=text, voice=voice, model=model), timeout=timeout)
+
+    return synthesize
+
+
+async def _aiter(sentences: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(sentences, "__aiter__"):
+        async for sentence in sentences:
+            yield sentence
+    else:
+        for sentence in sentences:
+            yield sentence
+
+
+async def synthesize_segments(
+    sentences: Union[Iterable[str], AsyncIterable[str]],
+    voice: str,
+    model: str,
+    synthesize: Synthesizer,
+    workers: Optional[int] = None,
+) -> AsyncIterator[AudioSegment]:
+    """
+    Synthesize sentences concurrently (at most `workers` at a time) and
+    yield their segments in sentence order.
+
+    Sentences may arrive from a live stream; look-ahead is bounded to twice
+    the pool size. A failed synthesis raises at its position in the order.
+    """
+    from .audio_cache import audio_cache
+
+    workers = workers or settings.tts_workers
+    semaphore = asyncio.Semaphore(workers)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+    async def synthesize_one(index: int, text: str) -> AudioSegment:
+        async with semaphore:
+            url = await audio_cache.aget_or_synthesize(text, voice, model, lambda: synthesize(text))
+        return AudioSegment(index, text, url)
+
+    async def produce() -> None:
+        try:
+            index = 0
+            async for sentence in _aiter(sentences):
+                text = sentence.strip()
+                if text:
+                    await pending.put(asyncio.ensure_future(synthesize_one(index, text)))
+                    index += 1
+        finally:
+            await pending.put(None)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            task = await pending.get()
+            if task is None:
+                break
+            yield await task
+        # Surface errors from the sentence source
+        await producer
+    finally:
+        producer.cancel()
+        while not pending.empty():
+            task = pending.get_nowait()
+            if task is not None:
+                task.cancel()
+
+
+async def speak_while_streaming(
+    chunks: AsyncIterable[str],
+    voice: str,
+    model: str,
+    synthesize: Synthesizer,
+    workers: Optional[int] = None,
+) -> AsyncIterator[Union[str, AudioSegment]]:
+    """
+    Forward text chunks as they arrive and interleave ordered AudioSegments
+    as soon as each completed sentence has been synthesized.
+    """
+    out: asyncio.Queue = asyncio.Queue()
+    sentences: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def narrate() -> None:
+        chunker = SentenceChunker()
+        try:
+            async for chunk in chunks:
+                await out.put(chunk)
+                for sentence in chunker.feed(chunk):
+                    await sentences.put(sentence)
+            rest = chunker.flush()
+            if rest:
+                await sentences.put(rest)
+        finally:
+            await sentences.put(done)
+
+    async def queued_sentences() -> AsyncIterator[str]:
+        while True:
+            sentence = await sentences.get()
+            if sentence is done:
+                return
+            yield sentence
+
+    async def speak() -> None:
+        async for segment in synthesize_segments(queued_sentences(), voice, model, synthesize, workers):
+            await out.put(segment)
+
+    async def run(coro) -> None:
+        try:
+            await coro
+        except Exception as e:
+            # Fan the failure out to the consumer instead of losing it in the task
+            await out.put(e)
+        finally:
+            await out.put(done)
+
+    tasks = [asyncio.ensure_future(run(narrate())), asyncio.ensure_future(run(speak()))]
+    try:
+        finished = 0
+        while finished < len(tasks):
+            item = await out.get()
+            if item is done:
+                finished += 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import audio_cache as audio_store
+from server.audio_cache import AudioCache, audio_key
+from server.llm import agenerate_narration_with_persona
+from server.llm_gateway import FakeBackend, LLMGateway, set_gateway
+from server.main import app
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path / "audio"))
+    monkeypatch.setattr(audio_store, "audio_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def fake_backend():
+    backend = FakeBackend(responder=lambda request: "Welcome, travellers.")
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend)
+    set_gateway(gateway)
+    try:
+        yield backend
+    finally:
+        set_gateway(None)
+
+
+def test_key_covers_text_voice_and_model():
+    base = audio_key("Hello", "alloy", "tts-1")
+    assert base == audio_key("Hello", "alloy", "tts-1")
+    assert len({base, audio_key("Hello!", "alloy", "tts-1"), audio_key("Hello", "echo", "tts-1"),
+                audio_key("Hello", "alloy", "tts-1-hd")}) == 4
+
+
+def test_identical_lines_synthesize_once(cache):
+    calls = []
+
+    def synthesize():
+        calls.append(1)
+        return b"ID3audio"
+
+    first = cache.get_or_synthesize("Hello", "alloy", "tts-1", synthesize)
+    second = cache.get_or_synthesize("Hello", "alloy", "tts-1", synthesize)
+
+    assert first == second and first.startswith("/api/audio/") and first.endswith(".mp3")
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_narration_returns_url_not_base64(cache, fake_backend):
+    first = asyncio.run(agenerate_narration_with_persona("audio_table", "Greet us", "classic"))
+    second = asyncio.run(agenerate_narration_with_persona("audio_table", "Greet us again", "classic"))
+
+    assert "audio_base64" not in first
+    assert first["audio_url"] == second["audio_url"]
+    assert fake_backend.speech_calls == 1
+
+
+def test_endpoint_serves_ranges_and_cache_headers(cache):
+    audio = bytes(range(256)) * 4
+    key = audio_key("Roll for initiative", "onyx", "tts-1")
+    cache.put(key, audio)
+    client = TestClient(app)
+
+    full = client.get(f"/api/audio/{key}.mp3")
+    assert full.status_code == 200
+    assert full.content == audio
+    assert full.headers["content-type"] == "audio/mpeg"
+    assert "immutable" in full.headers["cache-control"]
+    assert full.headers["accept-ranges"] == "bytes"
+
+    partial = client.get(f"/api/audio/{key}.mp3", headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == audio[100:200]
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(audio)}"
+
+    revalidated = client.get(f"/api/audio/{key}.mp3", headers={"If-None-Match": full.headers["etag"]})
+    assert revalidated.status_code == 304
+
+    head = client.head(f"/api/audio/{key}.mp3")
+    assert head.status_code == 200 and head.headers["content-length"] == str(len(audio))
+
+
+def test_endpoint_operation_ids_are_unique():
+    operations = app.openapi()["paths"]["/api/audio/{audio_key}.mp3"]
+    assert len({operation["operationId"] for operation in operations.values()}) == len(operations) == 2
+
+
+def test_endpoint_rejects_unknown_and_malformed_keys(cache):
+    client = TestClient(app)
+    assert client.get(f"/api/audio/{'0' * 64}.mp3").status_code == 404
+    assert client.get("/api/audio/..%2F..%2Fetc%2Fpasswd.mp3").status_code == 404
@@ -0,0 +1,212 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import hybrid_engine
+from server.circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError, budget, deadline_scope
+from server.config import NarrationMode, settings
+from server.llm_gateway import ChatRequest, FakeBackend, FaultInjectingBackend, LLMGateway, set_gateway
+from server.main import app
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **kwargs):
+    options = dict(window=10, window_seconds=60.0, min_calls=4, failure_rate=0.5, slow_call_seconds=1.0, cooldown=30.0)
+    options.update(kwargs)
+    return CircuitBreaker("test", clock=clock, **options)
+
+
+def _gateway(backend, breaker=None, timeout=5.0):
+    gateway = LLMGateway(default_timeout=timeout, coalesce=False)
+    gateway.register(backend, max_concurrency=4, breaker=breaker)
+    return gateway
+
+
+def _request(text="narrate"):
+    return ChatRequest.from_prompt("sys", text, model="m")
+
+
+@pytest.fixture(autouse=True)
+def empty_polish_cache():
+    hybrid_engine.polish_cache.clear()
+    yield
+    hybrid_engine.polish_cache.clear()
+    set_gateway(None)
+
+
+def test_trips_on_failure_rate_and_recovers_through_probe():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True, False):
+        breaker.record_success(0.1) if ok else breaker.record_failure(0.1)
+
+    assert breaker.state == BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    clock.now = 30.0
+    assert breaker.state == BreakerState.HALF_OPEN
+    breaker.acquire()
+    assert not breaker.available  # only one probe at a time
+    breaker.record_success(0.1)
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.stats()["trips"] == 1 and breaker.stats()["rejected"] == 1
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure(0.1)
+    clock.now = 31.0
+    breaker.acquire()
+    breaker.record_failure(0.1)
+
+    assert breaker.state == BreakerState.OPEN
+    clock.now = 60.0
+    assert breaker.state == BreakerState.OPEN
+    clock.now = 61.0
+    assert breaker.state == BreakerState.HALF_OPEN
+
+
+def test_trips_on_slow_calls_and_forgets_old_outcomes():
+    clock = Clock()
+    breaker = _breaker(clock, failure_rate=1.0)
+    breaker.record_success(2.0)
+    breaker.record_success(2.0)
+    clock.now = 120.0  # outside the 60s window
+    for _ in range(3):
+        breaker.record_success(0.1)
+    assert breaker.state == BreakerState.CLOSED
+
+    breaker.record_success(1.5)
+    breaker.record_success(1.5)
+    assert breaker.state == BreakerState.CLOSED  # 2 of 5 slow
+    breaker.record_success(1.5)
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_gateway_fails_fast_once_open():
+    backend = FaultInjectingBackend(FakeBackend(), script=["error"] * 4)
+    breaker = _breaker(Clock())
+    gateway = _gateway(backend, breaker)
+
+    async def run():
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                await gateway.complete(_request())
+        with pytest.raises(CircuitOpenError):
+            await gateway.complete(_request())
+
+    asyncio.run(run())
+    assert backend.inner.calls == 0
+    assert sum(backend.injected.values()) == 4
+
+
+def test_hung_calls_time_out_and_count_as_failures():
+    backend = FaultInjectingBackend(script=["hang"] * 4)
+    breaker = _breaker(Clock())
+    gateway = _gateway(backend, breaker, timeout=0.02)
+
+    async def run():
+        for _ in range(4):
+            with pytest.raises(asyncio.TimeoutError):
+                await gateway.complete(_request())
+
+    asyncio.run(run())
+    assert breaker.state == BreakerState.OPEN
+
+
+def test_request_deadline_bounds_every_call():
+    backend = FaultInjectingBackend(script=["hang", "hang"])
+    breaker = _breaker(Clock())
+    gateway = _gateway(backend, breaker, timeout=5.0)
+
+    async def run():
+        with deadline_scope(0.05):
+            started = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await gateway.complete(_request())
+            with pytest.raises(asyncio.TimeoutError):
+                await gateway.complete(_request())
+            return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 1.0
+    # The second call found no budget left and never reached the provider
+    assert backend.injected["hang"] == 1
+    assert breaker.stats()["window_calls"] == 1
+
+
+def test_nested_scopes_only_tighten():
+    assert budget(3.0) == 3.0
+    with deadline_scope(1.0):
+        with deadline_scope(10.0):
+            assert budget(None) <= 1.0
+        assert budget(0.5) == 0.5
+
+
+def test_stream_failures_feed_the_breaker():
+    backend = FaultInjectingBackend(script=["error"] * 4)
+    breaker = _breaker(Clock())
+    gateway = _gateway(backend, breaker)
+
+    async def run():
+        for _ in range(4):
+            with pytest.raises(ConnectionError):
+                async for _ in gateway.stream(_request()):
+                    pass
+        with pytest.raises(CircuitOpenError):
+            async for _ in gateway.stream(_request()):
+                pass
+
+    asyncio.run(run())
+
+
+def test_open_breaker_degrades_hybrid_to_templates(monkeypatch):
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    clock = Clock()
+    backend = FaultInjectingBackend(FakeBackend(responder=lambda request: "Polished narration."), script=["error"] * 4)
+    breaker = _breaker(clock)
+    set_gateway(_gateway(backend, breaker))
+
+    async def narrate():
+        return await hybrid_engine.agenerate_narrative("straight", tone="classic", player_action="I wave")
+
+    for _ in range(4):
+        assert asyncio.run(narrate()) != "Polished narration."
+    assert hybrid_engine.effective_narration_mode(asynchronous=True) == NarrationMode.TEMPLATE
+
+    asyncio.run(narrate())
+    assert sum(backend.injected.values()) == 4  # degraded narration skipped the provider
+
+    clock.now = 30.0
+    assert hybrid_engine.effective_narration_mode(asynchronous=True) == NarrationMode.HYBRID
+    assert asyncio.run(narrate()) == "Polished narration."
+    assert breaker.state == BreakerState.CLOSED
+
+
+def test_health_endpoint_reports_degradation(monkeypatch):
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    breaker = _breaker(Clock())
+    set_gateway(_gateway(FakeBackend(), breaker))
+    client = TestClient(app)
+
+    healthy = client.get("/health/llm").json()
+    assert healthy["status"] == "healthy"
+    assert healthy["breakers"]["gateway"]["fake"]["state"] == "closed"
+
+    for _ in range(4):
+        breaker.record_failure(0.1)
+    degraded = client.get("/health/llm").json()
+    assert degraded["status"] == "degraded"
+    assert degraded["effective_mode"] == "template"
+    assert degraded["breakers"]["gateway"]["fake"]["state"] == "open"
@@ -0,0 +1,59 @@
+from server.config import DebugLevel
+from server.dm_engine import process_roll20_event
+from server.faction_engine import FactionEngine
+from server.memory import get_memory
+
+ACTION = "I help the merchant guild and support the guards in the market_district."
+
+
+def test_request_level_controls_payload():
+    none = process_roll20_event("debug_tiers_a", "Aria", ACTION, [], debug_level="none")
+    summary = process_roll20_event("debug_tiers_a", "Aria", ACTION, [], debug_level=DebugLevel.SUMMARY)
+    full = process_roll20_event("debug_tiers_a", "Aria", ACTION, [], debug_level="full")
+
+    assert "debug" not in none and "chat" in none
+    assert "frame_selected" in summary["debug"]
+    assert "world_metrics" not in summary["debug"]
+    assert "faction_deltas" in full["debug"]
+    assert "faction_balance" in full["debug"]
+
+
+def test_campaign_level_and_request_override():
+    process_roll20_event("debug_tiers_b", "Aria", "debug none", [])
+    assert "debug" not in process_roll20_event("debug_tiers_b", "Aria", ACTION, [])
+    assert "debug" in process_roll20_event("debug_tiers_b", "Aria", ACTION, [], debug_level="summary")
+
+    process_roll20_event("debug_tiers_b", "Aria", "debug full", [])
+    assert "npc_updates" in process_roll20_event("debug_tiers_b", "Aria", ACTION, [])["debug"]
+
+    usage = process_roll20_event("debug_tiers_b", "Aria", "debug loud", [])
+    assert "Usage" in usage["chat"]
+
+
+def test_faction_balance_refreshed_at_every_level():
+    process_roll20_event("debug_tiers_c", "Aria", ACTION, [], debug_level="none")
+    world_graph = get_memory("debug_tiers_c")["world_graph"]
+    world_graph["faction_balance"] = {"stale": True}
+
+    process_roll20_event("debug_tiers_c", "Aria", ACTION, [], debug_level="none")
+    world_graph = get_memory("debug_tiers_c")["world_graph"]
+    assert world_graph["faction_balance"] == FactionEngine(world_graph).update_power_balance()
+
+
+def test_http_rejects_unknown_tier_only(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from server import dm_engine
+    from server.main import app
+
+    client = TestClient(app, raise_server_exceptions=False)
+    body = {"campaign_id": "debug_tiers_d", "player_name": "Aria", "text": ACTION, "debug_level": "loud"}
+    assert client.post("/api/v1/roll20/event", json=body).status_code == 422
+    assert client.post("/api/v1/roll20/event/stream", json=body).status_code == 422
+
+    async def broken(*args, **kwargs):
+        raise ValueError("internal detail")
+
+    monkeypatch.setattr(dm_engine, "aprocess_roll20_event", broken)
+    response = client.post("/api/v1/roll20/event", json={**body, "debug_level": "none"})
+    assert response.status_code == 500  # A server fault, not a bad request
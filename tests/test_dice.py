@@ -3,7 +3,10 @@ Tests for VoiceDM dice system
 """
 
 import pytest
+from server import bulk_dice
 from server.dice import DiceSystem, quick_roll, RollMode
+from server.mechanics.dice import DiceEngine, RandomnessMode
+from server.randomness import get_stream_registry
 
 
 class TestDiceSystem:
@@ -154,11 +157,17 @@ class TestQuickRoll:
     
     def test_quick_roll_session(self):
         """Test quick roll with session ID"""
-        result1 = quick_roll("d20", session_id="test-session")
-        result2 = quick_roll("d20", session_id="test-session")
+        registry = get_stream_registry()
+        registry.drop("test-session")
+        checkpoint = registry.checkpoint("test-session")
+        first = [quick_roll("d20", session_id="test-session").total for _ in range(8)]
         
-        # Same session should produce same result
-        assert result1.total == result2.total
+        # The session stream continues between rolls...
+        assert len(set(first)) > 1
+        
+        # ...and replays exactly from a checkpoint
+        registry.restore("test-session", checkpoint)
+        assert [quick_roll("d20", session_id="test-session").total for _ in range(8)] == first
 
 
 class TestDiceExpressions:
@@ -197,5 +206,71 @@ class TestDiceExpressions:
             quick_roll("2x6")
 
 
+class TestBulkRolls:
+    """Test batch rolling through the bulk API"""
+    
+    @pytest.fixture(params=["numpy", "array"])
+    def backend(self, request, monkeypatch):
+        if request.param == "numpy":
+            if bulk_dice.np is None:
+                pytest.skip("numpy not installed")
+        else:
+            monkeypatch.setattr(bulk_dice, "np", None)
+        return request.param
+    
+    def test_batch_matches_single_rolls(self, backend):
+        registry = get_stream_registry()
+        registry.drop("bulk-table")
+        checkpoint = registry.checkpoint("bulk-table")
+        single = [DiceSystem("bulk-table").roll("3d6+2").total for _ in range(50)]
+        
+        registry.restore("bulk-table", checkpoint)
+        batch = DiceSystem("bulk-table").roll_many("3d6+2", 50)
+        assert list(batch.totals) == single
+        assert len(batch) == 50
+        assert batch.roll(0) in ([a, b, c] for a in range(1, 7) for b in range(1, 7) for c in range(1, 7))
+    
+    def test_advantage_keeps_best_of_two(self, backend):
+        registry = get_stream_registry()
+        registry.drop("bulk-adv")
+        checkpoint = registry.checkpoint("bulk-adv")
+        single = [DiceSystem("bulk-adv").roll("d20 disadv").total for _ in range(30)]
+        
+        registry.restore("bulk-adv", checkpoint)
+        batch = DiceSystem("bulk-adv").roll_many("d20 disadv", 30)
+        assert list(batch.totals) == single
+        assert batch.dice == 2
+    
+    def test_large_totals(self, backend):
+        """Whole-roll totals beyond int16 are kept exactly"""
+        for expression in ("1000d100+1d4", "400d100+400d100", "700d100 advantage"):
+            system = DiceSystem()
+            batch = system.roll_many(expression, 5)
+            assert len(batch) == 5
+            assert all(total > 32767 for total in batch.totals)
+            assert batch.summary()["min"] > 32767
+    
+    def test_summary(self, backend):
+        batch = bulk_dice.BulkRolls("2d4", [1, 1, 4, 4, 2, 3, 1, 2], dice=2, sides=4, modifier=1)
+        summary = batch.summary()
+        assert summary["histogram"] == {3: 1, 9: 1, 6: 1, 4: 1}
+        assert summary["mean"] == 5.5 and summary["min"] == 3 and summary["max"] == 9
+        assert summary["stdev"] == 2.2913
+        assert batch.count_all(4) == 1
+        assert batch.to_dict(include_totals=True)["totals"] == [3, 9, 6, 4]
+    
+    def test_engine_3d6_batch(self, backend):
+        batch = DiceEngine(mode=RandomnessMode.SECURE).roll_3d6_many(3000, modifier=-1)
+        summary = batch.summary()
+        assert summary["count"] == 3000
+        assert 2 <= summary["min"] and summary["max"] <= 17
+        assert 9.0 < summary["mean"] < 10.0
+        
+        seeded = DiceEngine(mode=RandomnessMode.DETERMINISTIC, seed="bulk")
+        replay = DiceEngine(mode=RandomnessMode.DETERMINISTIC, seed="bulk")
+        batch = seeded.roll_3d6_many(20)
+        assert [batch.roll(i) for i in range(20)] == [replay.roll_3d6() for _ in range(20)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,115 @@
+"""
+Tests for the compiled dice expression grammar
+"""
+
+import itertools
+from fractions import Fraction
+
+import pytest
+
+from server.dice import DiceSystem, RollMode
+from server.dice_expression import (
+    ADVANTAGE,
+    KEEP_HIGHEST,
+    KEEP_LOWEST,
+    cache_info,
+    clear_cache,
+    compile_expression,
+    parse_expression,
+)
+from server.randomness import RandomMode, RandomSource
+
+
+def brute_force_mean(count, sides, reduce):
+    outcomes = list(itertools.product(range(1, sides + 1), repeat=count))
+    return Fraction(sum(reduce(outcome) for outcome in outcomes), len(outcomes))
+
+
+def test_parses_modifiers_and_terms():
+    compiled = parse_expression("4d6dl1 + 2d20kh1 - d4 + 3")
+    first, second, third, constant = compiled.terms
+    assert first.keep == (KEEP_HIGHEST, 3)
+    assert second.keep == (KEEP_HIGHEST, 1)
+    assert third.sign == -1 and constant.value == 3
+    assert compiled.normalized == "4d6dl1+2d20kh1-d4+3"
+
+    assert parse_expression("3d6kl2").terms[0].keep == (KEEP_LOWEST, 2)
+    assert parse_expression("2d10r<2").terms[0].reroll == frozenset({1, 2})
+    assert parse_expression("3d6!>5").terms[0].explode == 5
+    assert parse_expression("d20+4 adv").mode == ADVANTAGE
+
+
+@pytest.mark.parametrize("expression", ["invalid", "2x6", "d", "4d6kh5", "d6r<6", "d6!>1", "3d6dl3", "d20++"])
+def test_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_expression(expression)
+
+
+def test_exact_stats_match_enumeration():
+    drop_lowest = compile_expression("4d6dl1")
+    assert drop_lowest.mean == brute_force_mean(4, 6, lambda r: sum(sorted(r)[1:]))
+    assert (drop_lowest.min, drop_lowest.max) == (3, 18)
+
+    keep_low = compile_expression("3d6kl2")
+    assert keep_low.mean == brute_force_mean(3, 6, lambda r: sum(sorted(r)[:2]))
+
+    advantage = compile_expression("d20+4 adv")
+    assert advantage.mean == brute_force_mean(2, 20, max) + 4
+    assert (advantage.min, advantage.max) == (5, 24)
+
+    disadvantage = compile_expression("2d6 disadv")
+    pairs = itertools.product(itertools.product(range(1, 7), repeat=2), repeat=2)
+    assert disadvantage.mean == Fraction(sum(min(sum(a), sum(b)) for a, b in pairs), 6 ** 4)
+
+    assert compile_expression("d8+d6-1").mean == 7
+    assert compile_expression("2d10r<2").mean == 13
+    assert compile_expression("d6ro1").mean == Fraction(47, 12)
+    assert sum(compile_expression("3d6!").pmf.values()) == 1
+
+
+def test_evaluation_matches_distribution_support():
+    rng = RandomSource(seed="expr", mode=RandomMode.DETERMINISTIC)
+    for expression in ("4d6dl1", "3d6!", "2d10r<2+1", "d20-2 disadv", "d8+d6-1"):
+        compiled = compile_expression(expression)
+        totals = {compiled.evaluate(rng).total for _ in range(300)}
+        assert totals <= set(compiled.pmf)
+
+
+def test_bounds_match_pmf_support():
+    for expression in ("3d6!", "2d4!>2kh1", "d6r<2!", "d6ro1!>5", "-d6!+d4r4", "2d6 adv"):
+        compiled = compile_expression(expression)
+        assert (compiled.min, compiled.max) == (min(compiled.pmf), max(compiled.pmf))
+
+
+def test_bounds_skip_exploding_pmf():
+    compiled = compile_expression("d1000!>2")
+    assert (compiled.min, compiled.max) == (1, 9000)
+    assert "pmf" not in compiled.__dict__
+    assert compile_expression("1000d100!").max == 1000 * 100 * 9
+    
+    batch = DiceSystem().roll_many("1000d100!", 3)
+    assert all(compiled.min <= total for total in batch.totals)
+
+
+def test_cache_skips_parsing():
+    clear_cache()
+    first = compile_expression("2d6+3")
+    assert compile_expression("2d6+3") is first
+    info = cache_info()
+    assert (info["hits"], info["misses"]) == (1, 1)
+
+
+def test_dice_system_uses_grammar():
+    dice = DiceSystem("grammar-table")
+    result = dice.roll("4d6dl1")
+    assert len(result.rolls) == 4
+    assert len(result.metadata["dropped"]) == 1
+    assert result.total == sum(result.rolls) - result.metadata["dropped"][0]
+
+    result = dice.roll("d20+3 adv")
+    assert result.mode == RollMode.ADVANTAGE
+    assert result.total == max(result.rolls) + 3
+    assert dice.roll("3d6!").mode == RollMode.EXPLODING
+
+    batch = dice.roll_many("4d6dl1", 200)
+    assert all(3 <= total <= 18 for total in batch.totals)
@@ -0,0 +1,103 @@
+"""
+Tests for the per-session RNG draw log and its replay
+"""
+
+import gzip
+
+import pytest
+
+from server import draw_log
+from server.dice import DiceSystem
+from server.draw_log import DrawLog, close_draw_log, get_draw_log, replay_records
+from server.randomness import get_stream_registry
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(draw_log.settings, "draw_log_dir", str(tmp_path))
+    monkeypatch.setattr(draw_log.settings, "draw_log_segment_records", 8)
+    monkeypatch.setattr(draw_log.settings, "draw_log_max_segments", 3)
+    yield tmp_path
+
+
+def _fresh_session(name):
+    get_stream_registry().drop(name)
+    close_draw_log(name)
+    return name
+
+
+def test_disabled_without_directory(monkeypatch):
+    monkeypatch.setattr(draw_log.settings, "draw_log_dir", "")
+    assert get_draw_log("anyone") is None
+    assert DiceSystem("anyone").draw_log is None
+
+
+def test_rolls_are_logged_with_stream_counters(log_dir):
+    session = _fresh_session("log-counters")
+    dice = DiceSystem(session)
+    results = [dice.roll(expression) for expression in ("d20", "2d6+3", "4d6dl1", "d20 advantage")]
+    
+    records = list(dice.draw_log.records())
+    assert [r.seq for r in records] == [0, 1, 2, 3]
+    assert [r.args for r in records] == ["d20", "2d6+3", "4d6dl1", "d20 advantage"]
+    assert [r.result for r in records] == [[res.total, res.rolls] for res in results]
+    assert all(r.stream == dice.rng.seed and r.consumer == "dice.roll" for r in records)
+    # Counter ranges tile the stream
+    assert records[0].start == 0
+    assert all(a.end == b.start for a, b in zip(records, records[1:]))
+    assert records[-1].end == dice.rng.position
+    assert [r.draws for r in records] == [1, 2, 4, 2]
+    close_draw_log(session)
+
+
+def test_segments_are_bounded_and_compressed(log_dir):
+    session = _fresh_session("log-segments")
+    dice = DiceSystem(session)
+    for _ in range(50):
+        dice.roll("3d6")
+    log = dice.draw_log
+    segments = log.segments()
+    assert len(segments) == 3  # 6 written, oldest 3 pruned
+    with gzip.open(segments[0]) as handle:
+        assert b"voicedm.drawlog.v1" in handle.read()
+    
+    records = list(log.records())
+    assert records[0].seq == 24 and records[-1].seq == 49
+    assert log.stats()["buffered"] == 2
+    
+    # A new log object resumes numbering after the retained segments
+    close_draw_log(session)
+    resumed = DrawLog(str(log_dir), session, 8, 3)
+    assert resumed.stats()["records"] == 50
+
+
+def test_replay_is_bit_exact(log_dir):
+    session = _fresh_session("log-replay")
+    dice = DiceSystem(session)
+    for expression in ("d20", "3d6!", "2d10r<2+1", "d8+d6-1", "d20 disadvantage") * 4:
+        dice.roll(expression)
+    dice.roll_many("3d6+2", 500)
+    dice.roll_many("4d6dl1", 50)
+    close_draw_log(session)
+    
+    records = list(DrawLog(str(log_dir), session, 8, 3).records())
+    outcome = replay_records(records)
+    assert outcome["replayed"] == len(records) and outcome["matched"] == len(records)
+    assert not outcome["mismatches"] and not outcome["unknown"]
+
+
+def test_replay_flags_tampered_records(log_dir):
+    session = _fresh_session("log-tamper")
+    dice = DiceSystem(session)
+    dice.roll("d20")
+    record = next(dice.draw_log.records())
+    forged = record._replace(result=[21, [21]])
+    skipped = record._replace(end=record.end + 1)
+    unknown = record._replace(consumer="oracle.ask")
+    
+    outcome = replay_records([record, forged, skipped, unknown])
+    assert outcome["matched"] == 1
+    assert [m.record for m in outcome["mismatches"]] == [forged, skipped]
+    assert outcome["mismatches"][0].actual == record.result
+    assert outcome["unknown"] == [unknown]
+    close_draw_log(session)
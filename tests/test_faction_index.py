@@ -0,0 +1,65 @@
+import copy
+import random
+
+from server.faction_engine import INDEX_KEY, FactionEngine
+
+WORDS = ["docks", "market", "guild", "shadow", "trade", "routes", "crime", "ember", "crown", "salt"]
+
+
+def _world(rng, count=40):
+    factions = {}
+    for i in range(count):
+        factions[f"f{i}"] = {
+            "name": f"{rng.choice(WORDS)} {rng.choice(WORDS)}".title(),
+            "power": rng.uniform(1, 10),
+            "territory": rng.sample(WORDS, 2),
+            "attitude": {"players": rng.uniform(-1, 1)},
+            "goals": [f"{rng.choice(WORDS)}_{rng.choice(WORDS)}", ""],
+        }
+    return {"factions": factions}
+
+
+def _legacy_apply(world, event):
+    engine = FactionEngine(world)
+    impacts = {}
+    for faction_id, faction in engine.factions.items():
+        impacts[faction_id] = engine._calculate_faction_impact(event, faction)
+    return impacts
+
+
+def test_index_matches_per_faction_scan():
+    rng = random.Random(7)
+    for _ in range(50):
+        world = _world(rng)
+        text = " ".join(rng.choice(WORDS + ["_", "the", "burn"]) for _ in range(12))
+        event = {
+            "action_text": text,
+            "action_type": rng.choice(["coop", "disrupt", "neutral"]),
+            "location": rng.choice(WORDS + [""]),
+            "C": rng.choice([0.0, 1.3, 2.0]),
+            "D": rng.choice([0.0, 0.7, 2.0]),
+        }
+        expected = _legacy_apply(copy.deepcopy(world), event)
+        scanned = FactionEngine(copy.deepcopy(world), use_index=False).apply_event_impact(event)
+        deltas = FactionEngine(world).apply_event_impact(event)
+        assert {d["faction"]: d["impact"] for d in deltas} == {k: v for k, v in expected.items() if v != 0}
+        assert deltas == scanned
+
+
+def test_index_is_cached_and_refreshed():
+    world = _world(random.Random(1), count=3)
+    engine = FactionEngine(world)
+    index = engine.index
+    assert FactionEngine(world).index is index
+
+    engine.set_faction("rebels", {"name": "Red Hand", "goals": ["topple_crown"], "territory": []})
+    assert "red hand" in engine.index.by_name
+
+    # Direct additions to the dict are caught by the key guard
+    world["factions"]["pirates"] = {"name": "Black Sails"}
+    assert "black sails" in FactionEngine(world).index.by_name
+
+    engine.remove_faction("pirates")
+    assert "black sails" not in engine.index.by_name
+    engine.invalidate_index()
+    assert INDEX_KEY not in world
@@ -0,0 +1,74 @@
+import math
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from server.dm_engine import process_roll20_event, update_geomancer
+from server.geomancer import GeomancerWindow
+from server.memory import get_memory
+
+_ACTIONS = st.sampled_from(["coop", "disrupt", "neutral"])
+
+
+def _batch_stats(history, size):
+    """The original per-action computation: slice, count and recompute H."""
+    window = history[-size:]
+    counts = {
+        "coop": window.count("coop"),
+        "disrupt": window.count("disrupt"),
+        "neutral": window.count("neutral"),
+    }
+    total = sum(counts.values())
+    H = 0.0
+    if total > 0:
+        for v in counts.values():
+            if v > 0:
+                p = v / total
+                H -= p * math.log(p)
+    return counts, H
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(_ACTIONS, max_size=120), st.integers(min_value=1, max_value=40))
+def test_window_matches_batch_computation(actions, size):
+    window = GeomancerWindow(size)
+    for i, action in enumerate(actions):
+        window.push(action)
+        counts, H = _batch_stats(actions[: i + 1], size)
+        assert window.counts == counts
+        assert window.entropy == pytest.approx(H, abs=1e-9)
+    assert window.to_list() == actions[-size:]
+
+
+@settings(max_examples=100, deadline=None)
+@given(st.lists(_ACTIONS, max_size=60), st.integers(min_value=1, max_value=30))
+def test_resize_keeps_most_recent(actions, size):
+    window = GeomancerWindow(20, actions)
+    window.resize(size)
+    counts, H = _batch_stats(actions[-20:], size)
+    assert window.size == size
+    assert window.counts == counts
+    assert window.entropy == pytest.approx(H, abs=1e-9)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        GeomancerWindow(0)
+
+
+def test_legacy_list_history_is_upgraded():
+    mem = {"scene": "", "geomancer": {"history": ["coop", "disrupt"]}}
+    update_geomancer(mem, "we help each other")
+    window = mem["geomancer"]["history"]
+    assert isinstance(window, GeomancerWindow)
+    assert window.to_list() == ["coop", "disrupt", "coop"]
+
+
+def test_window_command_is_per_campaign():
+    process_roll20_event("geomancer_window_a", "Aria", "geomancer window 5", [])
+    assert get_memory("geomancer_window_a")["geomancer"]["history"].size == 5
+    assert get_memory("geomancer_window_b")["geomancer"]["history"].size == 20
+
+    status = process_roll20_event("geomancer_window_a", "Aria", "geomancer status", [])
+    assert status["debug"]["geomancer"]["window_size"] == 5
+    assert isinstance(status["debug"]["geomancer"]["history"], list)
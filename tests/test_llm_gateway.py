@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+
+from server import hybrid_engine
+from server.config import NarrationMode, settings
+from server.dm_engine import aprocess_roll20_event
+from server.llm_gateway import ChatRequest, FakeBackend, LLMGateway, SpeechRequest, set_gateway
+
+
+def _gateway(backend, max_concurrency=4, timeout=5.0):
+    gateway = LLMGateway(default_timeout=timeout)
+    gateway.register(backend, max_concurrency=max_concurrency)
+    return gateway
+
+
+@pytest.fixture(autouse=True)
+def empty_polish_cache():
+    hybrid_engine.polish_cache.clear()
+    yield
+    hybrid_engine.polish_cache.clear()
+
+
+@pytest.fixture
+def fake_gateway():
+    backend = FakeBackend(responder=lambda request: "Polished narration.")
+    gateway = _gateway(backend)
+    set_gateway(gateway)
+    try:
+        yield backend
+    finally:
+        set_gateway(None)
+
+
+def test_concurrency_is_bounded_per_provider():
+    backend = FakeBackend(latency=0.02)
+    gateway = _gateway(backend, max_concurrency=3)
+    requests = [ChatRequest.from_prompt("sys", f"table {i}", model="m") for i in range(12)]
+
+    async def run():
+        return await asyncio.gather(*(gateway.complete(request) for request in requests))
+
+    results = asyncio.run(run())
+
+    assert results == [f"table {i}" for i in range(12)]
+    assert backend.max_in_flight == 3
+
+
+def test_tables_narrate_concurrently():
+    backend = FakeBackend(latency=0.05)
+    gateway = _gateway(backend, max_concurrency=32)
+
+    async def run():
+        return await asyncio.gather(
+            *(gateway.complete(ChatRequest.from_prompt("sys", str(i), model="m")) for i in range(30))
+        )
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    # Serial execution would take 1.5s
+    assert time.perf_counter() - started < 0.5
+
+
+def test_deadline_covers_queue_wait():
+    backend = FakeBackend(latency=0.2)
+    gateway = _gateway(backend, max_concurrency=1)
+
+    async def run():
+        slow = asyncio.create_task(gateway.complete(ChatRequest.from_prompt("sys", "slow", model="m")))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.complete(ChatRequest.from_prompt("sys", "queued", model="m"), timeout=0.05)
+        return await slow
+
+    assert asyncio.run(run()) == "slow"
+
+
+def test_stream_and_speech():
+    backend = FakeBackend()
+    gateway = _gateway(backend)
+
+    async def run():
+        chunks = [chunk async for chunk in gateway.stream(ChatRequest.from_prompt("sys", "the door creaks", model="m"))]
+        audio = await gateway.synthesize(SpeechRequest(text="the door creaks", voice="echo"))
+        return chunks, audio
+
+    chunks, audio = asyncio.run(run())
+    assert "".join(chunks) == "the door creaks"
+    assert audio == asyncio.run(gateway.synthesize(SpeechRequest(text="the door creaks", voice="echo")))
+
+
+def test_unknown_provider():
+    gateway = _gateway(FakeBackend())
+    with pytest.raises(ValueError):
+        asyncio.run(gateway.complete(ChatRequest.from_prompt("sys", "x", model="m"), provider="nope"))
+
+
+def test_hybrid_polish_through_gateway(fake_gateway, monkeypatch):
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    text = asyncio.run(hybrid_engine.agenerate_narrative("straight", tone="classic", player_action="I wave"))
+
+    assert text == "Polished narration."
+    assert fake_gateway.calls == 1
+
+
+def test_hybrid_polish_falls_back_on_timeout(monkeypatch):
+    set_gateway(_gateway(FakeBackend(latency=0.2), timeout=0.01))
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    try:
+        text = asyncio.run(hybrid_engine.agenerate_narrative("straight", tone="classic", player_action="I wave"))
+    finally:
+        set_gateway(None)
+
+    assert text and text != "Polished narration."
+
+
+def test_async_roll20_event_matches_pipeline(fake_gateway, monkeypatch):
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    response = asyncio.run(
+        aprocess_roll20_event("gateway_table", "Aria", "I help the guards hold the gate.", [], debug_level="summary")
+    )
+
+    assert "Polished narration." in response["chat"]
+    assert "frame_selected" in response["debug"]
@@ -13,6 +13,9 @@ from resonance import analyze_imagination
 from ethics import detect_railroading
 from frame_engine import select_frame, FRAME_LIBRARY
 from template_engine import get_template_stats
+from server.mechanics import DiceEngine, RandomnessMode
+from server.mechanics.probability import SAMPLERS, TABLES
+from server.randomness import AliasTable
 
 
 class TestImaginationScoring:
@@ -252,6 +255,53 @@ class TestNumericalStability:
             assert "memory" not in str(e).lower(), "Memory error on large input"
 
 
+class TestWeightedDiceTables:
+    """Alias-table 3d6 sampling must reproduce the exact outcome tables"""
+    
+    def test_samplers_match_tables(self):
+        """Every mode's sampler implies exactly its table's triple distribution"""
+        for mode, sampler in SAMPLERS.items():
+            expected = {triple: p for triple, p in TABLES[mode].triples.items() if p}
+            assert sampler.probabilities() == expected, f"Sampler drifted from table for {mode}"
+    
+    def test_alias_table_exact(self):
+        """Integer alias tables encode their weights without rounding"""
+        rng = random.Random(47)
+        for _ in range(50):
+            weights = [rng.randint(0, 40) for _ in range(rng.randint(1, 12))]
+            weights[rng.randrange(len(weights))] += 1
+            total = sum(weights)
+            probabilities = AliasTable(weights).probabilities()
+            assert [p * total for p in probabilities] == weights
+    
+    def test_alias_table_uses_every_draw(self):
+        """Enumerating all draws hits each outcome exactly `weight * n` times"""
+        weights = [1, 2, 3, 4, 3, 2, 1]
+        table = AliasTable(weights)
+        hits = [0] * len(weights)
+        for draw in range(table.span):
+            hits[table.sample(lambda n: draw)] += 1
+        assert hits == [w * len(weights) for w in weights]
+    
+    def test_weighted_rolls_skip_middle(self):
+        """Weighted rolls only reach totals the table gives weight to"""
+        engine = DiceEngine(RandomnessMode.WEIGHTED)
+        reachable = {t for t, p in TABLES[RandomnessMode.WEIGHTED].totals.items() if p}
+        single = {sum(engine.roll_3d6()) for _ in range(2000)}
+        bulk = set(engine.roll_3d6_many(5000).histogram())
+        assert single <= reachable and bulk <= reachable
+        assert 10 not in bulk and 11 not in bulk
+    
+    def test_weighted_roll_frequencies(self):
+        """Sampled totals stay close to the exact probabilities"""
+        n = 20000
+        histogram = DiceEngine(RandomnessMode.WEIGHTED).roll_3d6_many(n).histogram()
+        for total, p in TABLES[RandomnessMode.WEIGHTED].totals.items():
+            expected = float(p) * n
+            tolerance = 6 * (expected * (1 - float(p))) ** 0.5 + 1
+            assert abs(histogram.get(total, 0) - expected) <= tolerance, f"Total {total} off"
+
+
 def run_all_tests():
     """Run all mathematical verification tests"""
     test_classes = [
@@ -260,6 +310,7 @@ def run_all_tests():
         TestFrameScoring,
         TestTemplateStatistics,
         TestNumericalStability,
+        TestWeightedDiceTables,
     ]
     
     total_tests = 0
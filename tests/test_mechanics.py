@@ -1,4 +1,13 @@
-from server.mechanics import DiceSystem, Governors, RandomnessMode, quick_resolve
+from fractions import Fraction
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server.main import app
+from server.mechanics import DiceEngine, DiceSystem, Governors, RandomnessMode, odds, quick_resolve, total_cdf, total_pmf
+from server.mechanics.probability import TABLES, decomposition_pmf, weighted_sum_pmf
+from server.mechanics.simulation import Scenario, run_shard, simulate, wilson_interval
+from server.randomness import STREAM_COUNTER, RandomMode, RandomSource
 
 
 def test_dice_caps():
@@ -34,3 +43,142 @@ def test_retirement_calculation():
     result = Governors.calculate_retirement_multiplier(2500)
     assert result["banked_xp"] == 2500
     assert result["legacy_features"] == 2
+
+
+class _ScriptedRandom:
+    """Feeds _decompose_sum a fixed choice per randint call and records each range."""
+
+    def __init__(self, choices):
+        self.choices = list(choices)
+        self.ranges = []
+
+    def randint(self, low, high):
+        self.ranges.append((low, high))
+        index = self.choices[len(self.ranges) - 1] if len(self.ranges) <= len(self.choices) else 0
+        return low + index
+
+
+def _enumerate_decompositions(total):
+    """Exact distribution of DiceEngine._decompose_sum by walking every choice path."""
+    engine = DiceEngine(RandomnessMode.WEIGHTED)
+    pmf = {}
+    pending = [()]
+    while pending:
+        choices = pending.pop()
+        engine._rng = _ScriptedRandom(choices)
+        triple = tuple(engine._decompose_sum(total))
+        ranges = engine._rng.ranges
+        if len(ranges) > len(choices):
+            low, high = ranges[len(choices)]
+            pending.extend(choices + (index,) for index in range(high - low + 1))
+            continue
+        p = Fraction(1)
+        for low, high in ranges:
+            p /= high - low + 1
+        pmf[triple] = pmf.get(triple, 0) + p
+    return pmf
+
+
+def test_uniform_tables_are_exact():
+    pmf = total_pmf(RandomnessMode.SECURE)
+    assert pmf[10] == Fraction(27, 216) and pmf[3] == Fraction(1, 216)
+    assert sum(pmf.values()) == 1
+    for mode in (RandomnessMode.DETERMINISTIC, RandomnessMode.LINEAR):
+        assert total_pmf(mode) == pmf
+
+    cdf = total_cdf(RandomnessMode.SECURE, modifier=2)
+    assert cdf[5] == Fraction(1, 216) and cdf[20] == 1
+    assert list(cdf.values()) == sorted(cdf.values())
+
+
+def test_weighted_tables_match_engine_logic():
+    for total in range(3, 19):
+        assert decomposition_pmf(total) == _enumerate_decompositions(total)
+
+    sums = weighted_sum_pmf()
+    assert sums[6] == sums[15] == Fraction(1, 8)
+    assert 10 not in sums and 11 not in sums
+    table = TABLES[RandomnessMode.WEIGHTED]
+    assert table.fumble == table.critical == Fraction(1, 32)
+    assert sum(table.triples.values()) == 1
+
+
+def test_odds_api():
+    result = odds(12, modifier=1)
+    assert result.success == Fraction(1, 2)
+    assert result.failure == Fraction(1, 2)
+    assert result.critical == result.fumble == Fraction(1, 216)
+    assert result.expected_total == Fraction(23, 2)
+    assert odds(3).success == 1 and odds(19).success == 0
+    assert odds(12, mode=RandomnessMode.WEIGHTED).success == Fraction(1, 2)
+
+    engine = DiceEngine(RandomnessMode.SECURE)
+    assert engine.odds(14, base_modifier=5, positives=[2]).modifier == 3
+
+    body = TestClient(app).get("/api/odds", params={"difficulty": 12, "base_modifier": 1}).json()
+    assert body["success"] == 0.5 and body["exact"]["critical"] == "1/216"
+
+    params = {"difficulty": 12, "base_modifier": 1, "positives": [2, 2]}
+    body = TestClient(app).get("/api/odds", params=params).json()
+    assert body["modifier"] == 3 and body["exact"]["success"] == "20/27"
+
+
+def test_simulation_shards_are_deterministic():
+    scenario = Scenario("weighted", RandomnessMode.WEIGHTED, difficulty=12)
+    shard = run_shard(scenario, "seed", 0, 5000)
+    assert shard == run_shard(scenario, "seed", 0, 5000)
+    assert shard != run_shard(scenario, "seed", 1, 5000)
+    assert sum(shard["totals"].values()) == 5000
+    assert 10 not in shard["totals"] and 11 not in shard["totals"]
+
+
+def test_injected_rng_drives_engine():
+    for mode in (RandomnessMode.SECURE, RandomnessMode.DETERMINISTIC, RandomnessMode.LINEAR):
+        single = DiceEngine(mode, rng=RandomSource("inject", RandomMode.DETERMINISTIC, STREAM_COUNTER))
+        batch = DiceEngine(mode, rng=RandomSource("inject", RandomMode.DETERMINISTIC, STREAM_COUNTER))
+        results = [single.resolve(base_modifier=1) for _ in range(50)]
+        bulk = batch.roll_3d6_many(50, 1)
+        assert [result.rolls for result in results] == [bulk.roll(index) for index in range(50)]
+        assert [result.total for result in results] == list(bulk.totals)
+    weighted = DiceEngine(RandomnessMode.WEIGHTED, rng=RandomSource("inject", RandomMode.DETERMINISTIC, STREAM_COUNTER))
+    replay = DiceEngine(RandomnessMode.WEIGHTED, rng=RandomSource("inject", RandomMode.DETERMINISTIC, STREAM_COUNTER))
+    assert [weighted.roll_3d6() for _ in range(20)] == [replay.roll_3d6() for _ in range(20)]
+
+
+def test_simulation_rolls_the_engine(monkeypatch):
+    roll_3d6_many = DiceEngine.roll_3d6_many
+
+    def off_by_one(self, count, modifier=0):
+        return roll_3d6_many(self, count, modifier + 1)
+
+    monkeypatch.setattr(DiceEngine, "roll_3d6_many", off_by_one)
+    report = simulate([Scenario("secure", difficulty=12)], 20000, seed="test", workers=1).to_dict()
+    assert not report["scenarios"][0]["rates"]["success"]["within_interval"]
+
+
+def test_simulation_report():
+    scenarios = [
+        Scenario("secure", difficulty=12, base_modifier=5, positives=(2,)),
+        Scenario("weighted", RandomnessMode.WEIGHTED, difficulty=12),
+    ]
+    report = simulate(scenarios, 30000, seed="test", workers=1, shard_size=7000, confidence=0.999)
+    data = report.to_dict()
+    assert data["format"] == "voicedm.simulation.v1"
+    assert data["scenarios"][0]["scenario"]["modifier"] == 3  # Clamped like resolve()
+    for scenario in data["scenarios"]:
+        assert scenario["trials"] == 30000
+        assert sum(scenario["histogram"].values()) == 30000
+        assert all(rate["within_interval"] for rate in scenario["rates"].values())
+
+    # Shards, not workers, fix the streams
+    pooled = simulate(scenarios, 30000, seed="test", workers=2, shard_size=7000, confidence=0.999).to_dict()
+    assert pooled["scenarios"] == data["scenarios"]
+
+    with pytest.raises(ValueError):
+        simulate([scenarios[0], scenarios[0]], 10)
+
+
+def test_wilson_interval():
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high and round(high - 0.5, 4) == round(0.5 - low, 4)
+    assert wilson_interval(0, 100)[0] == 0.0
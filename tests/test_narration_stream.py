@@ -0,0 +1,140 @@
+import asyncio
+import json
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from server import audio_cache as audio_store
+from server import hybrid_engine
+from server.audio_cache import AudioCache
+from server.config import NarrationMode, settings
+from server.llm_gateway import FakeBackend, LLMGateway, set_gateway
+from server.main import app
+from server.narration_stream import SentenceChunker, split_sentences
+from server.polish_cache import PolishCache
+
+POLISHED = "The lantern gutters. Shadows lean closer! What now?\n1. Light it\n2. Run"
+
+
+def _install(backend):
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend)
+    set_gateway(gateway)
+
+
+@pytest.fixture
+def streaming(monkeypatch, tmp_path):
+    backend = FakeBackend(responder=lambda request: POLISHED, chunk_latency=0.001)
+    _install(backend)
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    monkeypatch.setattr(hybrid_engine, "polish_cache", PolishCache())
+    monkeypatch.setattr(audio_store, "audio_cache", AudioCache(str(tmp_path / "audio")))
+    try:
+        yield backend
+    finally:
+        set_gateway(None)
+
+
+def _collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+
+    return asyncio.run(run())
+
+
+def test_sentence_chunker_rejoins_exactly():
+    chunker = SentenceChunker()
+    out = []
+    for piece in ["The lan", "tern gutters. Sha", "dows lean closer", "! What now?\n1. Li", "ght it\n2. Run"]:
+        out.extend(chunker.feed(piece))
+    out.append(chunker.flush())
+
+    assert "".join(out) == POLISHED
+    assert out == split_sentences(POLISHED)
+    assert out == ["The lantern gutters. ", "Shadows lean closer! ", "What now?\n", "1. Light it\n", "2. Run"]
+
+
+def test_hybrid_stream_by_sentence_and_token(streaming):
+    random.seed(5)
+    sentences = _collect(hybrid_engine.astream_narrative("straight", tone="classic"))
+    assert "".join(sentences) == POLISHED
+    assert len(sentences) == 5
+    assert streaming.calls == 1
+
+    # The same render again streams the cached polish without a model call
+    random.seed(5)
+    tokens = _collect(hybrid_engine.astream_narrative("straight", tone="classic", granularity="token"))
+    assert "".join(tokens) == POLISHED
+    assert streaming.calls == 1
+
+
+def test_stream_falls_back_to_template_before_first_chunk(monkeypatch):
+    def broken(request):
+        raise RuntimeError("upstream down")
+
+    _install(FakeBackend(responder=broken))
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    monkeypatch.setattr(hybrid_engine, "polish_cache", PolishCache())
+    try:
+        chunks = _collect(hybrid_engine.astream_narrative("straight", tone="classic"))
+    finally:
+        set_gateway(None)
+
+    assert "What do you do?" in "".join(chunks)
+
+
+def _parse_sse(body: str):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_sse_endpoint_streams_chunks_then_final(streaming):
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/roll20/event/stream",
+        json={"campaign_id": "sse_table", "player_name": "Aria", "text": "I help the guards.", "debug_level": "none"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events[:-1]] == ["chunk"] * (len(events) - 1)
+    name, final = events[-1]
+    assert name == "final" and "debug" not in final
+    streamed = "".join(data["text"] for _, data in events[:-1]).strip()
+    assert streamed and streamed in final["chat"]
+
+
+def test_sse_command_yields_only_final(streaming):
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/roll20/event/stream",
+        json={"campaign_id": "sse_table", "player_name": "Aria", "text": "debug summary"},
+    )
+    assert [name for name, _ in _parse_sse(response.text)] == ["final"]
+
+
+def test_websocket_streams_and_consolidates(streaming):
+    client = TestClient(app)
+    session_id = client.post("/session/create").json()["session_id"]
+
+    with client.websocket_connect(f"/ws/{session_id}") as ws:
+        ws.send_json({"type": "voice_input", "text": "I light the lantern", "player_name": "Aria", "stream": True})
+        chunks, segments = [], []
+        while True:
+            message = ws.receive_json()
+            if message["type"] == "narration_chunk":
+                chunks.append(message)
+            elif message["type"] == "audio_segment":
+                segments.append(message)
+            else:
+                break
+
+    assert [chunk["index"] for chunk in chunks] == list(range(len(chunks)))
+    assert message["type"] == "narration"
+    assert message["text"] == "".join(chunk["text"] for chunk in chunks).strip() == POLISHED
+    assert [segment["index"] for segment in segments] == list(range(5))
+    assert message["audio_segments"] == [segment["audio_url"] for segment in segments]
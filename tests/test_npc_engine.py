@@ -0,0 +1,77 @@
+import copy
+import random
+
+from server.faction_engine import FactionEngine
+from server.npc_engine import NPCEngine
+
+FACTIONS = ["thieves_guild", "city_guard", "merchant_guild", "ash_cult"]
+
+
+def _world(npc_count=60, seed=5):
+    rng = random.Random(seed)
+    factions = {fid: {"name": fid.replace("_", " ").title(), "attitude": {"players": 0.0}} for fid in FACTIONS}
+    npcs = {
+        f"npc{i}": {
+            "faction": rng.choice(FACTIONS),
+            "trust": {"players": 0.0},
+            "memory": [],
+            "hooks": {"fear": "flees", "desire": "promotion", "debt": "repays"},
+        }
+        for i in range(npc_count)
+    }
+    return {"factions": factions, "npcs": npcs}
+
+
+def _step(world, event, incremental):
+    deltas = FactionEngine(world).apply_event_impact(event)
+    engine = NPCEngine(world)
+    engine.record_event_memory(event)
+    if incremental:
+        engine.mark_factions_changed(d["faction"] for d in deltas)
+        engine.recalculate_loyalties()
+    else:
+        engine.recalculate_loyalties(full=True)
+    return engine.find_active_hooks()
+
+
+def test_incremental_matches_full_recompute():
+    rng = random.Random(11)
+    incremental = _world()
+    full = copy.deepcopy(incremental)
+    for _ in range(80):
+        event = {
+            "action_text": f"I {rng.choice(['help', 'rob'])} npc{rng.randrange(60)} of the {rng.choice(FACTIONS)}",
+            "action_type": rng.choice(["coop", "disrupt", "neutral"]),
+            "location": "",
+            "C": 0.0,
+            "D": 0.0,
+        }
+        assert _step(incremental, event, True) == _step(full, event, False)
+        for npc_id, npc in full["npcs"].items():
+            assert incremental["npcs"][npc_id]["trust"] == npc["trust"]
+            assert incremental["npcs"][npc_id]["memory"] == npc["memory"]
+
+
+def test_only_changed_npcs_are_recalculated():
+    world = _world()
+    engine = NPCEngine(world)
+    assert len(engine.recalculate_loyalties()) == 60  # first pass covers the cast
+    assert engine.recalculate_loyalties() == {}
+
+    touched = engine.record_event_memory({"action_text": "I help npc7", "action_type": "coop"})
+    assert touched == {"npc7"}
+    assert set(engine.recalculate_loyalties()) == {"npc7"}
+
+    engine.mark_factions_changed(["ash_cult"])
+    cult = {npc_id for npc_id, npc in world["npcs"].items() if npc["faction"] == "ash_cult"}
+    assert set(engine.recalculate_loyalties()) == cult
+
+    assert len(engine.recalculate_loyalties(full=True)) == 60
+
+
+def test_new_npc_triggers_rebuild():
+    world = _world(npc_count=3)
+    engine = NPCEngine(world)
+    engine.recalculate_loyalties()
+    world["npcs"]["newcomer"] = {"faction": "city_guard", "memory": []}
+    assert "newcomer" in NPCEngine(world).recalculate_loyalties()
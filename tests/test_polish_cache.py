@@ -0,0 +1,105 @@
+import asyncio
+import random
+
+import pytest
+
+from server import hybrid_engine
+from server.config import NarrationMode, settings
+from server.llm_gateway import FakeBackend, LLMGateway, set_gateway
+from server.polish_cache import PolishCache, cache_key
+
+TEMPLATE = "The door creaks open.\n\nWhat do you do?\n1. Enter\n2. Wait"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_ignores_whitespace_but_not_persona_or_model():
+    assert cache_key(TEMPLATE, "classic", "m") == cache_key("  The door creaks open. \nWhat do you do? 1. Enter 2. Wait", "classic", "m")
+    assert cache_key(TEMPLATE, "classic", "m") != cache_key(TEMPLATE, "gothic", "m")
+    assert cache_key(TEMPLATE, "classic", "m") != cache_key(TEMPLATE, "classic", "other")
+
+
+def test_lru_eviction_and_counters():
+    cache = PolishCache(max_entries=2)
+    cache.put("a", "classic", "m", "A")
+    cache.put("b", "classic", "m", "B")
+    assert cache.get("a", "classic", "m") == "A"
+    cache.put("c", "classic", "m", "C")
+
+    assert cache.get("b", "classic", "m") is None
+    assert cache.get("a", "classic", "m") == "A"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_ttl_and_persona_fingerprint_invalidate():
+    clock = Clock()
+    cache = PolishCache(ttl=60.0, clock=clock)
+    cache.put(TEMPLATE, "classic", "m", "Polished", fingerprint="v1")
+
+    assert cache.get(TEMPLATE, "classic", "m", fingerprint="v1") == "Polished"
+    assert cache.get(TEMPLATE, "classic", "m", fingerprint="v2") is None
+
+    cache.put(TEMPLATE, "classic", "m", "Polished", fingerprint="v1")
+    clock.now += 61
+    assert cache.get(TEMPLATE, "classic", "m", fingerprint="v1") is None
+
+    cache.put(TEMPLATE, "gothic", "m", "Dark")
+    assert cache.invalidate_persona("gothic") == 1
+    assert cache.get(TEMPLATE, "gothic", "m") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "polish.db")
+    first = PolishCache(path=path)
+    first.put(TEMPLATE, "classic", "m", "Polished")
+    first.close()
+
+    second = PolishCache(path=path)
+    assert second.get(TEMPLATE, "classic", "m") == "Polished"
+    assert second.stats()["disk_hits"] == 1
+    second.close()
+
+
+@pytest.fixture
+def counting_gateway(monkeypatch):
+    backend = FakeBackend(responder=lambda request: "Polished narration.")
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend)
+    set_gateway(gateway)
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    monkeypatch.setattr(hybrid_engine, "polish_cache", PolishCache())
+    try:
+        yield backend
+    finally:
+        set_gateway(None)
+
+
+def test_repeated_scenes_cost_zero_llm_calls(counting_gateway):
+    async def polish_twice():
+        first = await hybrid_engine._atry_llm_polish(TEMPLATE, "classic")
+        second = await hybrid_engine._atry_llm_polish(TEMPLATE, "classic")
+        return first, second
+
+    assert asyncio.run(polish_twice()) == ("Polished narration.", "Polished narration.")
+    assert counting_gateway.calls == 1
+    assert hybrid_engine.get_narration_stats()["polish_cache"]["hits"] == 1
+
+
+def test_finite_template_space_saturates(counting_gateway):
+    random.seed(7)
+
+    async def render_many():
+        for _ in range(200):
+            await hybrid_engine.agenerate_narrative("straight", tone="classic")
+
+    asyncio.run(render_many())
+    # 3 atmospheres x 3 consequences x a bounded set of option orderings
+    assert counting_gateway.calls < 200
+    assert hybrid_engine.polish_cache.stats()["hits"] == 200 - counting_gateway.calls
@@ -0,0 +1,105 @@
+import asyncio
+import random
+
+import pytest
+
+from server import hybrid_engine
+from server.config import NarrationMode, settings
+from server.llm_gateway import ChatRequest, FakeBackend, LLMGateway, ReplayBackend, set_gateway
+from server.polish_cache import PolishCache
+from server.polish_tables import PolishTables, build_polish_tables, iter_cells, write_polish_tables
+from server.template_engine import draw_template, render_template
+
+
+def _variant_responder(request: ChatRequest) -> str:
+    original = request.messages[-1][1].split("Original:\n", 1)[1].split("\n\nRewritten:", 1)[0]
+    return "POLISHED " + original.replace("\n\n", " ")
+
+
+def _gateway(backend):
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend, max_concurrency=16)
+    return gateway
+
+
+@pytest.fixture
+def tables(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    summary = asyncio.run(
+        build_polish_tables(path, _gateway(FakeBackend(responder=_variant_responder)), variants=2, frames=["straight"])
+    )
+    assert summary["covered"] == summary["cells"] == 36
+    return PolishTables.load(path)
+
+
+@pytest.fixture
+def hybrid(monkeypatch):
+    backend = FakeBackend(responder=lambda request: "LIVE")
+    set_gateway(_gateway(backend))
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.HYBRID)
+    monkeypatch.setattr(hybrid_engine, "polish_cache", PolishCache())
+    try:
+        yield backend
+    finally:
+        set_gateway(None)
+        hybrid_engine.set_polish_tables(None)
+
+
+def test_draw_matches_render_template():
+    for seed in range(20):
+        random.seed(seed)
+        expected = render_template("hidden_cost", "gothic")
+        random.seed(seed)
+        assert draw_template("hidden_cost", "gothic").compose() == expected
+
+
+def test_round_trip_and_lookup(tables):
+    cell = ("straight", "classic", 1, 2)
+    assert cell in tables
+    assert tables.variants(cell) == (
+        "POLISHED The world responds to your choice without surprise. "
+        "Success is yours, but without flourish or fanfare.",
+    )
+    assert tables.variants(("hidden_cost", "classic", 0, 0)) == ()
+    assert tables.stats()["hits"] == 1 and tables.stats()["misses"] == 1
+
+
+def test_stale_persona_fingerprint_is_uncovered(tables):
+    assert tables.variants(("straight", "classic", 0, 0), fingerprint="stale") == ()
+
+
+def test_hybrid_serves_table_then_falls_back_live(tables, hybrid):
+    hybrid_engine.set_polish_tables(tables)
+
+    covered = asyncio.run(hybrid_engine.agenerate_narrative("straight", tone="gothic"))
+    assert covered.startswith("POLISHED ") and "What do you do?" in covered
+    assert hybrid.calls == 0
+
+    assert asyncio.run(hybrid_engine.agenerate_narrative("hidden_cost", tone="gothic")) == "LIVE"
+    assert hybrid.calls == 1
+
+
+def test_replay_backend_builds_offline(tmp_path):
+    replay = ReplayBackend()
+    for cell, prose in iter_cells(frames=["straight"], tones=["scifi"]):
+        request = ChatRequest.from_prompt(
+            hybrid_engine.POLISH_SYSTEM_PROMPT, hybrid_engine._polish_prompt(prose, "scifi"), temperature=0.7
+        )
+        replay.record(request.messages, f"A {cell[2]}{cell[3]}")
+        replay.record(request.messages, f"B {cell[2]}{cell[3]}")
+
+    path = str(tmp_path / "replayed.bin")
+    asyncio.run(build_polish_tables(path, _gateway(replay), variants=2, frames=["straight"], tones=["scifi"]))
+
+    assert PolishTables.load(path).variants(("straight", "scifi", 2, 1)) == ("A 21", "B 21")
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "bogus.bin"
+    path.write_bytes(b"not a table")
+    with pytest.raises(ValueError):
+        PolishTables.load(str(path))
+
+    empty = str(tmp_path / "empty.bin")
+    write_polish_tables(empty, {}, {"version": 1})
+    assert len(PolishTables.load(empty)) == 0
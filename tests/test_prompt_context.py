@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from server.config import NarrationMode, settings
+from server.dm_engine import aprocess_roll20_event
+from server.llm_gateway import FakeBackend, LLMGateway, set_gateway
+from server.prompt_context import (
+    DROP,
+    HEAD,
+    KEEP,
+    TAIL,
+    CampaignContext,
+    PromptSection,
+    StubSummarizer,
+    assemble_prompt,
+    estimate_tokens,
+    set_summarizer,
+    truncate_text,
+)
+
+
+def test_truncation_keeps_whole_lines_by_policy():
+    log = "\n".join(f"turn {i}: the party argues about the map" for i in range(10))
+
+    tail = truncate_text(log, 30, TAIL)
+    head = truncate_text(log, 30, HEAD)
+
+    assert estimate_tokens(tail) <= 30 and estimate_tokens(head) <= 30
+    assert tail.endswith("turn 9: the party argues about the map")
+    assert head.startswith("turn 0:")
+    assert truncate_text(log, 30, TAIL) == tail  # deterministic
+    assert truncate_text(log, 30, DROP) == ""
+
+
+def test_single_line_is_cut_at_a_word_with_ellipsis():
+    line = "The dragon circles the tower while the bard tunes a lute and the rogue counts coins"
+
+    assert truncate_text(line, 6, HEAD) == "The dragon circles the…"
+    assert truncate_text(line, 6, TAIL).startswith("…")
+    assert estimate_tokens(truncate_text(line, 6, TAIL)) <= 6
+
+
+def test_assembler_cuts_lowest_priority_first_and_never_touches_keep():
+    sections = [
+        PromptSection("scene", "A ruined chapel. " * 20, priority=3, policy=HEAD, min_tokens=10, label="SCENE"),
+        PromptSection("older", "\n".join(f"old turn {i}" for i in range(40)), priority=0, policy=TAIL),
+        PromptSection("flavour", "Optional flavour text. " * 5, priority=1, policy=DROP),
+        PromptSection("action", "I ring the bell.", policy=KEEP, label="ACTION"),
+    ]
+
+    prompt = assemble_prompt(sections, 80)
+
+    assert prompt.tokens <= 80
+    assert "ACTION: I ring the bell." in prompt.text
+    assert "older" in prompt.dropped or "older" in prompt.truncated
+    assert prompt.sections["scene"] >= 10
+    assert assemble_prompt(sections, 80).text == prompt.text
+
+
+def test_assembler_drops_below_min_tokens_only_when_it_must():
+    sections = [
+        PromptSection("history", "x " * 200, priority=0, policy=TAIL, min_tokens=50),
+        PromptSection("rules", "y " * 40, policy=KEEP),
+    ]
+
+    roomy = assemble_prompt(sections, 80)
+    tight = assemble_prompt(sections, 25)
+
+    assert roomy.sections["history"] >= 50 or roomy.tokens <= 80
+    assert "history" in tight.dropped
+    assert tight.text == "y " * 40
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        assemble_prompt([PromptSection("a", "text", policy="middle")], 10)
+
+
+def test_context_folds_older_turns_into_summary():
+    context = CampaignContext(recent_turns=3, summarize_every=4, summary_tokens=40)
+    summarizer = StubSummarizer()
+    due = [context.record_turn(f"Aria opens door {i}. It creaks.") for i in range(7)]
+
+    assert due == [False] * 6 + [True]
+    assert len(context.recent) == 3 and len(context.pending) == 4
+
+    assert asyncio.run(context.refresh(summarizer))
+    assert context.pending == []
+    assert context.summarized_turns == 4
+    assert "Aria opens door 0." in context.summary
+    assert estimate_tokens(context.summary) <= 40
+
+    restored = CampaignContext(**context.to_dict())
+    assert restored.summary == context.summary and restored.recent == context.recent
+
+
+def test_failed_refresh_keeps_turns_pending_and_caps_them():
+    async def broken(summary, turns, max_tokens):
+        raise RuntimeError("summarizer down")
+
+    context = CampaignContext(recent_turns=2, summarize_every=3, max_pending=5)
+    for i in range(12):
+        context.record_turn(f"turn {i}")
+
+    assert not asyncio.run(context.refresh(broken))
+    assert [text for _, text in context.pending] == [f"turn {i}" for i in range(5, 10)]
+    assert context.dropped_turns == 5
+
+
+def test_prompt_size_stays_flat_over_500_turns(monkeypatch):
+    prompt_tokens = []
+
+    def responder(request):
+        prompt_tokens.append(estimate_tokens(request.messages[-1][1]))
+        return f"The {len(prompt_tokens)}th consequence unfolds as the city watches."
+
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(FakeBackend(responder=responder))
+    set_gateway(gateway)
+    summarizer = StubSummarizer()
+    set_summarizer(summarizer)
+    monkeypatch.setattr(settings, "narration_mode", NarrationMode.LLM)
+
+    async def campaign():
+        for turn in range(500):
+            await aprocess_roll20_event(
+                "long_campaign", "Aria", f"I question merchant number {turn} about the missing caravan.", []
+            )
+            await asyncio.sleep(0)  # let background refreshes run
+
+    try:
+        asyncio.run(campaign())
+    finally:
+        set_gateway(None)
+        set_summarizer(None)
+
+    assert len(prompt_tokens) == 500
+    assert max(prompt_tokens) <= settings.prompt_token_budget
+    early, late = prompt_tokens[50:100], prompt_tokens[-50:]
+    assert max(late) <= max(early) * 1.1
+    assert summarizer.calls >= 50
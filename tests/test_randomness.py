@@ -3,7 +3,23 @@ Tests for VoiceDM randomness system
 """
 
 import pytest
-from server.randomness import RandomSource, RandomMode, get_session_rng, get_weighted_random
+import json
+import os
+
+from server.randomness import (
+    STREAM_COUNTER,
+    STREAM_LEGACY,
+    EntropyPool,
+    PreparedDistribution,
+    RandomMode,
+    RandomSource,
+    SessionStreams,
+    get_session_rng,
+    get_stream_registry,
+    get_weighted_random,
+    invalidate_distribution,
+    prepare_distribution,
+)
 
 
 class TestRandomSource:
@@ -113,19 +129,179 @@ class TestRandomSource:
         assert all(s in items for s in sample)
 
 
+class _ScriptedPool(EntropyPool):
+    """Pool whose blocks come from a fixed script instead of os.urandom."""
+
+    def __init__(self, blocks, **kwargs):
+        self._blocks = list(blocks)
+        super().__init__(background=False, **kwargs)
+
+    def _read_block(self):
+        return self._blocks.pop(0)
+
+
+class TestEntropyPool:
+    """Test the buffered SECURE entropy pool"""
+
+    def test_rejects_biased_bytes(self):
+        """Bytes at or above 252 would bias d6 results and are skipped"""
+        pool = _ScriptedPool([bytes([252, 255, 7, 251, 0])], block_size=5)
+        assert [pool.randbelow(6) for _ in range(3)] == [1, 5, 0]
+
+        pool = _ScriptedPool([bytes([252, 255, 7, 251, 0]) + bytes(27)], block_size=32)
+        assert pool.integers(1, 6, 3) == [2, 6, 1]
+
+    def test_rejects_biased_words(self):
+        """Wide ranges reject words above the largest multiple of the span"""
+        span = 3 * 2 ** 61
+        limit = 2 ** 64 - 2 ** 64 % span
+        block = (limit + 5).to_bytes(8, "little") + (span + 7).to_bytes(8, "little")
+        pool = _ScriptedPool([block], block_size=16)
+        assert pool.randbelow(span) == 7
+
+    def test_bulk_range_and_uniformity(self):
+        pool = EntropyPool(block_size=4096)
+        rolls = pool.integers(1, 6, 60000)
+        assert len(rolls) == 60000
+        counts = [rolls.count(face) for face in range(1, 7)]
+        assert all(9000 < count < 11000 for count in counts)
+
+        wide = pool.integers(-10, 1000, 500)
+        assert len(wide) == 500 and all(-10 <= value <= 1000 for value in wide)
+        assert all(0.0 <= value < 1.0 for value in pool.randoms(500))
+
+    def test_refills_across_blocks(self):
+        pool = EntropyPool(block_size=64)
+        values = [pool.word() for _ in range(40)]
+        assert len(set(values)) == 40
+        assert pool.stats()["refills"] >= 5
+        assert len(pool.take(100)) == 100
+
+    def test_child_discards_parent_buffer(self):
+        if not hasattr(os, "fork"):
+            pytest.skip("fork not available")
+        pool = EntropyPool(block_size=1024)
+        pool.word()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            os.write(write_fd, pool.take(16))
+            os._exit(0)
+        os.close(write_fd)
+        child_bytes = os.read(read_fd, 16)
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        assert child_bytes != pool.take(16)
+
+    def test_randints_match_randint_when_seeded(self):
+        rng1 = RandomSource(mode=RandomMode.DETERMINISTIC, seed="bulk")
+        rng2 = RandomSource(mode=RandomMode.DETERMINISTIC, seed="bulk")
+        assert rng1.randints(1, 20, 25) == [rng2.randint(1, 20) for _ in range(25)]
+
+        secure = RandomSource(mode=RandomMode.SECURE)
+        rolls = secure.randints(6, 1, 100)
+        assert len(rolls) == 100 and all(1 <= roll <= 6 for roll in rolls)
+
+
+class TestDeterministicStreams:
+    """Golden vectors pin both deterministic generators bit-exact"""
+
+    def test_legacy_golden_vector(self):
+        rng = RandomSource(mode=RandomMode.DETERMINISTIC, seed="golden", stream_version=STREAM_LEGACY)
+        assert [rng.rand_float() for _ in range(3)] == [
+            0.10231944259129709, 0.34281446608718347, 0.6976315168627338,
+        ]
+        assert rng.randints(1, 20, 12) == [11, 16, 8, 17, 15, 1, 9, 11, 11, 5, 3, 11]
+
+    def test_counter_golden_vector(self):
+        rng = RandomSource(mode=RandomMode.DETERMINISTIC, seed="golden", stream_version=STREAM_COUNTER)
+        assert [rng.rand_float() for _ in range(3)] == [
+            0.7268035545678967, 0.4714109508113483, 0.6656176851164263,
+        ]
+        assert rng.randints(1, 20, 12) == [6, 6, 17, 5, 2, 6, 17, 13, 19, 6, 20, 20]
+
+    @pytest.mark.parametrize("version", [STREAM_LEGACY, STREAM_COUNTER])
+    def test_seek_regenerates_any_draw(self, version):
+        rng = RandomSource(mode=RandomMode.DETERMINISTIC, seed="seek", stream_version=version)
+        draws = [rng.rand_float() for _ in range(40)]
+        assert rng.position == 40
+
+        for index in (37, 0, 9, 16, 8):
+            rng.seek(index)
+            assert rng.rand_float() == draws[index]
+
+        rng.seek(5)
+        assert rng.randints(0, 99, 20) == [int(draw * 100) for draw in draws[5:25]]
+        assert rng.position == 25
+
+    def test_bulk_matches_single_draws_across_blocks(self):
+        rng1 = RandomSource(mode=RandomMode.DETERMINISTIC, seed="bulk")
+        rng2 = RandomSource(mode=RandomMode.DETERMINISTIC, seed="bulk")
+        rng1.rand_float()
+        rng2.rand_float()
+        assert rng1.randints(1, 6, 23) == [rng2.randint(1, 6) for _ in range(23)]
+        assert rng1.rand_float() == rng2.rand_float()
+
+    def test_unknown_version_rejected(self):
+        with pytest.raises(ValueError):
+            RandomSource(mode=RandomMode.DETERMINISTIC, seed="x", stream_version=7)
+
+
 class TestSessionRNG:
     """Test session-specific RNG"""
     
     def test_session_consistency(self):
         """Same session ID should produce same sequence"""
-        rng1 = get_session_rng("session-123")
-        rng2 = get_session_rng("session-123")
+        fresh1 = SessionStreams("session-123").stream()
+        fresh2 = SessionStreams("session-123").stream()
         
-        values1 = [rng1.rand_float(0.0, 1.0) for _ in range(10)]
-        values2 = [rng2.rand_float(0.0, 1.0) for _ in range(10)]
+        values1 = [fresh1.rand_float(0.0, 1.0) for _ in range(10)]
+        values2 = [fresh2.rand_float(0.0, 1.0) for _ in range(10)]
         
         assert values1 == values2
     
+    def test_session_stream_persists(self):
+        """Repeated lookups continue one sequence instead of restarting it"""
+        get_stream_registry().drop("session-persist")
+        first = get_session_rng("session-persist")
+        values1 = [first.rand_float() for _ in range(5)]
+        second = get_session_rng("session-persist")
+        
+        assert second is first
+        assert [second.rand_float() for _ in range(5)] != values1
+    
+    def test_substreams_are_independent(self):
+        streams = SessionStreams("forks")
+        dice = [streams.stream("dice").randint(1, 20) for _ in range(10)]
+        
+        other = SessionStreams("forks")
+        other.stream("templates").randints(1, 20, 50)
+        other.stream("oracle").rand_float()
+        assert [other.stream("dice").randint(1, 20) for _ in range(10)] == dice
+        assert streams.stream("oracle").rand_float() != streams.stream("fluctuation").rand_float()
+    
+    def test_checkpoint_restore_replays(self):
+        registry = get_stream_registry()
+        registry.drop("table-7")
+        get_session_rng("table-7", "dice").randints(1, 6, 4)
+        checkpoint = registry.checkpoint("table-7")
+        
+        rolls = get_session_rng("table-7", "dice").randints(1, 6, 10)
+        draws = get_session_rng("table-7", "templates").randints(0, 99, 3)
+        
+        registry.restore("table-7", json.loads(json.dumps(checkpoint)))
+        assert get_session_rng("table-7", "dice").randints(1, 6, 10) == rolls
+        assert get_session_rng("table-7", "templates").randints(0, 99, 3) == draws
+        
+        moved = SessionStreams.from_checkpoint(checkpoint, session_id="table-8")
+        assert moved.stream("dice").randints(1, 6, 10) == rolls
+    
+    def test_restore_rejects_foreign_checkpoint(self):
+        streams = SessionStreams("mine")
+        with pytest.raises(ValueError):
+            streams.restore(SessionStreams("theirs").checkpoint())
+    
     def test_different_sessions(self):
         """Different session IDs should produce different sequences"""
         rng1 = get_session_rng("session-a")
@@ -162,5 +338,59 @@ class TestWeightedRandom:
         assert all(r in options for r in results)
 
 
+class TestPreparedDistribution:
+    """Test cached, pre-transformed weight tables"""
+    
+    def test_matches_per_call_transform(self):
+        """Prepared probabilities equal the normalize-^1.5-normalize transform"""
+        weights = (1.0, 3.0, 6.0)
+        prepared = PreparedDistribution(weights)
+        normalized = [w / 10.0 for w in weights]
+        transformed = [w ** 1.5 for w in normalized]
+        assert prepared.probabilities == [w / sum(transformed) for w in transformed]
+        assert prepared.cumulative[-1] == pytest.approx(1.0)
+        assert prepared.index(0.0) == 0
+        assert prepared.index(prepared.cumulative[0]) == 0
+        assert prepared.index(2.0) is None
+    
+    def test_zero_weights_fall_back_to_uniform(self):
+        """Massless weights leave choice uniform, as before"""
+        prepared = PreparedDistribution((0.0, 0.0))
+        assert prepared.uniform
+        rng = RandomSource(seed="uniform", mode=RandomMode.DETERMINISTIC)
+        assert {rng.choice(["a", "b"], prepared) for _ in range(50)} == {"a", "b"}
+    
+    def test_cached_by_identity(self):
+        """The same tuple object reuses one preparation"""
+        weights = (2.0, 1.0, 1.0)
+        first = prepare_distribution(weights)
+        assert prepare_distribution(weights) is first
+        assert prepare_distribution(weights, bias=0.3) is not first
+        assert prepare_distribution(tuple([2.0, 1.0, 1.0])) is not first
+    
+    def test_explicit_invalidation(self):
+        """Mutated weights are re-prepared only after invalidation"""
+        weights = [1.0, 1.0]
+        stale = prepare_distribution(weights)
+        weights[0] = 9.0
+        assert prepare_distribution(weights) is stale
+        assert invalidate_distribution(weights) == 1
+        fresh = prepare_distribution(weights)
+        assert fresh.weights == (9.0, 1.0)
+        assert fresh.probabilities[0] > stale.probabilities[0]
+        assert invalidate_distribution() >= 1
+        assert prepare_distribution(weights) is not fresh
+    
+    def test_choice_replays_identically(self):
+        """Tuple, list and prepared weights draw the same seeded items"""
+        items = ["a", "b", "c", "d"]
+        weights = (0.1, 0.2, 0.3, 0.4)
+        by_kind = []
+        for kind in (weights, list(weights), PreparedDistribution(weights)):
+            rng = RandomSource(seed="replay", mode=RandomMode.DETERMINISTIC)
+            by_kind.append([rng.choice(items, kind) for _ in range(100)])
+        assert by_kind[0] == by_kind[1] == by_kind[2]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from server.llm_gateway import ChatRequest, FakeBackend, LLMGateway, SpeechRequest
+from server.single_flight import SingleFlight, request_key
+
+
+def _gateway(backend):
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend, max_concurrency=8)
+    return gateway
+
+
+def test_key_normalizes_whitespace_only():
+    assert request_key("chat", "m", (("user", "Open  the\ndoor"),)) == request_key("chat", "m", (("user", "Open the door"),))
+    assert request_key("chat", "m", (("user", "Open the door"),)) != request_key("chat", "m", (("user", "Open the gate"),))
+
+
+def test_concurrent_duplicates_share_one_call():
+    backend = FakeBackend(latency=0.03, responder=lambda request: "The door opens.")
+    gateway = _gateway(backend)
+    same = [ChatRequest.from_prompt("sys", "open  the door", model="m") for _ in range(9)]
+    spaced = ChatRequest.from_prompt("sys", "open the\ndoor", model="m")
+    other = ChatRequest.from_prompt("sys", "open the gate", model="m")
+
+    async def run():
+        return await asyncio.gather(*(gateway.complete(request) for request in same + [spaced, other]))
+
+    results = asyncio.run(run())
+
+    assert set(results) == {"The door opens."}
+    assert backend.calls == 2
+    stats = gateway.flights.stats()
+    assert (stats["leaders"], stats["coalesced"], stats["in_flight"]) == (2, 9, 0)
+
+
+def test_speech_is_coalesced_and_key_released_after_settling():
+    backend = FakeBackend(latency=0.02)
+    gateway = _gateway(backend)
+    request = SpeechRequest(text="Welcome, travellers.", voice="fable")
+
+    async def burst():
+        return await asyncio.gather(*(gateway.synthesize(request) for _ in range(5)))
+
+    first = asyncio.run(burst())
+    second = asyncio.run(burst())
+
+    assert len(set(first + second)) == 1
+    assert backend.speech_calls == 2
+
+
+def test_errors_fan_out_to_every_waiter():
+    def broken(request):
+        raise RuntimeError("rate limited")
+
+    backend = FakeBackend(latency=0.02, responder=broken)
+    gateway = _gateway(backend)
+    request = ChatRequest.from_prompt("sys", "narrate", model="m")
+
+    async def run():
+        return await asyncio.gather(*(gateway.complete(request) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len({id(result) for result in results}) == 1
+    assert backend.calls == 1
+    stats = gateway.flights.stats()
+    assert (stats["errors"], stats["fanned_out_errors"]) == (1, 4)
+
+
+def test_waiter_timeout_does_not_cancel_shared_call():
+    backend = FakeBackend(latency=0.1, responder=lambda request: "done")
+    gateway = _gateway(backend)
+    request = ChatRequest.from_prompt("sys", "slow", model="m")
+
+    async def run():
+        leader = asyncio.ensure_future(gateway.complete(request))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await gateway.complete(request, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+    assert backend.calls == 1
+
+
+def test_coalescing_can_be_disabled_per_call():
+    backend = FakeBackend(latency=0.01)
+    gateway = _gateway(backend)
+    request = ChatRequest.from_prompt("sys", "sample", model="m")
+
+    async def run():
+        await asyncio.gather(*(gateway.complete(request, coalesce=False) for _ in range(3)))
+
+    asyncio.run(run())
+    assert backend.calls == 3
+
+
+def test_sync_callers_across_threads():
+    flights = SingleFlight("test")
+    calls = []
+    start = threading.Barrier(6)
+    results = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return "tts-bytes"
+
+    def worker():
+        start.wait()
+        results.append(flights.run_sync("same", slow))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["tts-bytes"] * 6
+    assert len(calls) == 1
+    assert flights.stats()["coalesced"] == 5
+
+
+def test_sync_error_fan_out():
+    flights = SingleFlight("test")
+    gate = threading.Event()
+    errors = []
+
+    def failing():
+        gate.wait()
+        raise ValueError("boom")
+
+    def worker():
+        try:
+            flights.run_sync("key", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flights.stats()["coalesced"] < 2:
+        time.sleep(0.001)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert flights.stats()["errors"] == 1 and flights.stats()["fanned_out_errors"] == 2
@@ -0,0 +1,109 @@
+import importlib
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from server import template_engine
+from server.randomness import get_session_rng, get_stream_registry
+from server.template_engine import (
+    COMPILED_TEMPLATES,
+    compiled_cell,
+    draw_template,
+    render_batch,
+    render_template,
+)
+
+
+class Sweep:
+    """Fake RNG returning every value of the draw space in turn."""
+
+    def __init__(self):
+        self.next = 0
+
+    def randint(self, a, b):
+        value = a + self.next % (b - a + 1)
+        self.next += 1
+        return value
+
+
+def test_fast_render_matches_compose_for_every_cell():
+    for compiled in COMPILED_TEMPLATES.values():
+        sweep = Sweep()
+        for _ in range(compiled.draw_space):
+            seed = sweep.next
+            draw = draw_template(compiled.frame_key, compiled.tone, sweep)
+            sweep.next = seed
+            assert render_template(compiled.frame_key, compiled.tone, rng=sweep) == draw.compose()
+
+
+def test_single_draw_is_exactly_uniform():
+    compiled = compiled_cell("straight", "classic")
+    sweep = Sweep()
+    draws = [draw_template("straight", "classic", sweep) for _ in range(compiled.draw_space)]
+
+    cells = Counter(draw.cell for draw in draws)
+    sizes = Counter(len(draw.options) for draw in draws)
+    picks = Counter(draw.options for draw in draws)
+
+    assert len(set(cells.values())) == 1 and len(cells) == 9
+    assert sizes[2] == sizes[3]
+    assert len(picks) == 12 + 24
+    assert len({count for options, count in picks.items() if len(options) == 2}) == 1
+    assert len({count for options, count in picks.items() if len(options) == 3}) == 1
+
+
+def test_tables_are_immutable():
+    with pytest.raises(TypeError):
+        COMPILED_TEMPLATES[("straight", "classic")] = None
+    compiled = compiled_cell("straight", "classic")
+    assert isinstance(compiled.prose, tuple) and isinstance(compiled.option_picks[0][0], tuple)
+
+
+def test_draws_share_the_compiled_strings():
+    compiled = compiled_cell("straight", "classic")
+    draw = draw_template("straight", "classic", random.Random(3))
+    assert any(draw.prose is prose for row in compiled.prose for prose in row)
+    assert any(draw.options is pick for by_k in compiled.option_picks for pick in by_k)
+
+
+def test_session_stream_makes_renders_reproducible():
+    checkpoint = get_stream_registry().checkpoint("table")
+    first = render_batch("straight", "gothic", 20, get_session_rng("table", "templates"))
+    get_stream_registry().restore("table", checkpoint)
+    second = render_batch("straight", "gothic", 20, get_session_rng("table", "templates"))
+    other = render_batch("straight", "gothic", 20, get_session_rng("other table", "templates"))
+
+    assert first == second
+    assert first != other
+
+
+def test_batch_matches_sequential_renders():
+    batch = render_batch("straight", "classic", 50, random.Random(7))
+    rng = random.Random(7)
+    assert batch == [render_template("straight", "classic", rng=rng) for _ in range(50)]
+
+
+def test_unknown_frame_and_tone_fall_back():
+    assert compiled_cell("no_such_frame", "classic") is compiled_cell("straight", "classic")
+    assert compiled_cell("straight", "no_such_tone").tone == "classic"
+    assert draw_template("no_such_frame", "no_such_tone", random.Random(1)).frame_key == "straight"
+
+
+def test_recompile_picks_up_library_edits(monkeypatch):
+    tone = template_engine.TEMPLATE_LIBRARY["straight"]["tones"]["classic"]
+    monkeypatch.setitem(tone, "atmosphere", ["Only this."])
+    template_engine.recompile_templates()
+    try:
+        assert render_template("straight", "classic", rng=random.Random(0)).startswith("Only this.")
+    finally:
+        monkeypatch.undo()
+        template_engine.recompile_templates()
+
+
+def test_importable_as_top_level_module(monkeypatch):
+    monkeypatch.syspath_prepend(str(Path(template_engine.__file__).parent))
+    module = importlib.import_module("template_engine")
+    assert isinstance(module.TemplateRender(*draw_template("straight")), tuple)
+    assert module.render_template("straight", rng=random.Random(0))
@@ -0,0 +1,63 @@
+from hypothesis import given, settings, strategies as st
+
+from server.dm_engine import classify_action
+from server.ethics import validate_player_input
+from server.resonance import analyze_imagination
+from server.text_analyzer import InputAnalyzer, analyze_input
+
+SAMPLES = [
+    "I search the room",
+    "What if I try to befriend the dragon instead?",
+    "I help the merchant guild secure trade routes and support the guards.",
+    "I betray the Shadow Exchange and burn their docks.",
+    "I move like assisting a friend, then bet it all",
+    'I shout "stand down!" as if the captain ordered it',
+    "hack system now",
+    "I hack the lock, bypass the ward and use a workaround",
+    "<script>alert('xss')</script>",
+    "my phone number is secret",
+    "   padded hidden decoy   ",
+    "x" * 600,
+    "",
+    "    ",
+]
+
+
+def _assert_matches_reference(text):
+    analysis = analyze_input(text)
+    validation = validate_player_input(text)
+    assert analysis.to_validation() == validation
+    if validation["valid"]:
+        sanitized = validation["sanitized"]
+        assert analysis.action == classify_action(sanitized)
+        assert analysis.imagination == analyze_imagination(sanitized)
+
+
+def test_matches_reference_functions():
+    for text in SAMPLES:
+        _assert_matches_reference(text)
+
+
+def test_overlapping_phrases_are_all_reported():
+    analysis = analyze_input("they fight like assisting heroes and bet on betrayal")
+    assert analysis.coop_hits == 1
+    assert analysis.disrupt_hits == 1
+    assert {"metaphoric", "risky"} <= set(analysis.imagination_signals)
+
+
+def test_custom_tables():
+    custom = InputAnalyzer(action_markers={"coop": ["hug"], "disrupt": ["shove"]})
+    assert custom.analyze("I hug the ogre").action == ("coop", 1, 0)
+    assert custom.analyze("I help the ogre").action == ("neutral", 0, 0)
+
+
+_WORDS = st.sampled_from(
+    ["help", "kill", "bet", "betray", "like", "a", "assist", "as", "if", "hack", "system", "phone",
+     "what", "?", '"', "'", "<script", "secret", "the", "hidden", "improvise", "x" * 40]
+)
+
+
+@settings(max_examples=300, deadline=None)
+@given(st.lists(_WORDS, max_size=30), st.sampled_from([" ", "", "  ", "\n"]))
+def test_property_matches_reference(words, separator):
+    _assert_matches_reference(separator.join(words))
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+
+from server import audio_cache as audio_store
+from server.audio_cache import AudioCache
+from server.llm import agenerate_narration_with_persona
+from server.llm_gateway import FakeBackend, LLMGateway, set_gateway
+from server.tts_pipeline import AudioSegment, speak_while_streaming, synthesize_segments
+
+SENTENCES = [f"Sentence number {i} of the tale." for i in range(8)]
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    cache = AudioCache(str(tmp_path / "audio"))
+    monkeypatch.setattr(audio_store, "audio_cache", cache)
+    return cache
+
+
+class Synth:
+    def __init__(self, delay):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.order = []
+
+    async def __call__(self, text: str) -> bytes:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay(text))
+            self.order.append(text)
+            return text.encode()
+        finally:
+            self.in_flight -= 1
+
+
+def _collect(stream):
+    async def run():
+        return [item async for item in stream]
+
+    return asyncio.run(run())
+
+
+def test_segments_are_ordered_and_pool_is_bounded():
+    # Later sentences finish first
+    synth = Synth(lambda text: 0.04 - 0.004 * int(text.split()[2]))
+    segments = _collect(synthesize_segments(SENTENCES, "alloy", "tts-1", synth, workers=3))
+
+    assert [segment.index for segment in segments] == list(range(8))
+    assert [segment.text for segment in segments] == SENTENCES
+    assert synth.max_in_flight == 3
+    assert synth.order != SENTENCES
+
+
+def test_time_to_first_audio_does_not_grow_with_length():
+    synth = Synth(lambda text: 0.02)
+
+    async def first_segment(count):
+        started = time.perf_counter()
+        lines = [f"Line {i}." for i in range(count)]
+        async for _ in synthesize_segments(lines, "alloy", "tts-1", synth, workers=4):
+            return time.perf_counter() - started
+
+    short = asyncio.run(first_segment(2))
+    long = asyncio.run(first_segment(40))
+    assert long < short + 0.05
+
+
+def test_repeated_sentences_hit_the_audio_cache(cache):
+    synth = Synth(lambda text: 0)
+    _collect(synthesize_segments(["Welcome.", "Welcome.", "Roll."], "alloy", "tts-1", synth, workers=1))
+    assert sorted(synth.order) == ["Roll.", "Welcome."]
+    assert cache.stats()["hits"] == 1
+
+
+def test_synthesis_error_surfaces_in_order():
+    async def synth(text):
+        if text.startswith("Bad"):
+            raise RuntimeError("tts down")
+        return b"ok"
+
+    async def run():
+        seen = []
+        with pytest.raises(RuntimeError):
+            async for segment in synthesize_segments(["Good one.", "Bad one.", "Good two."], "alloy", "tts-1", synth):
+                seen.append(segment.text)
+        return seen
+
+    assert asyncio.run(run()) == ["Good one."]
+
+
+def test_audio_interleaves_with_streaming_text():
+    async def chunks():
+        for word in "The gate opens. Cold wind blows in. Torches flicker.".split(" "):
+            await asyncio.sleep(0.005)
+            yield word + " "
+
+    items = _collect(speak_while_streaming(chunks(), "alloy", "tts-1", Synth(lambda text: 0.001), workers=2))
+
+    text = "".join(item for item in items if isinstance(item, str))
+    segments = [item for item in items if isinstance(item, AudioSegment)]
+    assert text.strip() == "The gate opens. Cold wind blows in. Torches flicker."
+    assert [segment.text for segment in segments] == ["The gate opens.", "Cold wind blows in.", "Torches flicker."]
+    # The first segment is emitted before the text stream has finished
+    first_segment = next(i for i, item in enumerate(items) if isinstance(item, AudioSegment))
+    assert first_segment < len(items) - len(segments)
+
+
+def test_segmented_narration_through_gateway():
+    backend = FakeBackend(responder=lambda request: "Hail, heroes. The road is long. Rest here.")
+    gateway = LLMGateway(default_timeout=5.0)
+    gateway.register(backend)
+    set_gateway(gateway)
+    try:
+        result = asyncio.run(agenerate_narration_with_persona("tts_table", "Greet", "classic", segmented=True))
+    finally:
+        set_gateway(None)
+
+    assert len(result["audio_segments"]) == 3
+    assert "audio_url" not in result
+    assert backend.speech_calls == 3